@@ -1,28 +1,73 @@
 #!/usr/bin/env python3
 """
-Add or update rating for a prompt.
+Add or update ratings for one or more prompts.
+
+All ratings are applied as one batch: the CSV is read and written once, and
+unknown IDs are reported without aborting the rest.
 
 Usage:
     python add_rating.py 40 "Excellent ⭐"
     python add_rating.py 41 "Excellent - sax texture perfect for midday refresh! ⭐"
+    python add_rating.py 40 "Excellent ⭐" 41 "Very good" 42 "Okay"
+    python add_rating.py --file ratings.txt      # "<prompt_id> <rating>" per line, '-' for stdin
 """
 
 import sys
-from csv_utils import add_rating
+from typing import Dict
+from prompt_daemon import with_daemon
+import prompt_profile
+
+
+def update_prompts(updates: Dict[str, Dict[str, str]]):
+    from csv_utils import update_prompts
+    return update_prompts(updates)
+
+
+def read_ratings(path: str) -> Dict[str, str]:
+    """Read "<prompt_id> <rating>" lines from a file, skipping blanks and # comments."""
+    f = sys.stdin if path == '-' else open(path, 'r', encoding='utf-8')
+    try:
+        ratings = {}
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            parts = line.split(None, 1)
+            ratings[parts[0]] = parts[1] if len(parts) > 1 else ''
+        return ratings
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
 
 def main():
     if len(sys.argv) < 3:
-        print("Usage: python add_rating.py <prompt_id> <rating>")
+        print("Usage: python add_rating.py <prompt_id> <rating> [<prompt_id> <rating> ...]")
+        print("       python add_rating.py --file <ratings.txt|->")
         print('Example: python add_rating.py 40 "Excellent ⭐"')
         sys.exit(1)
 
-    prompt_id = sys.argv[1]
-    rating = sys.argv[2]
+    if sys.argv[1] == '--file':
+        ratings = read_ratings(sys.argv[2])
+    else:
+        args = sys.argv[1:]
+        if len(args) % 2:
+            print("❌ Expected <prompt_id> <rating> pairs")
+            sys.exit(1)
+        ratings = dict(zip(args[::2], args[1::2]))
 
-    try:
-        add_rating(prompt_id, rating)
-    except ValueError as e:
-        print(f"❌ {e}")
+    missing = with_daemon(
+        'rate',
+        lambda: update_prompts({prompt_id: {'Rating': rating} for prompt_id, rating in ratings.items()}),
+        ratings=ratings,
+    )
+
+    for prompt_id in missing:
+        print(f"❌ Prompt {prompt_id} not found")
+
+    for prompt_id, rating in ratings.items():
+        if prompt_id not in missing:
+            print(f"✅ Rated Prompt {prompt_id}: {rating}")
 
 if __name__ == "__main__":
-    main()
+    prompt_profile.run(main)
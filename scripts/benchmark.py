@@ -0,0 +1,355 @@
+#!/usr/bin/env python3
+"""
+Benchmark csv_utils operations and the CLI scripts on synthetic libraries.
+
+For each library size a synthetic CSV is generated (see
+generate_library.py) and cached in the data directory. Sidecars are
+primed once, and then every operation is measured in its own fresh
+process:
+
+    cold_ms         the first call in a new process
+    p50/p90/p99_ms  the following calls
+    ops_per_s       1000 / mean_ms
+    rows_per_s      library rows scanned per second (full-scan operations)
+    peak_rss_mb     peak resident memory of the process
+
+Write operations run on a private copy of the library. CLI scripts run as
+subprocesses with CSV_PATH pointing at the library and the daemon
+bypassed. Results are printed as a table and saved as JSON, and two
+result files can be compared to spot regressions.
+
+Usage:
+    python benchmark.py                                  # 1k and 100k, everything
+    python benchmark.py --sizes 1k,100k,1M --repeat 20 --out bench.json
+    python benchmark.py --sizes 1k --ops get_prompt,find_prompts --no-cli
+    python benchmark.py compare before.json after.json   # flag >20% slowdowns
+"""
+
+import json
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+SCRIPTS_DIR = Path(__file__).parent
+DEFAULT_DATA_DIR = SCRIPTS_DIR.parent / '.bench'
+DEFAULT_SIZES = '1k,100k'
+DEFAULT_REPEAT = 10
+
+# Slowdown (new p50 / old p50) reported as a regression by `compare`
+REGRESSION_RATIO = 1.2
+
+
+# --- measurement helpers -------------------------------------------------
+
+def percentile(values: List[float], q: float) -> float:
+    """Linear-interpolated percentile (q in 0..100) of values."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    position = (len(ordered) - 1) * q / 100
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def rss_mb(maxrss: int) -> float:
+    """ru_maxrss in MB (kilobytes on Linux, bytes on macOS)."""
+    return maxrss / (1024 * 1024) if sys.platform == 'darwin' else maxrss / 1024
+
+
+def summarize(timings: List[float], size: int, scan: bool) -> Dict:
+    """Latency summary for timings in seconds; the first one is the cold call."""
+    warm = [t * 1000 for t in (timings[1:] or timings)]
+    mean = sum(warm) / len(warm)
+    summary = {
+        'repeat': len(timings),
+        'cold_ms': round(timings[0] * 1000, 3),
+        'p50_ms': round(percentile(warm, 50), 3),
+        'p90_ms': round(percentile(warm, 90), 3),
+        'p99_ms': round(percentile(warm, 99), 3),
+        'mean_ms': round(mean, 3),
+        'ops_per_s': round(1000 / mean, 1) if mean else None,
+    }
+    summary['rows_per_s'] = round(size * 1000 / mean) if scan and mean else None
+    return summary
+
+
+# --- csv_utils operations --------------------------------------------------
+
+OPERATIONS = ['load_prompts', 'load_prompts_lazy', 'read_prompts', 'iter_prompts_stream', 'get_prompt',
+              'find_prompts', 'find_prompts_limit', 'find_prompts_stream', 'search_prompts', 'search_ranked',
+              'query_prompts', 'get_stats', 'update_prompt', 'update_prompts_batch', 'write_prompts']
+
+# Run on a private copy of the library
+WRITE_OPERATIONS = {'update_prompt', 'update_prompts_batch', 'write_prompts'}
+
+# Touch every row, so rows_per_s is meaningful
+FULL_SCAN_OPERATIONS = {'load_prompts', 'load_prompts_lazy', 'read_prompts', 'iter_prompts_stream',
+                        'find_prompts', 'find_prompts_stream', 'search_prompts', 'write_prompts'}
+
+
+def _operations() -> Dict[str, Callable]:
+    """name -> function(ids, rng) returning the number of rows it produced."""
+    import csv_utils
+    import prompt_index
+    from prompt_query import query_prompts
+
+    def load_prompts(ids, rng):
+        csv_utils.invalidate()
+        return len(csv_utils.load_prompts())
+
+    def load_prompts_lazy(ids, rng):
+        csv_utils.invalidate()
+        prompt_index._light_cache.clear()
+        return len(csv_utils.load_prompts(lazy=True))
+
+    def write_prompts(ids, rng):
+        prompts = csv_utils.read_prompts()
+        csv_utils.write_prompts(prompts)
+        return len(prompts)
+
+    return {
+        'load_prompts': load_prompts,
+        'load_prompts_lazy': load_prompts_lazy,
+        'read_prompts': lambda ids, rng: len(csv_utils.read_prompts()),
+        'iter_prompts_stream': lambda ids, rng: sum(1 for _ in csv_utils.iter_prompts(stream=True)),
+        'get_prompt': lambda ids, rng: int(csv_utils.get_prompt(rng.choice(ids)) is not None),
+        'find_prompts': lambda ids, rng: len(csv_utils.find_prompts(Time_Block='Midday Refresh')),
+        'find_prompts_limit': lambda ids, rng: len(csv_utils.find_prompts(limit=10, Generated='Yes')),
+        'find_prompts_stream': lambda ids, rng: len(csv_utils.find_prompts(stream=True, Time_Block='Midday Refresh')),
+        'search_prompts': lambda ids, rng: len(csv_utils.search_prompts('saxophone')),
+        'search_ranked': lambda ids, rng: len(csv_utils.search_prompts('"brushed drums" OR mellotron', ranked=True, limit=20)),
+        'query_prompts': lambda ids, rng: len(query_prompts('bpm:100-110 generated:yes sort:-bpm limit:20')),
+        'get_stats': lambda ids, rng: csv_utils.get_stats()['total'],
+        'update_prompt': lambda ids, rng: 1 - len(csv_utils.update_prompts({rng.choice(ids): {'Rating': 'Pretty good'}})),
+        'update_prompts_batch': lambda ids, rng: 50 - len(csv_utils.update_prompts(
+            {prompt_id: {'Generated': 'Yes'} for prompt_id in rng.sample(ids, min(50, len(ids)))})),
+        'write_prompts': write_prompts,
+    }
+
+
+# name -> (argv after `python`, writes)
+CLI_COMMANDS: Dict[str, Tuple[List[str], bool]] = {
+    'prompts --help': (['prompts.py', '--help'], False),
+    'show_prompt': (['show_prompt.py', '{id}'], False),
+    'find_prompts --time-block': (['find_prompts.py', '--time-block', 'Midday Refresh', '--format', 'jsonl', '--fields', 'Prompt_ID'], False),
+    'find_prompts --search': (['find_prompts.py', '--search', 'saxophone', '--limit', '20'], False),
+    'prompt_query': (['prompt_query.py', 'bpm:100-110 sort:-bpm limit:10'], False),
+    'stats': (['stats.py'], False),
+    'add_rating': (['add_rating.py', '{id}', 'Pretty good'], True),
+    'mark_generated': (['mark_generated.py', '{id}'], True),
+}
+
+
+def copy_library(csv_path: Path, directory: Path) -> Path:
+    """Copy a library and its sidecars (keeping mtimes) for a write benchmark."""
+    target = directory / csv_path.name
+    for source in csv_path.parent.glob(csv_path.name + '*'):
+        if source.suffix in ('.lock', '.sock'):
+            continue
+        shutil.copy2(source, directory / source.name)
+    return target
+
+
+def library_ids(csv_path: Path) -> List[str]:
+    import csv
+    with open(csv_path, 'r', encoding='utf-8') as f:
+        return [row[0] for row in csv.reader(f)][1:]
+
+
+def run_worker(operation: str, csv_path: str, repeat: int, seed: int):
+    """Measure one operation in this (fresh) process and print JSON."""
+    import resource
+
+    path = Path(csv_path)
+    with tempfile.TemporaryDirectory() as scratch:
+        if operation in WRITE_OPERATIONS:
+            path = copy_library(path, Path(scratch))
+        os.environ['CSV_PATH'] = str(path)
+        sys.path.insert(0, str(SCRIPTS_DIR))
+        import csv_utils
+        csv_utils.CSV_PATH = path
+
+        function = _operations()[operation]
+        ids = library_ids(path)
+        rng = random.Random(seed)
+        timings = []
+        returned = 0
+        for _ in range(repeat):
+            start = time.perf_counter()
+            returned = function(ids, rng)
+            timings.append(time.perf_counter() - start)
+
+    print(json.dumps({'timings': timings, 'returned': returned,
+                      'maxrss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss}))
+
+
+def bench_operation(operation: str, csv_path: Path, size: int, repeat: int, seed: int) -> Dict:
+    output = subprocess.run(
+        [sys.executable, str(Path(__file__)), '--worker', operation, str(csv_path), str(repeat), str(seed)],
+        capture_output=True, text=True, check=True,
+        env={**os.environ, 'PROMPTS_DAEMON': '0'},
+    ).stdout
+    data = json.loads(output.strip().splitlines()[-1])
+    result = {'size': size, 'kind': 'api', 'name': operation}
+    result.update(summarize(data['timings'], size, operation in FULL_SCAN_OPERATIONS))
+    result['returned'] = data['returned']
+    result['peak_rss_mb'] = round(rss_mb(data['maxrss']), 1)
+    return result
+
+
+def bench_cli(name: str, csv_path: Path, size: int, repeat: int, seed: int) -> Dict:
+    argv, writes = CLI_COMMANDS[name]
+    rng = random.Random(seed)
+    ids = library_ids(csv_path)
+    timings = []
+    peak = 0
+
+    with tempfile.TemporaryDirectory() as scratch:
+        path = copy_library(csv_path, Path(scratch)) if writes else csv_path
+        env = {**os.environ, 'CSV_PATH': str(path), 'PROMPTS_DAEMON': '0'}
+        for _ in range(repeat):
+            command = [sys.executable] + [str(SCRIPTS_DIR / argv[0])] + [arg.replace('{id}', rng.choice(ids)) for arg in argv[1:]]
+            start = time.perf_counter()
+            process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env)
+            _, status, usage = os.wait4(process.pid, 0)
+            timings.append(time.perf_counter() - start)
+            process.returncode = os.waitstatus_to_exitcode(status)
+            peak = max(peak, usage.ru_maxrss)
+
+    result = {'size': size, 'kind': 'cli', 'name': name}
+    result.update(summarize(timings, size, scan=False))
+    result['returned'] = None
+    result['peak_rss_mb'] = round(rss_mb(peak), 1)
+    return result
+
+
+def prepare_library(size: int, data_dir: Path, seed: int) -> Path:
+    """Generate (or reuse) the synthetic library for size and prime its sidecars."""
+    from generate_library import generate
+
+    path = data_dir / f"library-{size}-seed{seed}.csv"
+    if not path.exists():
+        print(f"🧪 Generating {size} prompts -> {path}")
+        generate(size, path, seed)
+    subprocess.run([sys.executable, '-c', 'import csv_utils, prompt_index, search_index; '
+                    'csv_utils.load_prompts(); csv_utils.load_prompts(lazy=True); '
+                    'prompt_index.build_index(); csv_utils.get_stats(); search_index.get_index()'],
+                   cwd=SCRIPTS_DIR, env={**os.environ, 'CSV_PATH': str(path)}, check=True)
+    return path
+
+
+def print_table(results: List[Dict]):
+    print(f"\n{'size':>8} {'kind':4} {'name':28} {'cold':>9} {'p50':>9} {'p90':>9} {'p99':>9} {'ops/s':>9} {'rows/s':>11} {'RSS MB':>7}")
+    for r in results:
+        rows = f"{r['rows_per_s']:>11,}" if r['rows_per_s'] else f"{'':>11}"
+        print(f"{r['size']:>8} {r['kind']:4} {r['name'][:28]:28} {r['cold_ms']:>9.2f} {r['p50_ms']:>9.2f} "
+              f"{r['p90_ms']:>9.2f} {r['p99_ms']:>9.2f} {r['ops_per_s'] or 0:>9.1f} {rows} {r['peak_rss_mb']:>7.1f}")
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=SCRIPTS_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(before_path: str, after_path: str) -> int:
+    """Print p50 ratios between two result files. Returns the number of regressions."""
+    with open(before_path, 'r', encoding='utf-8') as f:
+        before = {(r['size'], r['kind'], r['name']): r for r in json.load(f)['results']}
+    with open(after_path, 'r', encoding='utf-8') as f:
+        after = json.load(f)['results']
+
+    regressions = 0
+    print(f"\n{'size':>8} {'kind':4} {'name':28} {'before':>9} {'after':>9} {'ratio':>7}")
+    for r in after:
+        old = before.get((r['size'], r['kind'], r['name']))
+        if not old or not old['p50_ms']:
+            continue
+        ratio = r['p50_ms'] / old['p50_ms']
+        flag = ''
+        if ratio > REGRESSION_RATIO:
+            flag = ' ⚠️ slower'
+            regressions += 1
+        elif ratio < 1 / REGRESSION_RATIO:
+            flag = ' ✅ faster'
+        print(f"{r['size']:>8} {r['kind']:4} {r['name'][:28]:28} {old['p50_ms']:>9.2f} {r['p50_ms']:>9.2f} {ratio:>6.2f}x{flag}")
+    return regressions
+
+
+def option(args: List[str], flag: str, default=None):
+    """Value following flag in args, or default."""
+    if flag in args and args.index(flag) + 1 < len(args):
+        return args[args.index(flag) + 1]
+    return default
+
+
+def main():
+    args = sys.argv[1:]
+
+    if args[:1] == ['--worker']:
+        run_worker(args[1], args[2], int(args[3]), int(args[4]))
+        return
+
+    if args[:1] == ['compare']:
+        if len(args) != 3:
+            print("Usage: python benchmark.py compare <before.json> <after.json>")
+            sys.exit(1)
+        regressions = compare(args[1], args[2])
+        print(f"\n{'⚠️ ' if regressions else '✅'} {regressions} regression(s) over {REGRESSION_RATIO:.1f}x")
+        sys.exit(1 if regressions else 0)
+
+    from generate_library import parse_size
+
+    sizes = [parse_size(size) for size in option(args, '--sizes', DEFAULT_SIZES).split(',')]
+    repeat = max(2, int(option(args, '--repeat', DEFAULT_REPEAT)))
+    seed = int(option(args, '--seed', 0))
+    data_dir = Path(option(args, '--data-dir', DEFAULT_DATA_DIR))
+    operations = option(args, '--ops', ','.join(OPERATIONS)).split(',')
+    out = Path(option(args, '--out', f"benchmark-{time.strftime('%Y%m%d-%H%M%S')}.json"))
+
+    unknown = [name for name in operations if name not in OPERATIONS]
+    if unknown:
+        print(f"❌ Unknown operation(s): {', '.join(unknown)} (choose from {', '.join(OPERATIONS)})")
+        sys.exit(1)
+
+    results = []
+    for size in sizes:
+        path = prepare_library(size, data_dir, seed)
+        for name in operations:
+            print(f"⏱️  {size:>8} api {name}", flush=True)
+            results.append(bench_operation(name, path, size, repeat, seed))
+        if '--no-cli' not in args:
+            for name in CLI_COMMANDS:
+                print(f"⏱️  {size:>8} cli {name}", flush=True)
+                results.append(bench_cli(name, path, size, repeat, seed))
+
+    print_table(results)
+
+    report = {
+        'meta': {
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'seed': seed,
+            'repeat': repeat,
+            'sizes': sizes,
+        },
+        'results': results,
+    }
+    with open(out, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+    print(f"\n✅ Results saved to {out}")
+
+if __name__ == "__main__":
+    main()
@@ -7,59 +7,404 @@ Always use these instead of sed/awk/grep for modifications.
 """
 
 import csv
+import hashlib
+import io
+import os
+import stat
+import tempfile
+from itertools import islice
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import List, Dict, Iterator, Mapping, Optional, Tuple
+
+import prompt_journal
+import prompt_profile
+from prompt_output import print_prompt  # noqa: F401 - kept importable from csv_utils
+from prompt_lock import VersionConflict, bump_version, library_lock
+from prompt_record import Prompt, from_rows, iter_rows, typed_value
+
+DEFAULT_CSV_PATH = Path(__file__).parent.parent / "programming_music_prompts.csv"
+
+# Set CSV_PATH in the environment to point every script at another library
+# (a copy, or a synthetic one from generate_library.py)
+CSV_PATH = Path(os.environ['CSV_PATH']) if os.environ.get('CSV_PATH') else DEFAULT_CSV_PATH
+
+INFLUENCES_PATH = (Path(os.environ['INFLUENCES_PATH']) if os.environ.get('INFLUENCES_PATH')
+                   else DEFAULT_CSV_PATH.with_name("influences_library.csv"))
+
+# Set PROMPTS_BACKEND=sqlite to serve lookups, filters and text searches
+# from an indexed SQLite copy of the CSV (see prompt_db.py)
+BACKEND = os.environ.get('PROMPTS_BACKEND', 'csv')
+
+# Also compare a content hash before trusting the cache (for filesystems
+# with coarse mtimes, or edits that preserve mtime and size)
+CACHE_VERIFY_HASH = os.environ.get('PROMPTS_CACHE_HASH') == '1'
+
+# Mode for files write_atomic() creates: what open() would give them
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+NEW_FILE_MODE = 0o666 & ~_UMASK
+
+# Resolved CSV path -> (library stamp, read-only rows)
+_cache: Dict[Path, Tuple[tuple, Tuple[Mapping[str, str], ...]]] = {}
+_lazy_cache: Dict[Path, Tuple[tuple, Tuple[Mapping[str, str], ...]]] = {}
+# Resolved CSV path -> (rows, Prompt_ID -> row) for cached get_prompt lookups
+_id_maps: Dict[Path, Tuple[tuple, Dict[str, Mapping[str, str]]]] = {}
+
+
+def file_stamp(path: Path, verify_hash: Optional[bool] = None) -> tuple:
+    """Identify the current on-disk version of a file."""
+    if verify_hash is None:
+        verify_hash = CACHE_VERIFY_HASH
+    info = Path(path).stat()
+    stamp = (info.st_mtime_ns, info.st_size)
+    if verify_hash:
+        stamp += (hashlib.sha1(Path(path).read_bytes()).hexdigest(),)
+    return stamp
+
+
+def write_atomic(target: Path, data: bytes):
+    """Replace target with data via a synced temp file and rename."""
+    target = Path(target)
+    fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=target.name + '.')
+    try:
+        # mkstemp creates the file owner-only; keep the target's permissions,
+        # or give a new file the usual umask-based ones
+        try:
+            mode = stat.S_IMODE(target.stat().st_mode)
+        except FileNotFoundError:
+            mode = NEW_FILE_MODE
+        os.fchmod(fd, mode)
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, target)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.unlink(tmp)
+        raise
+
+
+def sidecar_path(suffix: str, csv_path: Optional[Path] = None) -> Path:
+    """Location of a derived file stored next to the CSV, e.g. .idx."""
+    path = Path(csv_path or CSV_PATH)
+    return path.with_name(path.name + suffix)
+
+
+def library_stamp(csv_path: Optional[Path] = None, verify_hash: Optional[bool] = None) -> tuple:
+    """Identify the current library version: the CSV plus its change journal."""
+    path = Path(csv_path or CSV_PATH)
+    return file_stamp(path, verify_hash) + prompt_journal.journal_stamp(path)
+
+
+def library_version(csv_path: Optional[Path] = None) -> int:
+    """Write counter for the library, for compare-and-swap updates (see prompt_lock.py)."""
+    from prompt_lock import library_version as read_version
+    return read_version(Path(csv_path or CSV_PATH))
+
+
+def invalidate(csv_path: Optional[Path] = None):
+    """Drop the cached library for csv_path, or for every path if None."""
+    if csv_path is None:
+        _cache.clear()
+        _lazy_cache.clear()
+        _id_maps.clear()
+    else:
+        path = Path(csv_path).resolve()
+        _cache.pop(path, None)
+        _lazy_cache.pop(path, None)
+        _id_maps.pop(path, None)
+
+
+def _replay_journal(prompts, path: Path) -> tuple:
+    """Apply journalled updates over base rows, re-recording changed rows as Prompts."""
+    pending = prompt_journal.replay(path)
+    if not pending:
+        return tuple(prompts)
+    return tuple(
+        Prompt({**prompt, **pending[prompt['Prompt_ID']]}) if prompt['Prompt_ID'] in pending else prompt
+        for prompt in prompts
+    )
+
+
+def load_prompts(csv_path: Optional[Path] = None, verify_hash: Optional[bool] = None,
+                 lazy: bool = False) -> Tuple[Mapping[str, str], ...]:
+    """
+    Return the library as cached read-only rows (prompt_record.Prompt).
+
+    The CSV is parsed once per process and reparsed only when it or its
+    change journal changes (mtime/size, optionally a content hash). A cold
+    load reads the binary snapshot (see prompt_snapshot.py) instead of
+    parsing when the snapshot matches the CSV. Rows
+    are read-only views with journalled updates applied - use
+    read_prompts() for copies you can modify and write back.
+
+    With lazy=True, and no full parse already cached, rows come from
+    prompt_index.load_light(): the short columns are loaded from a sidecar
+    and Full_Prompt/Notes are parsed per row only when accessed. Use this
+    for list, filter and stats code that doesn't need the prose.
+    """
+    path = Path(csv_path or CSV_PATH).resolve()
+    stamp = library_stamp(path, verify_hash)
+
+    cached = _cache.get(path)
+    if cached and cached[0] == stamp:
+        prompt_profile.count('load.cache_hit')
+        return cached[1]
+
+    if lazy:
+        cached = _lazy_cache.get(path)
+        if cached and cached[0] == stamp:
+            prompt_profile.count('load.cache_hit')
+            return cached[1]
+        from prompt_index import load_light
+        with prompt_profile.span('load', source='lazy') as timing, library_lock(path):
+            rows = _replay_journal(load_light(path), path)
+            timing.add('rows', len(rows))
+        _lazy_cache[path] = (stamp, rows)
+        return rows
+
+    from prompt_snapshot import load as load_snapshot, save as save_snapshot
+    with prompt_profile.span('load') as timing, library_lock(path):
+        with prompt_profile.span('load.snapshot'):
+            base = load_snapshot(path)
+        if base is None:
+            with prompt_profile.span('parse') as parsing, open(path, 'r', encoding='utf-8') as f:
+                base = from_rows(csv.DictReader(f))
+                parsing.add('rows', len(base))
+            with prompt_profile.span('write.snapshot'):
+                save_snapshot(base, path)
+        with prompt_profile.span('load.journal'):
+            rows = _replay_journal(base, path)
+        timing.add('rows', len(rows))
+
+    _cache[path] = (stamp, rows)
+    return rows
+
+
+def iter_prompts(csv_path: Optional[Path] = None,
+                 stream: Optional[bool] = None) -> Iterator[Mapping[str, str]]:
+    """
+    Yield the library's rows one at a time, with journalled updates applied.
+
+    By default the cached library is used if this process already has a
+    fresh copy. Otherwise the CSV is read row by row and nothing is cached,
+    so memory stays constant however large the file is. stream=True always
+    reads from disk; stream=False loads (and caches) the whole library
+    first. Stopping early (break, islice) stops reading the file.
+
+    The file is opened once, so a concurrent rewrite (which replaces the
+    file) doesn't affect an iteration already in progress.
+    """
+    path = Path(csv_path or CSV_PATH).resolve()
+
+    if stream is not True:
+        if stream is None:
+            stamp = library_stamp(path)
+            cached = _cache.get(path) or _lazy_cache.get(path)
+            rows = cached[1] if cached and cached[0] == stamp else None
+        else:
+            rows = load_prompts(path)
+        if rows is not None:
+            yield from rows
+            return
+
+    with library_lock(path):
+        f = open(path, 'r', encoding='utf-8')
+        pending = prompt_journal.replay(path)
 
-CSV_PATH = Path(__file__).parent.parent / "programming_music_prompts.csv"
+    with f:
+        for prompt in prompt_profile.track('parse.stream', iter_rows(csv.DictReader(f))):
+            changes = pending.get(prompt['Prompt_ID'])
+            yield Prompt({**prompt, **changes}) if changes else prompt
 
 
-def read_prompts() -> List[Dict[str, str]]:
-    """Read all prompts from CSV."""
-    with open(CSV_PATH, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        return list(reader)
+def read_prompts(csv_path: Optional[Path] = None) -> List[Dict[str, str]]:
+    """Read all prompts from CSV (as modifiable copies of the cached rows)."""
+    return [dict(prompt) for prompt in load_prompts(csv_path)]
 
 
-def write_prompts(prompts: List[Dict[str, str]]):
-    """Write prompts back to CSV."""
+def read_influences(csv_path: Optional[Path] = None) -> List[Dict[str, str]]:
+    """Read influences_library.csv (Influence_ID, Category, Name, Elements_To_Use, ...)."""
+    with open(csv_path or INFLUENCES_PATH, 'r', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+def write_prompts(prompts: List[Dict[str, str]], csv_path: Optional[Path] = None):
+    """
+    Write prompts back to CSV.
+
+    The file is replaced atomically (temp file, fsync, rename) under the
+    exclusive library lock, and the change journal is cleared, since
+    prompts already include its changes.
+    Surplus values on over-long rows (which DictReader stores under the
+    None key) are written back after the named columns, so a read/write
+    round-trip never drops data.
+    """
     if not prompts:
         raise ValueError("Cannot write empty prompts list")
 
-    fieldnames = list(prompts[0].keys())
-
-    with open(CSV_PATH, 'w', encoding='utf-8', newline='') as f:
-        writer = csv.DictWriter(f, fieldnames=fieldnames)
-        writer.writeheader()
-        writer.writerows(prompts)
+    path = Path(csv_path or CSV_PATH)
+    fieldnames = [key for key in prompts[0].keys() if key is not None]
+
+    with prompt_profile.span('serialize', rows=len(prompts)):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator='\n')
+        writer.writerow(fieldnames)
+        for prompt in prompts:
+            writer.writerow([prompt.get(field) for field in fieldnames] + list(prompt.get(None) or []))
+        data = buffer.getvalue().encode('utf-8')
+
+    from prompt_snapshot import save as save_snapshot
+    with prompt_profile.span('write', bytes=len(data)), library_lock(path, exclusive=True):
+        write_atomic(path, data)
+        with prompt_profile.span('write.snapshot'):
+            save_snapshot(prompts, path, data=data, written=True)
+        prompt_journal.clear(path)
+        bump_version(path)
+    invalidate(path)
+
+
+def _cached_prompt(path: Path, prompt_id: str) -> Optional[Mapping[str, str]]:
+    """Look up an ID in a fresh in-process cache; raises LookupError if there is none."""
+    cached = _cache.get(path)
+    if cached is None or cached[0] != library_stamp(path):
+        raise LookupError(path)
+
+    rows = cached[1]
+    by_id = _id_maps.get(path)
+    if by_id is None or by_id[0] is not rows:
+        by_id = (rows, {})
+        for prompt in reversed(rows):
+            by_id[1][prompt['Prompt_ID']] = prompt
+        _id_maps[path] = by_id
+    return by_id[1].get(prompt_id)
 
 
 def get_prompt(prompt_id: str) -> Optional[Dict[str, str]]:
-    """Get a single prompt by ID."""
-    prompts = read_prompts()
-    for prompt in prompts:
-        if prompt['Prompt_ID'] == prompt_id:
-            return prompt
-    return None
+    """
+    Get a single prompt by ID.
 
+    Uses the parsed library if this process already has it cached;
+    otherwise reads just the one record through the byte-offset index
+    (see prompt_index.py) and applies any journalled changes to it. With
+    PROMPTS_BACKEND=sqlite it is a primary key lookup in prompt_db.
+    """
+    if BACKEND == 'sqlite':
+        from prompt_db import get_prompt as get_db_prompt
+        return get_db_prompt(prompt_id)
 
-def update_prompt(prompt_id: str, updates: Dict[str, str]):
-    """Update specific fields for a prompt."""
-    prompts = read_prompts()
-    found = False
+    path = Path(CSV_PATH).resolve()
+
+    try:
+        prompt = _cached_prompt(path, prompt_id)
+        prompt_profile.count('lookup.cache_hit')
+        return dict(prompt) if prompt is not None else None
+    except LookupError:
+        pass
+
+    from prompt_index import lookup
+    with prompt_profile.span('lookup', source='index'), library_lock(path):
+        prompt = lookup(prompt_id, path)
+        if prompt is not None:
+            prompt.update(prompt_journal.replay(path).get(prompt_id, {}))
+    return prompt
 
-    for prompt in prompts:
-        if prompt['Prompt_ID'] == prompt_id:
-            prompt.update(updates)
-            found = True
-            break
 
-    if not found:
+def update_prompt(prompt_id: str, updates: Dict[str, str]):
+    """Update specific fields for a prompt."""
+    if update_prompts({prompt_id: updates}):
         raise ValueError(f"Prompt {prompt_id} not found")
 
-    write_prompts(prompts)
     print(f"✅ Updated Prompt {prompt_id}: {updates}")
 
 
+def update_prompts(updates: Dict[str, Dict[str, str]],
+                   expected_version: Optional[int] = None) -> List[str]:
+    """
+    Apply updates to many prompts as one batch.
+
+    The CSV is rewritten once for the whole batch (one read, one write).
+    Inside prompt_journal.deferred() - batch mode, the daemon - the batch
+    is instead appended to the change journal as a single durable write
+    and folded into the CSV when the block ends.
+
+    The whole read-modify-write runs under the exclusive library lock, so
+    concurrent writers queue up instead of losing each other's changes.
+
+    Args:
+        updates: Maps each prompt ID to the fields to change on it
+        expected_version: Only apply if library_version() still equals
+            this; see prompt_lock.update_with_retry()
+
+    Returns:
+        IDs that were not found. The rest of the batch is still applied.
+
+    Raises:
+        VersionConflict: If expected_version is stale
+
+    Examples:
+        update_prompts({'40': {'Generated': 'Yes'}, '41': {'Generated': 'Yes'}})
+        update_prompts({'40': {'Rating': 'Excellent ⭐', 'Notes': 'Keeper'}})
+    """
+    from prompt_db import apply_changes as apply_db_changes
+    from prompt_fitness import apply_changes as apply_fitness_changes
+    from prompt_lineage import apply_changes as apply_lineage_changes
+    from prompt_stats import apply_changes
+    from search_index import apply_changes as apply_search_changes
+
+    path = Path(CSV_PATH)
+    with prompt_profile.span('update', rows=len(updates)), library_lock(path, exclusive=True):
+        if expected_version is not None:
+            current = library_version(path)
+            if current != expected_version:
+                raise VersionConflict(expected_version, current)
+
+        before_stamp = library_stamp(path)
+        missing = []
+        changed = []
+
+        if not prompt_journal.deferring():
+            prompts = read_prompts()
+            pending = dict(updates)
+            for prompt in prompts:
+                changes = pending.pop(prompt['Prompt_ID'], None)
+                if changes is not None:
+                    changed.append((dict(prompt), prompt))
+                    prompt.update(changes)
+            if changed:
+                write_prompts(prompts)
+                apply_changes(changed, before_stamp)
+                apply_fitness_changes(changed, before_stamp)
+                apply_lineage_changes(changed, before_stamp)
+                apply_db_changes(changed, before_stamp)
+                apply_search_changes(changed, before_stamp)
+            return list(pending)
+
+        applied = {}
+        for prompt_id, changes in updates.items():
+            old = get_prompt(prompt_id)
+            if old is None:
+                missing.append(prompt_id)
+                continue
+            applied[prompt_id] = dict(changes)
+            changed.append((old, {**old, **changes}))
+
+        if applied:
+            with prompt_profile.span('write.journal', rows=len(applied)):
+                prompt_journal.append(path, applied)
+            bump_version(path)
+            apply_changes(changed, before_stamp)
+            apply_fitness_changes(changed, before_stamp)
+            apply_lineage_changes(changed, before_stamp)
+            apply_db_changes(changed, before_stamp)
+            apply_search_changes(changed, before_stamp)
+            if prompt_journal.journal_size(path) > prompt_journal.JOURNAL_COMPACT_BYTES:
+                prompt_journal.compact(path)
+
+    return missing
+
+
 def mark_generated(prompt_id: str):
     """Mark a prompt as generated."""
     update_prompt(prompt_id, {'Generated': 'Yes'})
@@ -70,101 +415,129 @@ def add_rating(prompt_id: str, rating: str):
     update_prompt(prompt_id, {'Rating': rating})
 
 
-def find_prompts(**filters) -> List[Dict[str, str]]:
+def _matches(prompt: Mapping[str, str], filters: Dict) -> bool:
+    for key, value in filters.items():
+        actual = prompt.get(key)
+        if not isinstance(value, str):
+            actual = typed_value(key, actual)
+        if actual != value:
+            return False
+    return True
+
+
+def iter_find_prompts(limit: Optional[int] = None, stream: Optional[bool] = False,
+                      **filters) -> Iterator[Mapping[str, str]]:
+    """
+    Yield prompts matching filters (see find_prompts) as they are found.
+
+    Reading stops once limit matches have been yielded. With stream=True the
+    CSV is read row by row instead of through the cached library, in
+    constant memory. stream=None streams only if this process has no fresh
+    copy of the library (see iter_prompts), which suits a small limit.
+    With PROMPTS_BACKEND=sqlite the database answers instead.
+    """
+    if BACKEND == 'sqlite':
+        from prompt_db import find_prompts as find_db_prompts
+        return iter(find_db_prompts(limit=limit, **filters))
+    source = iter_prompts(stream=stream or None) if stream is not False else load_prompts(lazy=True)
+    source = prompt_profile.track('scan', source, 'scanned')
+    matches = (prompt for prompt in source if _matches(prompt, filters))
+    return prompt_profile.track('filter', islice(matches, limit), 'returned')
+
+
+def find_prompts(limit: Optional[int] = None, stream: bool = False,
+                 **filters) -> List[Mapping[str, str]]:
     """
     Find prompts matching filters.
 
+    String values match the column text exactly; other values are compared
+    against the typed column (int BPM, bool Generated).
+
+    Matches are the library's read-only rows (see load_prompts), so
+    Full_Prompt and Notes are only parsed for rows that read them. Use
+    dict(row) for a copy you can modify.
+
+    Args:
+        limit: Return at most this many matches (stops reading once found)
+        stream: Read the CSV row by row in constant memory instead of
+            loading the library (for very large exports)
+
     Examples:
         find_prompts(Time_Block="Midday Refresh")
         find_prompts(Generated="Yes", Rating="")  # Generated but not rated
+        find_prompts(BPM=108, Generated=True)
+        find_prompts(limit=5, stream=True, Generated="")
     """
-    prompts = read_prompts()
-    results = []
+    return list(iter_find_prompts(limit=limit, stream=stream, **filters))
 
-    for prompt in prompts:
-        match = True
-        for key, value in filters.items():
-            if prompt.get(key) != value:
-                match = False
-                break
-        if match:
-            results.append(prompt)
 
-    return results
+def iter_search_prompts(text: str, fields: Optional[List[str]] = None, limit: Optional[int] = None,
+                        stream: Optional[bool] = False) -> Iterator[Mapping[str, str]]:
+    """
+    Yield prompts containing text (see search_prompts) as they are found.
+
+    Reading stops once limit matches have been yielded; stream=True reads
+    the CSV row by row in constant memory, and stream=None does so only
+    without a fresh cached copy (as in iter_find_prompts). With
+    PROMPTS_BACKEND=sqlite the database answers instead.
+    """
+    if BACKEND == 'sqlite':
+        from prompt_db import search_prompts as search_db_prompts
+        return iter(search_db_prompts(text, fields=fields, limit=limit))
+
+    text_lower = text.lower()
+
+    def found(prompt: Mapping[str, str]) -> bool:
+        search_fields = fields if fields else [key for key in prompt.keys() if key is not None]
+        return any(text_lower in (prompt.get(field) or '').lower() for field in search_fields)
+
+    source = iter_prompts(stream=stream or None) if stream is not False else load_prompts()
+    source = prompt_profile.track('scan', source, 'scanned')
+    matches = (prompt for prompt in source if found(prompt))
+    return prompt_profile.track('filter', islice(matches, limit), 'returned')
 
 
-def search_prompts(text: str, fields: Optional[List[str]] = None) -> List[Dict[str, str]]:
+def search_prompts(text: str, fields: Optional[List[str]] = None,
+                   ranked: bool = False, limit: Optional[int] = None,
+                   stream: bool = False) -> List[Mapping[str, str]]:
     """
     Search for text in prompts.
 
     Args:
         text: Text to search for (case-insensitive)
         fields: List of field names to search in. If None, searches all fields.
+        ranked: Treat text as a word query against the inverted index
+            (see search_index.py) and return results best match first.
+        limit: Return at most this many results
+        stream: Scan the CSV row by row in constant memory (substring
+            search only)
 
     Examples:
         search_prompts("saxophone")
         search_prompts("mellotron", fields=["Key_Instruments", "Notes"])
+        search_prompts('"brushed drums" OR mellotron', ranked=True)
+        search_prompts("rhodes", limit=3)
     """
-    prompts = read_prompts()
-    results = []
-    text_lower = text.lower()
-
-    for prompt in prompts:
-        found = False
-        search_fields = fields if fields else prompt.keys()
-
-        for field in search_fields:
-            if field in prompt and text_lower in prompt[field].lower():
-                found = True
-                break
-
-        if found:
-            results.append(prompt)
+    if ranked:
+        from search_index import search
+        return search(text, fields=fields, limit=limit)
 
-    return results
+    return list(iter_search_prompts(text, fields=fields, limit=limit, stream=stream))
 
 
 def get_stats() -> Dict[str, int]:
-    """Get statistics about the prompts."""
-    prompts = read_prompts()
-
-    stats = {
-        'total': len(prompts),
-        'generated': len([p for p in prompts if p.get('Generated') == 'Yes']),
-        'rated': len([p for p in prompts if p.get('Rating') and p['Rating'].strip()]),
-        'excellent': len([p for p in prompts if '⭐' in p.get('Rating', '')]),
-    }
-
-    # Count by time block
-    time_blocks = {}
-    for prompt in prompts:
-        block = prompt.get('Time_Block', 'Unknown')
-        time_blocks[block] = time_blocks.get(block, 0) + 1
-
-    stats['by_time_block'] = time_blocks
-
-    return stats
-
-
-def print_prompt(prompt: Dict[str, str], verbose: bool = False):
-    """Pretty print a prompt."""
-    print(f"\n{'='*60}")
-    print(f"Prompt {prompt['Prompt_ID']}: {prompt['Time_Block']}")
-    print(f"{'='*60}")
-    print(f"BPM: {prompt['BPM']} | {prompt['Brain_Wave_Target']}")
-    print(f"Genres: {prompt['Primary_Genres']}")
-    print(f"Instruments: {prompt['Key_Instruments']}")
-
-    if verbose:
-        print(f"\nMood: {prompt['Mood_Keywords']}")
-        print(f"\nSuno Prompt:\n{prompt['Suno_Short_Prompt']}")
-        print(f"\nFull Description:\n{prompt['Full_Prompt']}")
-
-    print(f"\nNotes: {prompt['Notes']}")
-    print(f"Generated: {prompt['Generated']}")
-
-    if prompt.get('Rating') and prompt['Rating'].strip():
-        print(f"Rating: {prompt['Rating']}")
+    """
+    Get statistics about the prompts.
+
+    Served from the persisted prompt_stats view, which update_prompts()
+    keeps current by deltas (rebuilt in one pass if the CSV changed some
+    other way). Besides the totals and by_time_block counts it includes
+    block_by_rating, bpm_by_block, rating_distribution, instruments,
+    genres, average_bpm and funnel.
+    """
+    from prompt_stats import stats_view
+    with prompt_profile.span('stats'):
+        return stats_view().as_dict()
 
 
 if __name__ == "__main__":
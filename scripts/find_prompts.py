@@ -5,58 +5,143 @@ Find prompts by various criteria.
 Usage:
     python find_prompts.py --time-block "Midday Refresh"
     python find_prompts.py --bpm 108
+    python find_prompts.py --bpm 100-110
     python find_prompts.py --generated no
     python find_prompts.py --rated yes
     python find_prompts.py --excellent
     python find_prompts.py --search "saxophone"
+    python find_prompts.py --rank '"brushed drums" rhodes'
+    python find_prompts.py --query 'generated:yes rated:no bpm:<100 sort:bpm'
+    python find_prompts.py --generated no --limit 5
+    python find_prompts.py --rated no --format jsonl --fields Prompt_ID,BPM --offset 10 --limit 10
+
+--limit N stops reading as soon as N matches are found. --format, --fields,
+--offset and --limit are described in prompt_output.py.
+
+The library modules are imported only when no daemon answers, so a
+request the daemon serves doesn't pay for loading them.
 """
 
 import sys
-from csv_utils import find_prompts, search_prompts, print_prompt
+from itertools import islice
+import prompt_profile
+from prompt_daemon import with_daemon
+from prompt_output import parse_output_args, write_rows
+
+
+def run_query(text: str, limit=None):
+    """Run a prompt_query query (through the daemon if running), capping results at limit."""
+    def query_directly():
+        from prompt_query import query_prompts
+        return query_prompts(text, limit=limit)
+    return with_daemon('query', query_directly, query=text, limit=limit)
+
+
+def find_directly(filters, limit=None, stream=False):
+    from csv_utils import iter_find_prompts
+    return iter_find_prompts(limit=limit, stream=stream, **filters)
+
+
+def search_directly(text, limit=None, stream=False, ranked=False):
+    from csv_utils import iter_search_prompts, search_prompts
+    if ranked:
+        return search_prompts(text, ranked=True, limit=limit)
+    return iter_search_prompts(text, limit=limit, stream=stream)
+
+
+def scan_matches(predicate, limit=None):
+    """Rows of the lazily loaded library that satisfy predicate, up to limit."""
+    from csv_utils import load_prompts
+    source = prompt_profile.track('scan', load_prompts(lazy=True), 'scanned')
+    matches = islice((p for p in source if predicate(p)), limit)
+    return prompt_profile.track('filter', matches, 'returned')
+
+
+def starred_prompts(limit=None):
+    """⭐ prompts in ID order, up to limit, looked up from the fitness index."""
+    from csv_utils import get_prompt
+    from prompt_fitness import fitness_view
+    return (get_prompt(prompt_id) for prompt_id in fitness_view().starred()[:limit])
+
+
+def fetch(args, limit=None):
+    """
+    Return matching prompts for the command-line criteria, up to limit,
+    or None if the criteria aren't recognized.
+
+    Without the daemon, the find, search, --rated and --excellent options
+    return generators, so rows arrive as they are found. With a limit, find
+    and search stream the CSV unless the library is already cached, so the
+    read stops at the last match. --excellent reads the ⭐ IDs from the
+    fitness index instead of scanning ratings.
+    """
+    arg = args[0] if args else ''
+    # Stream from disk when a limit may end the read early
+    stream = None if limit is not None else False
+
+    if arg == '--time-block' and len(args) > 1:
+        filters = {'Time_Block': args[1]}
+        return with_daemon('find', lambda: find_directly(filters, limit, stream), filters=filters, limit=limit)
+
+    if arg == '--bpm' and len(args) > 1:
+        return run_query(f"bpm:{args[1]}", limit)
+
+    if arg == '--generated':
+        value = 'Yes' if len(args) < 2 or args[1].lower() == 'yes' else ''
+        filters = {'Generated': value}
+        return with_daemon('find', lambda: find_directly(filters, limit, stream), filters=filters, limit=limit)
+
+    if arg == '--rated':
+        rated = not (len(args) > 1 and args[1].lower() == 'no')
+        # Rated means a non-blank Rating
+        is_match = lambda p: bool((p.get('Rating') or '').strip()) == rated
+        query = f"rated:{'yes' if rated else 'no'}"
+        return with_daemon('query', lambda: scan_matches(is_match, limit), query=query, limit=limit)
+
+    if arg == '--excellent':
+        return with_daemon('query', lambda: starred_prompts(limit), query='excellent:yes', limit=limit)
+
+    if arg == '--search' and len(args) > 1:
+        return with_daemon('search', lambda: search_directly(args[1], limit, stream), text=args[1], limit=limit)
+
+    if arg == '--rank' and len(args) > 1:
+        return with_daemon('search', lambda: search_directly(args[1], limit, ranked=True),
+                           text=args[1], ranked=True, limit=limit)
+
+    if arg == '--query' and len(args) > 1:
+        return run_query(args[1], limit)
+
+    return None
+
 
 def main():
     if len(sys.argv) < 2:
         print("Usage:")
         print("  python find_prompts.py --time-block <block_name>")
-        print("  python find_prompts.py --bpm <bpm>")
+        print("  python find_prompts.py --bpm <bpm>|<low>-<high>")
         print("  python find_prompts.py --generated yes|no")
         print("  python find_prompts.py --rated yes|no")
         print("  python find_prompts.py --excellent")
         print("  python find_prompts.py --search <text>")
+        print("  python find_prompts.py --rank <query>   (ranked; AND, OR, \"phrases\")")
+        print("  python find_prompts.py --query <query>  (see prompt_query.py)")
+        print("  add --limit <n> to any of these to stop after n matches")
+        print("  add --format json|jsonl|tsv, --fields <a,b,...>, --offset <n> for machine output")
         sys.exit(1)
 
-    arg = sys.argv[1]
-    results = []
-
-    if arg == '--time-block' and len(sys.argv) > 2:
-        results = find_prompts(Time_Block=sys.argv[2])
-
-    elif arg == '--bpm' and len(sys.argv) > 2:
-        results = find_prompts(BPM=sys.argv[2])
-
-    elif arg == '--generated':
-        value = 'Yes' if len(sys.argv) < 3 or sys.argv[2].lower() == 'yes' else ''
-        results = find_prompts(Generated=value)
-
-    elif arg == '--rated':
-        if len(sys.argv) > 2 and sys.argv[2].lower() == 'no':
-            # Find prompts without ratings
-            all_prompts = find_prompts()
-            results = [p for p in all_prompts if not p.get('Rating') or not p['Rating'].strip()]
-        else:
-            # Find prompts with ratings
-            all_prompts = find_prompts()
-            results = [p for p in all_prompts if p.get('Rating') and p['Rating'].strip()]
-
-    elif arg == '--excellent':
-        all_prompts = find_prompts()
-        results = [p for p in all_prompts if '⭐' in p.get('Rating', '')]
-
-    elif arg == '--search' and len(sys.argv) > 2:
-        results = search_prompts(sys.argv[2])
-
-    else:
-        print(f"❌ Unknown argument: {arg}")
+    try:
+        options, args = parse_output_args(sys.argv[1:])
+        results = fetch(args, options.fetch_limit())
+        if results is None:
+            print(f"❌ Unknown argument: {args[0] if args else ''}")
+            sys.exit(1)
+        results = options.page(results)
+        if options.machine:
+            write_rows(results, options)
+            return
+        results = list(results)
+    except ValueError as e:
+        print(f"❌ {e}")
         sys.exit(1)
 
     if not results:
@@ -70,4 +155,4 @@ def main():
             print(f"         └─ {prompt['Rating']}")
 
 if __name__ == "__main__":
-    main()
+    prompt_profile.run(main)
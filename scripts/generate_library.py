@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic prompt library for benchmarking.
+
+Rows follow the column formats in docs/csv-schema.md, with value
+distributions learned from the real library. Time_Block frequencies carry
+over, and so do BPM, Brain_Wave_Target, Duration_Type and Full_Prompt
+drawn per Time_Block. Genre, instrument and mood vocabularies and
+list lengths come from the real data, as do the Generated ratio and
+Rating texts. Notes carry lineage references ("Clone of #12", "Hybrid:
+#4 + #9", ...) to earlier rows, and about 2% of IDs are BONUS-N.
+
+Rows are written as they are generated, so memory stays flat even for
+1M prompts. Output is deterministic for a given seed.
+
+Usage:
+    python generate_library.py 1k /tmp/library-1k.csv
+    python generate_library.py 100k /tmp/library-100k.csv --seed 7
+    python generate_library.py 1M /tmp/library-1m.csv
+
+    CSV_PATH=/tmp/library-100k.csv python stats.py   # point any script at it
+"""
+
+import csv
+import random
+import re
+import sys
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+import csv_utils
+import prompt_profile
+
+SIZES = {'1k': 1_000, '10k': 10_000, '100k': 100_000, '1m': 1_000_000}
+
+BONUS_RATE = 0.02
+
+# Lineage note styles and how often each is used
+NOTE_STYLES = [('clone', 20), ('parent', 10), ('hybrid', 20), ('mutation', 30), ('based', 5), ('plain', 15)]
+
+_BPM_RE = re.compile(r'\b\d{2,3} BPM')
+
+
+def parse_size(text: str) -> int:
+    """Parse 1k / 100k / 1M (or a plain number) into a row count."""
+    lowered = text.lower()
+    if lowered in SIZES:
+        return SIZES[lowered]
+    if lowered.endswith('k') and lowered[:-1].isdigit():
+        return int(lowered[:-1]) * 1_000
+    if lowered.endswith('m') and lowered[:-1].isdigit():
+        return int(lowered[:-1]) * 1_000_000
+    return int(text)
+
+
+class _Weighted:
+    """Fast repeated weighted sampling from observed values."""
+
+    def __init__(self, values: Sequence):
+        counts = Counter(values)
+        self.values = list(counts)
+        self.cum_weights = []
+        total = 0
+        for value in self.values:
+            total += counts[value]
+            self.cum_weights.append(total)
+
+    def pick(self, rng: random.Random):
+        return rng.choices(self.values, cum_weights=self.cum_weights)[0]
+
+    def sample(self, rng: random.Random, k: int) -> List:
+        """k distinct values (fewer if the vocabulary is smaller)."""
+        picked = []
+        for value in rng.choices(self.values, cum_weights=self.cum_weights, k=k * 3):
+            if value not in picked:
+                picked.append(value)
+                if len(picked) == k:
+                    break
+        return picked
+
+
+def _items(text: Optional[str]) -> List[str]:
+    return [item.strip() for item in (text or '').split(',') if item.strip()]
+
+
+class LibraryModel:
+    """Per-column value distributions learned from an existing library."""
+
+    def __init__(self, prompts: Sequence):
+        self.fieldnames = [key for key in prompts[0].keys() if key is not None]
+        self.blocks = _Weighted([p['Time_Block'] for p in prompts])
+
+        by_block = defaultdict(list)
+        for prompt in prompts:
+            by_block[prompt['Time_Block']].append(prompt)
+        self.bpms = {block: _Weighted([p['BPM'] for p in rows if (p['BPM'] or '').isdigit()] or ['100'])
+                     for block, rows in by_block.items()}
+        self.waves = {block: _Weighted([p['Brain_Wave_Target'] for p in rows]) for block, rows in by_block.items()}
+        self.durations = {block: _Weighted([p['Duration_Type'] for p in rows]) for block, rows in by_block.items()}
+        self.full_prompts = {block: [p['Full_Prompt'] for p in rows] for block, rows in by_block.items()}
+
+        self.genres = _Weighted([item for p in prompts for item in _items(p['Primary_Genres'])])
+        self.genre_counts = _Weighted([max(1, len(_items(p['Primary_Genres']))) for p in prompts])
+        self.instruments = _Weighted([item for p in prompts for item in _items(p['Key_Instruments'])])
+        self.instrument_counts = _Weighted([max(1, len(_items(p['Key_Instruments']))) for p in prompts])
+        self.moods = _Weighted([word for p in prompts for word in (p['Mood_Keywords'] or '').split()])
+        self.mood_counts = _Weighted([max(1, len((p['Mood_Keywords'] or '').split())) for p in prompts])
+
+        self.generated = _Weighted(['Yes' if p['Generated'] == 'Yes' else '' for p in prompts])
+        self.ratings = _Weighted([p['Rating'] or '' for p in prompts])
+        self.plain_notes = [p['Notes'] for p in prompts if p['Notes'] and '#' not in p['Notes']] or ['']
+        self.note_styles = _Weighted([style for style, weight in NOTE_STYLES for _ in range(weight)])
+
+    @classmethod
+    def from_csv(cls, csv_path: Path) -> 'LibraryModel':
+        with open(csv_path, 'r', encoding='utf-8') as f:
+            return cls(list(csv.DictReader(f)))
+
+    def _note(self, rng: random.Random, numeric_ids: int, instruments: List[str], bpm: int) -> str:
+        if numeric_ids < 2:
+            return rng.choice(self.plain_notes)
+        parent = rng.randint(1, numeric_ids)
+        style = self.note_styles.pick(rng)
+        if style == 'clone':
+            label = rng.choice(['very good', 'pretty good', 'excellent ⭐'])
+            return f"Clone of #{parent} ({label}). Adjusted to {bpm} BPM."
+        if style == 'parent':
+            return f"Parent #{parent} clone (proven DNA)"
+        if style == 'hybrid':
+            other = rng.randint(1, numeric_ids)
+            return rng.choice([f"Hybrid: #{parent} + #{other}", f"Hybrid of #{parent} + #{other}"])
+        if style == 'mutation':
+            return f"Mutation: {instruments[0]} (Prompt #{parent} DNA)"
+        if style == 'based':
+            return f"Based on Prompt #{parent} formula"
+        return rng.choice(self.plain_notes)
+
+    def rows(self, count: int, seed: int = 0):
+        """Yield count synthetic rows as dicts."""
+        rng = random.Random(seed)
+        numeric_ids = 0
+        bonus_ids = 0
+
+        for _ in range(count):
+            if numeric_ids and rng.random() < BONUS_RATE:
+                bonus_ids += 1
+                prompt_id = f"BONUS-{bonus_ids}"
+            else:
+                numeric_ids += 1
+                prompt_id = str(numeric_ids)
+
+            block = self.blocks.pick(rng)
+            bpm = min(122, max(75, int(self.bpms[block].pick(rng)) + rng.randint(-2, 2)))
+            genres = self.genres.sample(rng, self.genre_counts.pick(rng))
+            instruments = self.instruments.sample(rng, self.instrument_counts.pick(rng))
+            moods = self.moods.sample(rng, self.mood_counts.pick(rng))
+
+            yield {
+                'Prompt_ID': prompt_id,
+                'Time_Block': block,
+                'BPM': str(bpm),
+                'Brain_Wave_Target': self.waves[block].pick(rng),
+                'Duration_Type': self.durations[block].pick(rng),
+                'Primary_Genres': ', '.join(genres),
+                'Key_Instruments': ', '.join(instruments),
+                'Mood_Keywords': ' '.join(moods),
+                'Suno_Short_Prompt': f"{', '.join(genres)}, {', '.join(instruments)}, {bpm} BPM, instrumental",
+                'Full_Prompt': _BPM_RE.sub(f"{bpm} BPM", rng.choice(self.full_prompts[block])),
+                'Notes': self._note(rng, numeric_ids - 1, instruments, bpm),
+                'Generated': self.generated.pick(rng),
+                'Suno_Refined': '',
+                'Rating': self.ratings.pick(rng),
+            }
+
+
+def generate(count: int, output: Path, seed: int = 0, source: Optional[Path] = None) -> Path:
+    """Write a synthetic library of count prompts to output."""
+    model = LibraryModel.from_csv(source or csv_utils.DEFAULT_CSV_PATH)
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+
+    with open(output, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f, lineterminator='\n')
+        writer.writerow(model.fieldnames)
+        for row in model.rows(count, seed):
+            writer.writerow([row.get(field, '') for field in model.fieldnames])
+    return output
+
+
+def main():
+    args = sys.argv[1:]
+    seed = 0
+    if '--seed' in args:
+        position = args.index('--seed')
+        seed = int(args[position + 1])
+        del args[position:position + 2]
+
+    if not args:
+        print("Usage: python generate_library.py <1k|100k|1M|count> [output.csv] [--seed N]")
+        sys.exit(1)
+
+    try:
+        count = parse_size(args[0])
+    except ValueError:
+        print(f"❌ Invalid size: {args[0]}")
+        sys.exit(1)
+    output = Path(args[1]) if len(args) > 1 else Path(f"synthetic_{args[0].lower()}.csv")
+
+    generate(count, output, seed)
+    print(f"✅ Wrote {count} synthetic prompts to {output} ({output.stat().st_size / 1e6:.1f} MB)")
+
+if __name__ == "__main__":
+    prompt_profile.run(main)
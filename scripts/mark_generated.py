@@ -2,34 +2,84 @@
 """
 Mark one or more prompts as generated.
 
+All IDs are applied as one batch: the CSV is read and written once, and
+unknown IDs are reported without aborting the rest.
+
 Usage:
     python mark_generated.py 40
     python mark_generated.py 40 41 42
+    python mark_generated.py --file ids.txt      # one or more IDs per line, '-' for stdin
     python mark_generated.py --all
 """
 
 import sys
-from csv_utils import mark_generated, read_prompts, write_prompts
+from prompt_daemon import with_daemon
+import prompt_profile
+
+
+def update_prompts(updates):
+    from csv_utils import update_prompts
+    return update_prompts(updates)
+
+
+def mark_all() -> int:
+    """Mark every prompt as generated. Returns how many there are."""
+    import csv_utils
+    from prompt_lock import library_lock
+
+    # Hold the write lock across the read so no concurrent update is lost
+    with library_lock(csv_utils.CSV_PATH, exclusive=True):
+        prompts = csv_utils.read_prompts()
+        for prompt in prompts:
+            prompt['Generated'] = 'Yes'
+        csv_utils.write_prompts(prompts)
+    return len(prompts)
+
+
+def read_ids(path: str) -> list:
+    """Read whitespace-separated prompt IDs from a file, skipping # comments."""
+    f = sys.stdin if path == '-' else open(path, 'r', encoding='utf-8')
+    try:
+        ids = []
+        for line in f:
+            ids.extend(line.split('#', 1)[0].split())
+        return ids
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
 
 def main():
     if len(sys.argv) < 2:
         print("Usage: python mark_generated.py <prompt_id> [<prompt_id> ...]")
+        print("       python mark_generated.py --file <ids.txt|->")
         print("       python mark_generated.py --all")
         sys.exit(1)
 
     if sys.argv[1] == '--all':
-        prompts = read_prompts()
-        for prompt in prompts:
-            prompt['Generated'] = 'Yes'
-        write_prompts(prompts)
-        print(f"✅ Marked all {len(prompts)} prompts as Generated=Yes")
+        print(f"✅ Marked all {mark_all()} prompts as Generated=Yes")
+        return
+
+    if sys.argv[1] == '--file':
+        if len(sys.argv) < 3:
+            print("❌ --file needs a path (or - for stdin)")
+            sys.exit(1)
+        prompt_ids = read_ids(sys.argv[2])
     else:
         prompt_ids = sys.argv[1:]
-        for prompt_id in prompt_ids:
-            try:
-                mark_generated(prompt_id)
-            except ValueError as e:
-                print(f"❌ {e}")
+
+    missing = with_daemon(
+        'mark',
+        lambda: update_prompts({prompt_id: {'Generated': 'Yes'} for prompt_id in prompt_ids}),
+        prompt_ids=prompt_ids,
+    )
+
+    for prompt_id in missing:
+        print(f"❌ Prompt {prompt_id} not found")
+
+    marked = [prompt_id for prompt_id in dict.fromkeys(prompt_ids) if prompt_id not in missing]
+    if marked:
+        print(f"✅ Marked {len(marked)} prompt(s) as Generated=Yes: {', '.join(marked)}")
 
 if __name__ == "__main__":
-    main()
+    prompt_profile.run(main)
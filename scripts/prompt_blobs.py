@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Sidecar files of separately marshalled blobs, read on demand.
+
+Layout: the header's length, the marshalled header, then the blobs. The
+header holds whatever the owner stores up front (stamps, digests, ...)
+plus directories mapping keys to blob spans, so a reader unmarshals only
+the blobs it asks for. The file is memory-mapped, and rewriting it can
+copy untouched blobs over as raw bytes.
+
+search_index.py keeps a postings blob per term this way, and
+prompt_similar.py a postings blob per term and a vector per prompt.
+
+Example:
+    writer = BlobWriter()
+    writer.dump('terms', 'rhodes', postings)
+    csv_utils.write_atomic(path, writer.to_bytes(header))
+
+    header, blobs = read_blobs(path)
+    postings = blobs.load('terms', 'rhodes')
+"""
+
+import marshal
+import mmap
+import struct
+from pathlib import Path
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+_HEADER_SIZE = struct.Struct('<Q')
+
+
+class BlobReader:
+    """Blobs of one sidecar version, by directory name and key."""
+
+    def __init__(self, data: mmap.mmap, base: int, directories: Dict[str, Dict[Hashable, Tuple[int, int]]]):
+        self.data = data
+        self.base = base
+        # directory -> key -> (start, end) relative to base
+        self.directories = directories
+
+    def keys(self, directory: str) -> Iterable[Hashable]:
+        return self.directories.get(directory, {}).keys()
+
+    def raw(self, directory: str, key: Hashable) -> Optional[bytes]:
+        span = self.directories.get(directory, {}).get(key)
+        return self.data[self.base + span[0]:self.base + span[1]] if span else None
+
+    def load(self, directory: str, key: Hashable, default: Any = None) -> Any:
+        blob = self.raw(directory, key)
+        return marshal.loads(blob) if blob is not None else default
+
+
+class BlobWriter:
+    """Collects blobs for a new sidecar; to_bytes() lays out the file."""
+
+    def __init__(self):
+        self.blobs: List[bytes] = []
+        self.size = 0
+        self.directories: Dict[str, Dict[Hashable, Tuple[int, int]]] = {}
+
+    def put(self, directory: str, key: Hashable, blob: bytes):
+        """Add an already marshalled blob, e.g. BlobReader.raw() of an untouched one."""
+        self.directories.setdefault(directory, {})[key] = (self.size, self.size + len(blob))
+        self.blobs.append(blob)
+        self.size += len(blob)
+
+    def dump(self, directory: str, key: Hashable, value: Any):
+        self.put(directory, key, marshal.dumps(value))
+
+    def to_bytes(self, header: Any) -> bytes:
+        encoded = marshal.dumps((header, self.directories))
+        return b''.join([_HEADER_SIZE.pack(len(encoded)), encoded] + self.blobs)
+
+
+def read_blobs(path: Path) -> Tuple[Any, BlobReader]:
+    """
+    Open a sidecar written with BlobWriter and return (header, reader).
+
+    Raises:
+        OSError, ValueError, EOFError, TypeError, struct.error: If the file
+            is missing, empty or not a blob sidecar
+    """
+    with open(path, 'rb') as f:
+        data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    (size,) = _HEADER_SIZE.unpack_from(data)
+    base = _HEADER_SIZE.size + size
+    header, directories = marshal.loads(data[_HEADER_SIZE.size:base])
+    return header, BlobReader(data, base, directories)
@@ -0,0 +1,419 @@
+#!/usr/bin/env python3
+"""
+Long-running prompt library server.
+
+Each script invocation normally starts a fresh interpreter and reparses the
+CSV. The daemon keeps one process alive with the library, search index,
+query indexes and stats view already loaded, and answers requests over a
+Unix socket next to the CSV (programming_music_prompts.csv.sock).
+
+The protocol is one JSON object per line in each direction:
+
+    -> {"method": "show", "params": {"prompt_id": "40"}}
+    <- {"result": {"Prompt_ID": "40", ...}}
+    <- {"error": {"type": "VersionConflict", "module": "prompt_lock", "args": [3, 4], "message": "..."}}
+
+Errors are re-raised on the client as the same class - builtins and the
+library's own (VersionConflict, TimeoutError from the lock,
+FileNotFoundError, ...) - so callers see the same exceptions with or
+without a daemon.
+
+Methods: ping, show, find, search, query, similar, stats, rate, mark, update,
+shutdown.
+
+show_prompt.py, find_prompts.py, stats.py, add_rating.py and
+mark_generated.py go through the daemon when it is running and read the
+files directly when it isn't, with identical output either way. The
+client half of this module only needs the standard library, and those
+scripts import the library modules only on the direct path, so a request
+the daemon answers skips loading them. Set PROMPTS_DAEMON=0 to always use
+direct access.
+
+Writes go through the same locked csv_utils code paths, and every request
+revalidates the caches against the files, so the daemon and direct
+scripts can be mixed freely. The daemon journals writes (see
+prompt_journal.deferred()) and folds them into the CSV once it has been
+idle for IDLE_COMPACT_SECONDS, and when it stops.
+
+Usage:
+    python prompt_daemon.py start            # serve in the foreground
+    python prompt_daemon.py start --background
+    python prompt_daemon.py status
+    python prompt_daemon.py stop
+"""
+
+import builtins
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import prompt_profile
+
+SOCKET_SUFFIX = '.sock'
+DAEMON_ENABLED = os.environ.get('PROMPTS_DAEMON', '1') != '0'
+
+CONNECT_TIMEOUT = 0.5
+REQUEST_TIMEOUT = 60
+IDLE_COMPACT_SECONDS = float(os.environ.get('PROMPTS_DAEMON_IDLE_COMPACT', 2))
+
+# Methods whose results are prompt rows (or lists of them)
+ROW_METHODS = {'show', 'find', 'search', 'query', 'similar'}
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+
+class DaemonUnavailable(Exception):
+    """No daemon is serving this library."""
+
+
+def _library_path() -> Path:
+    """csv_utils.CSV_PATH, without importing csv_utils if nothing has yet."""
+    if 'csv_utils' in sys.modules:
+        return sys.modules['csv_utils'].CSV_PATH
+    if os.environ.get('CSV_PATH'):
+        return Path(os.environ['CSV_PATH'])
+    return SCRIPTS_DIR.parent / 'programming_music_prompts.csv'
+
+
+def socket_path(csv_path: Optional[Path] = None) -> Path:
+    """Socket location for a library (PROMPTS_DAEMON_SOCKET overrides it)."""
+    if csv_path is None and os.environ.get('PROMPTS_DAEMON_SOCKET'):
+        return Path(os.environ['PROMPTS_DAEMON_SOCKET'])
+    path = Path(csv_path or _library_path())
+    return path.with_name(path.name + SOCKET_SUFFIX)
+
+
+# --- errors --------------------------------------------------------------
+
+def _encode_error(error: Exception) -> Dict:
+    encoded = {'type': type(error).__name__, 'module': type(error).__module__, 'message': str(error)}
+    try:
+        json.dumps(error.args)
+        encoded['args'] = list(error.args)
+    except (TypeError, ValueError):
+        pass
+    return encoded
+
+
+def _error_class(module: str, name: str) -> Optional[type]:
+    """A builtin or library exception class by name; None for anything else."""
+    import importlib
+    import importlib.util
+
+    if module == 'builtins':
+        cls = getattr(builtins, name, None)
+    else:
+        spec = importlib.util.find_spec(module) if module.isidentifier() else None
+        if spec is None or not spec.origin or Path(spec.origin).resolve().parent != SCRIPTS_DIR:
+            return None
+        cls = getattr(importlib.import_module(module), name, None)
+    return cls if isinstance(cls, type) and issubclass(cls, Exception) else None
+
+
+def _decode_error(error: Dict) -> Exception:
+    """Rebuild a server-side exception as its own class, or RuntimeError if that's not possible."""
+    cls = _error_class(error.get('module', 'builtins'), error.get('type', ''))
+    if cls is not None:
+        try:
+            return cls(*error['args']) if 'args' in error else cls(error.get('message'))
+        except Exception:
+            pass
+    return RuntimeError(f"{error.get('type')}: {error.get('message')}")
+
+
+# --- row encoding --------------------------------------------------------
+# Surplus values on an over-long row live under the None key, which JSON
+# can't represent; they travel under '' (never a CSV column name).
+
+def _encode_row(row):
+    if row is None:
+        return None
+    row = dict(row)
+    if None in row:
+        row[''] = row.pop(None)
+    return row
+
+
+def _decode_row(row):
+    if row is not None and '' in row:
+        row[None] = row.pop('')
+    return row
+
+
+def _encode_rows(result):
+    return [_encode_row(row) for row in result] if isinstance(result, list) else _encode_row(result)
+
+
+def _decode_rows(result):
+    return [_decode_row(row) for row in result] if isinstance(result, list) else _decode_row(result)
+
+
+# --- client --------------------------------------------------------------
+
+def call(method: str, csv_path: Optional[Path] = None, **params):
+    """
+    Send one request to the daemon and return its result.
+
+    Raises:
+        DaemonUnavailable: If no daemon answers on the socket
+        Exception: Whatever the method itself raised, as the same class
+    """
+    if not hasattr(socket, 'AF_UNIX'):
+        raise DaemonUnavailable("Unix sockets are not supported here")
+
+    path = socket_path(csv_path)
+    request = json.dumps({'method': method, 'params': params}, ensure_ascii=False).encode('utf-8') + b'\n'
+
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(CONNECT_TIMEOUT)
+            sock.connect(str(path))
+            sock.settimeout(REQUEST_TIMEOUT)
+            sock.sendall(request)
+            with sock.makefile('rb') as f:
+                line = f.readline()
+    except OSError as e:
+        raise DaemonUnavailable(str(e))
+    if not line:
+        raise DaemonUnavailable("Daemon closed the connection")
+
+    response = json.loads(line)
+    if 'error' in response:
+        raise _decode_error(response['error'])
+
+    result = response.get('result')
+    return _decode_rows(result) if method in ROW_METHODS else result
+
+
+def with_daemon(method: str, fallback: Callable, **params):
+    """
+    Run a request through the daemon if one is serving the current
+    library, otherwise call fallback() to do the same work directly.
+
+    Example:
+        prompt = with_daemon('show', lambda: get_prompt('40'), prompt_id='40')
+    """
+    if DAEMON_ENABLED:
+        try:
+            with prompt_profile.span('daemon.call', method=method):
+                return call(method, **params)
+        except DaemonUnavailable:
+            pass
+    return fallback()
+
+
+# --- server --------------------------------------------------------------
+# The server half imports the library modules where it uses them, so the
+# client half above stays standard library only.
+
+def _ping() -> Dict:
+    import csv_utils
+    return {'pid': os.getpid(), 'csv': str(csv_utils.CSV_PATH),
+            'prompts': len(csv_utils.load_prompts(lazy=True))}
+
+
+def _show(prompt_id: str):
+    import csv_utils
+    return csv_utils.get_prompt(prompt_id)
+
+
+def _find(filters: Optional[Dict] = None, limit: Optional[int] = None) -> List[Dict[str, str]]:
+    import csv_utils
+    return csv_utils.find_prompts(limit=limit, **(filters or {}))
+
+
+def _search(text: str, fields: Optional[List[str]] = None, ranked: bool = False,
+            limit: Optional[int] = None) -> List[Dict[str, str]]:
+    import csv_utils
+    return csv_utils.search_prompts(text, fields=fields, ranked=ranked, limit=limit)
+
+
+def _query(query: str, limit: Optional[int] = None) -> List[Dict[str, str]]:
+    from prompt_query import query_prompts
+    return query_prompts(query, limit=limit)
+
+
+def _similar(prompt_id: str, k: int = 10) -> List[Dict[str, str]]:
+    from prompt_similar import similar_prompts
+    return similar_prompts(prompt_id, k)
+
+
+def _stats() -> Dict:
+    import csv_utils
+    return csv_utils.get_stats()
+
+
+def _rate(ratings: Dict[str, str]) -> List[str]:
+    import csv_utils
+    return csv_utils.update_prompts({prompt_id: {'Rating': rating} for prompt_id, rating in ratings.items()})
+
+
+def _mark(prompt_ids: List[str]) -> List[str]:
+    import csv_utils
+    return csv_utils.update_prompts({prompt_id: {'Generated': 'Yes'} for prompt_id in prompt_ids})
+
+
+def _update(updates: Dict[str, Dict[str, str]], expected_version: Optional[int] = None) -> List[str]:
+    import csv_utils
+    return csv_utils.update_prompts(updates, expected_version=expected_version)
+
+
+METHODS: Dict[str, Callable] = {
+    'ping': _ping,
+    'show': _show,
+    'find': _find,
+    'search': _search,
+    'query': _query,
+    'similar': _similar,
+    'stats': _stats,
+    'rate': _rate,
+    'mark': _mark,
+    'update': _update,
+}
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """Answers newline-delimited JSON requests until the client disconnects."""
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            self.wfile.write(self.server.dispatch(line))
+            self.wfile.flush()
+            if self.server.stopping:
+                return
+
+
+class PromptServer(socketserver.UnixStreamServer):
+    """Single-threaded server: requests run one at a time against one library."""
+
+    def __init__(self, path: Path):
+        self.stopping = False
+        # handle_request() gives up after this long without a request
+        self.timeout = IDLE_COMPACT_SECONDS
+        super().__init__(str(path), _Handler)
+
+    def handle_timeout(self):
+        """Idle: fold journalled writes into the CSV."""
+        import csv_utils
+        import prompt_journal
+        if prompt_journal.journal_size(csv_utils.CSV_PATH):
+            prompt_journal.compact()
+
+    def dispatch(self, line: bytes) -> bytes:
+        try:
+            request = json.loads(line)
+            method = request.get('method')
+            if method == 'shutdown':
+                self.stopping = True
+                response = {'result': True}
+            elif method not in METHODS:
+                raise ValueError(f"Unknown method: {method}")
+            else:
+                result = METHODS[method](**request.get('params', {}))
+                response = {'result': _encode_rows(result) if method in ROW_METHODS else result}
+        except Exception as e:
+            response = {'error': _encode_error(e)}
+        return json.dumps(response, ensure_ascii=False).encode('utf-8') + b'\n'
+
+
+def warm():
+    """Load everything the read methods use, so the first request is fast."""
+    import csv_utils
+    from prompt_query import get_indexes
+    from prompt_similar import get_index as get_similarity_index
+    from prompt_stats import stats_view
+    from search_index import get_index
+
+    csv_utils.load_prompts()
+    csv_utils.load_prompts(lazy=True)
+    get_index()
+    get_indexes()
+    get_similarity_index()
+    stats_view()
+
+
+def serve(path: Optional[Path] = None):
+    """Serve the current library until a shutdown request or SIGTERM."""
+    import prompt_journal
+    path = Path(path or socket_path())
+    try:
+        call('ping')
+        raise RuntimeError(f"A daemon is already serving {path}")
+    except DaemonUnavailable:
+        if path.exists():
+            path.unlink()  # stale socket from a daemon that died
+
+    warm()
+    server = PromptServer(path)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    try:
+        with prompt_journal.deferred():
+            while not server.stopping:
+                server.handle_request()
+    finally:
+        server.server_close()
+        if path.exists():
+            path.unlink()
+
+
+def _start_background():
+    """Fork a detached server and wait until it answers."""
+    if os.fork():
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            try:
+                return call('ping')
+            except DaemonUnavailable:
+                time.sleep(0.05)
+        raise RuntimeError("Daemon did not start")
+
+    os.setsid()
+    devnull = os.open(os.devnull, os.O_RDWR)
+    for fd in (0, 1, 2):
+        os.dup2(devnull, fd)
+    try:
+        serve()
+    finally:
+        os._exit(0)
+
+
+def main():
+    command = sys.argv[1] if len(sys.argv) > 1 else 'status'
+
+    if command == 'start':
+        if '--background' in sys.argv:
+            info = _start_background()
+            print(f"✅ Daemon started (pid {info['pid']}, {info['prompts']} prompts) on {socket_path()}")
+        else:
+            print(f"📡 Serving {_library_path().name} on {socket_path()} (Ctrl-C to stop)")
+            try:
+                serve()
+            except KeyboardInterrupt:
+                pass
+    elif command == 'stop':
+        try:
+            call('shutdown')
+            print("✅ Daemon stopped")
+        except DaemonUnavailable:
+            print("❌ No daemon running")
+    elif command == 'status':
+        try:
+            info = call('ping')
+            print(f"✅ Daemon running (pid {info['pid']}) serving {info['prompts']} prompts from {info['csv']}")
+        except DaemonUnavailable:
+            print("❌ No daemon running")
+            sys.exit(1)
+    else:
+        print("Usage: python prompt_daemon.py start [--background]|stop|status")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    prompt_profile.run(main)
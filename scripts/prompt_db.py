@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+SQLite storage backend for the prompt library.
+
+An indexed SQLite copy of the CSV (programming_music_prompts.db), with a
+primary key on Prompt_ID and indexes on Time_Block, BPM, Generated and
+Rating. Set PROMPTS_BACKEND=sqlite and csv_utils serves get_prompt(),
+find_prompts() and search_prompts() - and every script built on them -
+from the database, so single-row reads and filters don't parse the CSV.
+
+The CSV stays the canonical file. The database records the library stamp
+it was loaded from and is reloaded when the CSV changes some other way.
+update_prompts() writes the CSV as usual and applies the same changes to
+the database as a delta, like the stats and fitness views. The functions
+here take the same arguments and return the same shapes as csv_utils;
+writes and get_stats() are csv_utils' own.
+
+Usage:
+    PROMPTS_BACKEND=sqlite python find_prompts.py --block "Midday Refresh"
+    python prompt_db.py import                 # (re)load the CSV now
+    python prompt_db.py export --csv copy.csv  # write the database out
+    python prompt_db.py import --csv other.csv --db other.db
+"""
+
+import csv
+import json
+import sqlite3
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+import csv_utils
+import prompt_profile
+from csv_utils import (add_rating, get_stats, mark_generated, read_prompts,  # noqa: F401 - same API
+                       update_prompt, update_prompts, write_prompts)
+from prompt_record import typed_value
+
+DB_SUFFIX = '.db'
+
+# Columns that get a secondary index when present in the header
+INDEXED_FIELDS = ['Time_Block', 'BPM', 'Generated', 'Rating']
+
+_connections: Dict[Path, sqlite3.Connection] = {}
+
+
+def _quote(name: str) -> str:
+    """Quote a column name for use in SQL."""
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _contains(haystack: Optional[str], needle: str) -> bool:
+    """Case-insensitive substring test matching csv_utils.search_prompts."""
+    return needle in (haystack or '').lower()
+
+
+def database_path(csv_path: Optional[Path] = None) -> Path:
+    """The database next to a library: programming_music_prompts.db."""
+    return Path(csv_path or csv_utils.CSV_PATH).with_suffix(DB_SUFFIX)
+
+
+def connect(db_path: Optional[Path] = None) -> sqlite3.Connection:
+    """Open (or reuse) a connection to the prompt database, creating the file if needed."""
+    path = Path(db_path or database_path())
+    conn = _connections.get(path)
+    if conn is None:
+        conn = sqlite3.connect(str(path))
+        conn.row_factory = sqlite3.Row
+        conn.create_function('contains_ci', 2, _contains, deterministic=True)
+        conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        _connections[path] = conn
+    return conn
+
+
+def _meta(conn: sqlite3.Connection, key: str):
+    row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+    return json.loads(row['value']) if row else None
+
+
+def _set_meta(conn: sqlite3.Connection, key: str, value):
+    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, json.dumps(value)))
+
+
+def _fieldnames(conn: sqlite3.Connection) -> List[str]:
+    """Return the CSV column order recorded at import time."""
+    return _meta(conn, 'fieldnames') or []
+
+
+def _create_schema(conn: sqlite3.Connection, fieldnames: List[str]):
+    """(Re)create the prompts table and its indexes for the given columns."""
+    if 'Prompt_ID' not in fieldnames:
+        raise ValueError("Prompts must have a Prompt_ID column")
+
+    columns = [f"{_quote('Prompt_ID')} TEXT PRIMARY KEY", "_position INTEGER NOT NULL"]
+    columns += [f"{_quote(field)} TEXT" for field in fieldnames if field != 'Prompt_ID']
+    columns.append("_extra TEXT")
+
+    conn.execute("DROP TABLE IF EXISTS prompts")
+    conn.execute(f"CREATE TABLE prompts ({', '.join(columns)})")
+    conn.execute("CREATE INDEX idx_prompts_position ON prompts (_position)")
+    for field in INDEXED_FIELDS:
+        if field in fieldnames:
+            conn.execute(f"CREATE INDEX idx_prompts_{field.lower()} ON prompts ({_quote(field)})")
+    _set_meta(conn, 'fieldnames', fieldnames)
+
+
+def _insert(conn: sqlite3.Connection, fieldnames: List[str], prompts: Iterable[Mapping[str, str]]):
+    """Bulk insert prompts, preserving file order and any surplus values."""
+    columns = ['_position'] + fieldnames + ['_extra']
+    sql = (f"INSERT OR IGNORE INTO prompts ({', '.join(_quote(c) for c in columns)}) "
+           f"VALUES ({', '.join('?' for _ in columns)})")
+    rows = []
+    for position, prompt in enumerate(prompts):
+        extra = prompt.get(None)
+        rows.append([position] + [prompt.get(field) for field in fieldnames]
+                    + [json.dumps(extra) if extra else None])
+    conn.executemany(sql, rows)
+
+
+def _to_dict(row: sqlite3.Row, fieldnames: List[str]) -> Dict[str, str]:
+    """Convert a database row back into the csv.DictReader shape."""
+    prompt = {field: row[field] for field in fieldnames}
+    if row['_extra']:
+        prompt[None] = json.loads(row['_extra'])
+    return prompt
+
+
+def _select(conn: sqlite3.Connection, where: str = '', params: tuple = (),
+            limit: Optional[int] = None) -> List[Dict[str, str]]:
+    """Run a SELECT over prompts in file order and convert the rows."""
+    fieldnames = _fieldnames(conn)
+    sql = f"SELECT * FROM prompts {where} ORDER BY _position"
+    if limit is not None:
+        sql += f" LIMIT {int(limit)}"
+    return [_to_dict(row, fieldnames) for row in conn.execute(sql, params)]
+
+
+def import_csv(csv_path: Optional[Path] = None, db_path: Optional[Path] = None) -> int:
+    """Load the library (journal included) into the database, replacing its contents. Returns row count."""
+    csv_path = Path(csv_path or csv_utils.CSV_PATH)
+    conn = connect(db_path or database_path(csv_path))
+
+    # Stamp first: rows read after it are at least that new
+    stamp = csv_utils.library_stamp(csv_path)
+    with open(csv_path, 'r', encoding='utf-8') as f:
+        fieldnames = csv.DictReader(f).fieldnames or []
+    prompts = csv_utils.load_prompts(csv_path)
+
+    with prompt_profile.span('db.import', rows=len(prompts)), conn:
+        _create_schema(conn, fieldnames)
+        _insert(conn, fieldnames, prompts)
+        _set_meta(conn, 'stamp', list(stamp))
+    return len(prompts)
+
+
+def export_csv(csv_path: Optional[Path] = None, db_path: Optional[Path] = None) -> int:
+    """Write the database out as canonical CSV. Returns row count."""
+    conn = connect(db_path) if db_path else synced()
+    prompts = _select(conn)
+    if prompts:
+        csv_utils.write_prompts(prompts, Path(csv_path or csv_utils.CSV_PATH))
+    return len(prompts)
+
+
+def synced(csv_path: Optional[Path] = None) -> sqlite3.Connection:
+    """Connection to the library's database, reloaded first if the CSV has changed since."""
+    path = Path(csv_path or csv_utils.CSV_PATH)
+    conn = connect(database_path(path))
+    if _meta(conn, 'stamp') != list(csv_utils.library_stamp(path)):
+        import_csv(path)
+    return conn
+
+
+def apply_changes(changes: Iterable[Tuple[Mapping[str, str], Mapping[str, str]]],
+                  before_stamp: tuple, csv_path: Optional[Path] = None):
+    """
+    Update the database after rows changed from old to new.
+
+    As with prompt_stats.apply_changes(), a database that doesn't describe
+    before_stamp (or doesn't exist) is left alone and reloaded on its next
+    read.
+    """
+    path = Path(csv_path or csv_utils.CSV_PATH)
+    if not database_path(path).exists():
+        return
+    conn = connect(database_path(path))
+    if _meta(conn, 'stamp') != list(before_stamp):
+        return
+
+    fieldnames = _fieldnames(conn)
+    with conn:
+        for old, new in changes:
+            delta = {key: value for key, value in new.items() if key is not None and old.get(key) != value}
+            if any(key not in fieldnames for key in delta):
+                return  # a new column: leave the stamp stale so the next read reloads
+            if delta:
+                assignments = ', '.join(f"{_quote(key)} = ?" for key in delta)
+                conn.execute(f"UPDATE prompts SET {assignments} WHERE Prompt_ID = ?",
+                             list(delta.values()) + [new['Prompt_ID']])
+        _set_meta(conn, 'stamp', list(csv_utils.library_stamp(path)))
+
+
+def restamp(before_stamp: tuple, csv_path: Optional[Path] = None):
+    """Carry the database over to a new stamp whose rows are unchanged (journal compaction)."""
+    path = Path(csv_path or csv_utils.CSV_PATH)
+    if not database_path(path).exists():
+        return
+    conn = connect(database_path(path))
+    if _meta(conn, 'stamp') == list(before_stamp):
+        with conn:
+            _set_meta(conn, 'stamp', list(csv_utils.library_stamp(path)))
+
+
+def get_prompt(prompt_id: str) -> Optional[Dict[str, str]]:
+    """Get a single prompt by ID (primary key lookup)."""
+    conn = synced()
+    row = conn.execute("SELECT * FROM prompts WHERE Prompt_ID = ?", (prompt_id,)).fetchone()
+    return _to_dict(row, _fieldnames(conn)) if row else None
+
+
+def find_prompts(limit: Optional[int] = None, **filters) -> List[Dict[str, str]]:
+    """
+    Find prompts matching filters, as csv_utils.find_prompts does.
+
+    String values are matched in SQL through the column indexes; typed
+    values (BPM=108, Generated=True) are compared against the typed column
+    on the rows the string filters leave.
+
+    Examples:
+        find_prompts(Time_Block="Midday Refresh")
+        find_prompts(Generated="Yes", Rating="", limit=5)
+    """
+    conn = synced()
+    fieldnames = _fieldnames(conn)
+
+    if any(key not in fieldnames for key, value in filters.items() if value is not None):
+        return []  # csv_utils semantics: an unknown field never matches
+
+    text = {key: value for key, value in filters.items() if isinstance(value, str)}
+    typed = {key: value for key, value in filters.items() if not isinstance(value, str)}
+    where = ' AND '.join(f"COALESCE({_quote(key)}, '') = ?" for key in text)
+    rows = _select(conn, f"WHERE {where}" if where else '', tuple(text.values()),
+                   limit=None if typed else limit)
+    if typed:
+        rows = [row for row in rows
+                if all(typed_value(key, row.get(key)) == value for key, value in typed.items())][:limit]
+    return rows
+
+
+def search_prompts(text: str, fields: Optional[List[str]] = None,
+                   limit: Optional[int] = None) -> List[Dict[str, str]]:
+    """
+    Search for text in prompts, as csv_utils.search_prompts does.
+
+    Args:
+        text: Text to search for (case-insensitive)
+        fields: List of field names to search in. If None, searches all fields.
+        limit: Return at most this many results
+    """
+    conn = synced()
+    fieldnames = _fieldnames(conn)
+    search_fields = [field for field in (fields or fieldnames) if field in fieldnames]
+
+    if not search_fields:
+        return []
+
+    where = ' OR '.join(f"contains_ci({_quote(field)}, ?)" for field in search_fields)
+    return _select(conn, f"WHERE {where}", (text.lower(),) * len(search_fields), limit)
+
+
+def main():
+    if len(sys.argv) < 2 or sys.argv[1] not in ('import', 'export'):
+        print("Usage: python prompt_db.py import|export [--csv <path>] [--db <path>]")
+        sys.exit(1)
+
+    args = sys.argv[2:]
+    csv_path = Path(args[args.index('--csv') + 1]) if '--csv' in args else None
+    db_path = Path(args[args.index('--db') + 1]) if '--db' in args else None
+
+    if sys.argv[1] == 'import':
+        count = import_csv(csv_path, db_path)
+        print(f"✅ Imported {count} prompts into {db_path or database_path(csv_path)}")
+    else:
+        count = export_csv(csv_path, db_path)
+        print(f"✅ Exported {count} prompts to {csv_path or csv_utils.CSV_PATH}")
+
+
+if __name__ == "__main__":
+    prompt_profile.run(main)
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate detection over prompt text with MinHash and LSH.
+
+Half of every generation is clones (docs/genetic-algorithm.md), so
+near-identical rows creep in and waste Suno credits. Comparing every
+pair is O(N²). Instead each prompt's text is reduced to MinHash
+signatures, and signatures go into locality-sensitive hash buckets, so
+only prompts that share a bucket are ever compared.
+
+    text        one signature per group of TEXT_FIELDS: the
+                Suno_Short_Prompt, and the genes (Primary_Genres,
+                Key_Instruments, Mood_Keywords); lowercased words with
+                digits folded (so "98 BPM" and "104 BPM" match)
+    shingles    overlapping 3-word phrases
+    signature   NUM_PERM minimum hashes; the share of equal positions
+                estimates the Jaccard similarity of two shingle sets
+    LSH         BANDS bands of ROWS values; prompts sharing any band are
+                candidates (about 60% recall at similarity 0.5, over
+                99.9% at 0.8)
+
+Two prompts are as similar as their closest group. Full_Prompt is left
+out: an evolved candidate's Full_Prompt is a draft built from its genes
+(prompt_evolve.py), which would hide a clone of a hand-written parent.
+
+Signatures are kept in a sidecar (programming_music_prompts.csv.minhash)
+with a digest of each prompt's text. When the library changes, only
+new or edited prompts are re-hashed, and prompts that are gone are
+dropped.
+
+check_candidate() is the pre-insert check for one row, and
+split_duplicates() for a batch: prompt_evolve.py --write runs every
+candidate through it and skips those too close to the library or to an
+earlier candidate. A candidate may match the parents its Notes name
+("Parent #40 clone", "Hybrid: #40 + #41"): a clone is its parent's genes
+by design, so only other prompts count against it.
+
+Usage:
+    python prompt_dedupe.py                    # near-duplicate pairs (similarity >= 0.8)
+    python prompt_dedupe.py --threshold 0.6
+    python prompt_dedupe.py --check 40         # prompts close to #40
+    python prompt_dedupe.py --text "chillsynth, Rhodes, boom bap, 108 BPM, instrumental"
+"""
+
+import hashlib
+import marshal
+import random
+import re
+import sys
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+import csv_utils
+import prompt_profile
+
+DEDUPE_SUFFIX = '.minhash'
+DEDUPE_VERSION = 2
+
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_WORDS = 3
+DEFAULT_THRESHOLD = 0.8
+
+# Each group of columns gets its own signature
+TEXT_FIELDS = (('Suno_Short_Prompt',), ('Primary_Genres', 'Key_Instruments', 'Mood_Keywords'))
+
+_MASK64 = (1 << 64) - 1
+_WORD_RE = re.compile(r"\w+")
+_DIGITS_RE = re.compile(r"\d+")
+_PARENT_RE = re.compile(r"#([\w-]+)")
+
+# (multiplier, offset) per permutation: h(x) = ((a * x + b) mod 2^64) >> 32
+_rng = random.Random(20251108)
+PERMUTATIONS = tuple((_rng.getrandbits(64) | 1, _rng.getrandbits(64)) for _ in range(NUM_PERM))
+del _rng
+
+
+def prompt_texts(prompt: Mapping[str, str]) -> Tuple[str, ...]:
+    """The text of each TEXT_FIELDS group."""
+    return tuple('\n'.join(prompt.get(field) or '' for field in group) for group in TEXT_FIELDS)
+
+
+def shingles(text: str) -> Set[str]:
+    """Overlapping SHINGLE_WORDS-word phrases of normalized text."""
+    words = [_DIGITS_RE.sub('0', word) for word in _WORD_RE.findall(text.lower())]
+    if len(words) <= SHINGLE_WORDS:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def signature(text: str) -> Optional[Tuple[int, ...]]:
+    """MinHash signature of text, or None if it has no words."""
+    hashes = [_hash64(shingle) for shingle in shingles(text)]
+    if not hashes:
+        return None
+    return tuple(min(((a * x + b) & _MASK64) >> 32 for x in hashes) for a, b in PERMUTATIONS)
+
+
+def signatures(prompt: Mapping[str, str]) -> Tuple[Optional[Tuple[int, ...]], ...]:
+    """MinHash signature of each TEXT_FIELDS group (None for an empty group)."""
+    return tuple(signature(text) for text in prompt_texts(prompt))
+
+
+def similarity(first: Tuple[int, ...], second: Tuple[int, ...]) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return sum(1 for x, y in zip(first, second) if x == y) / NUM_PERM
+
+
+def _closest(first: tuple, second: tuple) -> float:
+    """Similarity of two prompts' signatures: that of their closest group."""
+    return max((similarity(x, y) for x, y in zip(first, second) if x is not None and y is not None),
+               default=0.0)
+
+
+def _digest(texts: Tuple[str, ...]) -> bytes:
+    return hashlib.blake2b('\x1f'.join(texts).encode('utf-8'), digest_size=8).digest()
+
+
+def _bands(sigs: tuple) -> Iterable[Tuple[int, tuple]]:
+    """(band, bucket key) pairs; keys start with the group, so groups never share a bucket."""
+    for group, sig in enumerate(sigs):
+        if sig is not None:
+            for band in range(BANDS):
+                yield band, (group,) + sig[band * ROWS:(band + 1) * ROWS]
+
+
+class MinHashIndex:
+    """Signatures by prompt ID, plus the LSH buckets over them."""
+
+    def __init__(self):
+        # Prompt_ID -> (text digest, signature or None per TEXT_FIELDS group)
+        self.entries: Dict[str, Tuple[bytes, tuple]] = {}
+        self.buckets: List[Dict[tuple, Set[str]]] = [defaultdict(set) for _ in range(BANDS)]
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, prompt_id: str, digest: bytes, sigs: tuple):
+        self.remove(prompt_id)
+        self.entries[prompt_id] = (digest, sigs)
+        for band, key in _bands(sigs):
+            self.buckets[band][key].add(prompt_id)
+
+    def remove(self, prompt_id: str):
+        entry = self.entries.pop(prompt_id, None)
+        if entry is None:
+            return
+        for band, key in _bands(entry[1]):
+            bucket = self.buckets[band].get(key)
+            if bucket is not None:
+                bucket.discard(prompt_id)
+                if not bucket:
+                    del self.buckets[band][key]
+
+    def add_prompt(self, prompt: Mapping[str, str]):
+        texts = prompt_texts(prompt)
+        self.add(prompt['Prompt_ID'], _digest(texts), tuple(map(signature, texts)))
+
+    def sync(self, prompts: Iterable[Mapping[str, str]]) -> int:
+        """
+        Bring the index up to date with a full library, hashing only new
+        or edited prompts. Returns the number added, changed or removed.
+        """
+        seen = set()
+        changed = 0
+        for prompt in prompts:
+            prompt_id = prompt['Prompt_ID']
+            seen.add(prompt_id)
+            texts = prompt_texts(prompt)
+            digest = _digest(texts)
+            entry = self.entries.get(prompt_id)
+            if entry is None or entry[0] != digest:
+                self.add(prompt_id, digest, tuple(map(signature, texts)))
+                changed += 1
+        for prompt_id in [pid for pid in self.entries if pid not in seen]:
+            self.remove(prompt_id)
+            changed += 1
+        return changed
+
+    def query(self, sigs: tuple, threshold: float = DEFAULT_THRESHOLD,
+              exclude: Optional[str] = None) -> List[Tuple[str, float]]:
+        """Indexed prompts at least threshold similar to signatures(), most similar first."""
+        candidates = set()
+        for band, key in _bands(sigs):
+            candidates |= self.buckets[band].get(key, set())
+        candidates.discard(exclude)
+
+        matches = [(pid, _closest(sigs, self.entries[pid][1])) for pid in candidates]
+        matches = [(pid, score) for pid, score in matches if score >= threshold]
+        matches.sort(key=lambda item: -item[1])
+        return matches
+
+    def near_duplicates(self, threshold: float = DEFAULT_THRESHOLD) -> List[Tuple[str, str, float]]:
+        """Pairs (a, b, similarity) at least threshold similar, most similar first."""
+        pairs: Dict[Tuple[str, str], float] = {}
+        for band_buckets in self.buckets:
+            for bucket in band_buckets.values():
+                if len(bucket) < 2:
+                    continue
+                members = sorted(bucket)
+                for i, first in enumerate(members):
+                    for second in members[i + 1:]:
+                        if (first, second) not in pairs:
+                            pairs[(first, second)] = _closest(self.entries[first][1], self.entries[second][1])
+        found = [(a, b, score) for (a, b), score in pairs.items() if score >= threshold]
+        found.sort(key=lambda item: (-item[2], item[0], item[1]))
+        return found
+
+    def to_state(self) -> tuple:
+        return (DEDUPE_VERSION, NUM_PERM, BANDS, PERMUTATIONS[0],
+                {pid: (digest, sigs) for pid, (digest, sigs) in self.entries.items()})
+
+    @classmethod
+    def from_state(cls, state: tuple) -> Optional['MinHashIndex']:
+        version, num_perm, bands, first_permutation, entries = state
+        if (version, num_perm, bands, first_permutation) != (DEDUPE_VERSION, NUM_PERM, BANDS, PERMUTATIONS[0]):
+            return None
+        index = cls()
+        for prompt_id, (digest, sigs) in entries.items():
+            index.add(prompt_id, digest, sigs)
+        return index
+
+
+def dedupe_path(csv_path: Optional[Path] = None) -> Path:
+    return csv_utils.sidecar_path(DEDUPE_SUFFIX, csv_path)
+
+
+def _read_index(path: Path) -> Optional[MinHashIndex]:
+    try:
+        return MinHashIndex.from_state(marshal.loads(dedupe_path(path).read_bytes()))
+    except (OSError, ValueError, EOFError, TypeError):
+        return None
+
+
+def _write_index(index: MinHashIndex, path: Path):
+    try:
+        csv_utils.write_atomic(dedupe_path(path), marshal.dumps(index.to_state()))
+    except OSError:
+        pass  # a read-only directory just means hashing again next time
+
+
+# Resolved CSV path -> (rows the index was last synced with, index)
+_indexes: Dict[Path, Tuple[tuple, MinHashIndex]] = {}
+
+
+def get_index(csv_path: Optional[Path] = None) -> MinHashIndex:
+    """Return the signature index for a library, synced with the file on disk."""
+    path = Path(csv_path or csv_utils.CSV_PATH).resolve()
+    prompts = csv_utils.load_prompts(path)
+
+    synced, index = _indexes.get(path, (None, None))
+    if synced is prompts:
+        return index
+    if index is None:
+        index = _read_index(path) or MinHashIndex()
+    with prompt_profile.span('dedupe.sync') as timing:
+        changed = index.sync(prompts)
+        timing.add('changed', changed)
+    if changed or not dedupe_path(path).exists():
+        _write_index(index, path)
+    _indexes[path] = (prompts, index)
+    return index
+
+
+def find_near_duplicates(threshold: float = DEFAULT_THRESHOLD,
+                         csv_path: Optional[Path] = None) -> List[Tuple[str, str, float]]:
+    """
+    Pairs of library prompts whose text is at least threshold similar.
+
+    Returns (prompt ID, prompt ID, estimated Jaccard similarity), most
+    similar first.
+
+    Example:
+        for a, b, score in find_near_duplicates(0.7):
+            print(f"#{a} ~ #{b}: {score:.2f}")
+    """
+    return get_index(csv_path).near_duplicates(threshold)
+
+
+def check_candidate(row: Mapping[str, str], threshold: float = DEFAULT_THRESHOLD,
+                    csv_path: Optional[Path] = None) -> List[Tuple[str, float]]:
+    """
+    Library prompts a candidate row would nearly duplicate, most similar
+    first. An empty list means it's safe to add.
+
+    Example:
+        if check_candidate({'Suno_Short_Prompt': short, 'Key_Instruments': instruments}):
+            print("Too close to an existing prompt")
+    """
+    return get_index(csv_path).query(signatures(row), threshold, exclude=row.get('Prompt_ID'))
+
+
+def declared_parents(row: Mapping[str, str]) -> Set[str]:
+    """Prompt IDs a row's Notes name as its parents ("Parent #40 clone" -> {'40'})."""
+    return set(_PARENT_RE.findall(row.get('Notes') or ''))
+
+
+def split_duplicates(candidates: Iterable[Mapping[str, str]], threshold: float = DEFAULT_THRESHOLD,
+                     csv_path: Optional[Path] = None) -> Tuple[List[Mapping[str, str]], List[Tuple[Mapping[str, str], str, float]]]:
+    """
+    Pre-insert check for a batch: returns (kept, flagged), where flagged
+    holds (candidate, ID it duplicates, similarity). Candidates are also
+    checked against the ones kept before them. Library matches with a
+    candidate's declared_parents() are allowed.
+    """
+    library = get_index(csv_path)
+    batch = MinHashIndex()
+    kept, flagged = [], []
+    for candidate in candidates:
+        sigs = signatures(candidate)
+        parents = declared_parents(candidate)
+        matches = [(pid, score) for pid, score in library.query(sigs, threshold) if pid not in parents]
+        matches = matches or batch.query(sigs, threshold)
+        if matches:
+            flagged.append((candidate, matches[0][0], matches[0][1]))
+        else:
+            kept.append(candidate)
+            batch.add(candidate['Prompt_ID'], b'', sigs)
+    return kept, flagged
+
+
+def main():
+    args = sys.argv[1:]
+    threshold = DEFAULT_THRESHOLD
+    if '--threshold' in args:
+        position = args.index('--threshold')
+        try:
+            threshold = float(args[position + 1])
+        except (IndexError, ValueError):
+            print("❌ --threshold needs a number between 0 and 1")
+            sys.exit(1)
+        del args[position:position + 2]
+
+    if args and args[0] in ('--check', '--text') and len(args) > 1:
+        if args[0] == '--check':
+            row = csv_utils.get_prompt(args[1])
+            if row is None:
+                print(f"❌ Prompt {args[1]} not found")
+                sys.exit(1)
+        else:
+            row = {'Suno_Short_Prompt': args[1]}
+        matches = check_candidate(row, threshold)
+        if not matches:
+            print(f"✅ No prompts at similarity >= {threshold:.2f}")
+            return
+        print(f"\n⚠️  {len(matches)} near-duplicate(s) at similarity >= {threshold:.2f}:\n")
+        for prompt_id, score in matches:
+            print(f"  {prompt_id:>6}  {score:.2f}")
+        return
+
+    if args:
+        print("Usage: python prompt_dedupe.py [--threshold 0.8] [--check <prompt_id> | --text <prompt text>]")
+        sys.exit(1)
+
+    pairs = find_near_duplicates(threshold)
+    if not pairs:
+        print(f"✅ No near-duplicate prompts at similarity >= {threshold:.2f}")
+        return
+    print(f"\n⚠️  {len(pairs)} near-duplicate pair(s) at similarity >= {threshold:.2f}:\n")
+    for first, second, score in pairs:
+        print(f"  {first:>6} ~ {second:<6}  {score:.2f}")
+
+if __name__ == "__main__":
+    prompt_profile.run(main)
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+MAP-Elites archive: the best prompt for each kind of prompt.
+
+Every prompt falls in one cell of a grid of behaviour descriptors:
+
+    BPM bucket          10 BPM wide (90-99, 100-109, ...)
+    Time_Block          "Evening Wind-Down" and "Evening Wind Down" are one block
+    instrument family   the most common family among Key_Instruments
+                        (keys, mallets, plucked, strings, winds, drums,
+                        synth, bass, texture)
+    genre family        the most common family among Primary_Genres
+                        (house, hip-hop/soul, jazz, folk, world, classical,
+                        rock, synth, ambient)
+
+Each cell keeps its elite: the best-rated prompt in it (tier, plus one
+for ⭐; unrated prompts only hold a cell until a rated one arrives).
+Inserting a prompt and looking up a cell are dictionary operations, so
+the archive is built in one pass and stays cheap to query for any
+library size.
+
+A block's grid spans the BPM buckets the block actually uses. Empty
+cells in it are gaps, and occupied cells whose elite is unrated or
+rated below Pretty good are weak. This is the drift the hand-written
+add_diverse_influences.py was correcting for.
+prompt_evolve.py --gaps breeds candidates that land in those cells.
+
+Usage:
+    python prompt_elites.py                          # coverage per Time_Block
+    python prompt_elites.py --gaps "Midday Refresh"  # empty cells of one block
+    python prompt_elites.py --weak                   # cells with no good elite
+    python prompt_elites.py --cell 40                # a prompt's cell and its elite
+"""
+
+import re
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+import csv_utils
+import prompt_profile
+from prompt_record import parse_bpm, parse_rating_score
+
+BPM_BUCKET = 10
+
+# Family -> keywords, checked in order against each lowercased item; first match wins
+INSTRUMENT_FAMILIES = [
+    ('mallets', ['vibraphone', 'marimba', 'balafon', 'glockenspiel', 'xylophone', 'kalimba', 'mbira',
+                 'thumb piano', 'steel pan', 'gamelan', 'metallophone', 'singing bowl', 'celesta', 'bells']),
+    ('keys', ['piano', 'rhodes', 'wurlitzer', 'clavinet', 'organ', 'harpsichord', 'stabs']),
+    ('plucked', ['guitar', 'banjo', 'mandolin', 'kora', 'koto', 'oud', 'harp', 'dulcimer', 'sitar',
+                 'bouzouki', 'cavaquinho', 'telecaster', 'ukulele', 'lute']),
+    ('strings', ['cello', 'violin', 'viola', 'string']),
+    ('winds', ['sax', 'clarinet', 'flute', 'trumpet', 'horn', 'panpipe', 'oboe', 'bansuri']),
+    ('drums', ['drum', 'kick', 'percussion', 'four-on-floor', 'shaker', 'tabla', 'conga', 'bongo',
+               'pandeiro', 'surdo', 'boom bap', 'hi-hat', 'beat', 'breakbeat', 'clave', 'snare']),
+    ('synth', ['synth', 'juno', 'moog', 'prophet', 'ms-20', 'ob-8', 'tb-303', 'dx7', 'mellotron',
+               'granular', 'arpeggi', 'pads', 'modular', '808']),
+    ('bass', ['bass']),
+    ('texture', ['field recording', 'drone', 'vinyl', 'tape', 'cassette', 'noise', 'hiss', 'delay',
+                 'reverb', 'rain', 'ocean', 'ambience', 'sample']),
+]
+
+GENRE_FAMILIES = [
+    ('house', ['house', 'techno', 'disco', 'dance', 'broken beat', 'garage']),
+    ('hip-hop/soul', ['hip-hop', 'hip hop', 'boom bap', 'lo-fi', 'r&b', 'trip-hop', 'soul', 'funk']),
+    ('jazz', ['jazz', 'bossa', 'samba', 'swing']),
+    ('folk', ['folk', 'bluegrass', 'appalachian', 'acoustic', 'fingerstyle', 'guitar', 'americana']),
+    ('world', ['afro', 'middle eastern', 'world', 'latin', 'japanese', 'indian', 'brazil', 'celtic',
+               'flamenco', 'reggae']),
+    ('classical', ['classical', 'piano', 'chopin', 'chamber', 'impressionist', 'nocturne', 'baroque',
+                   'romantic', 'minimalis']),
+    ('rock', ['rock', 'surf', 'shoegaze']),
+    ('synth', ['synth', 'chillwave', 'electronica', 'dream pop', 'krautrock', 'wave', 'kosmische']),
+    ('ambient', ['ambient', 'drone', 'dub', 'meditation', 'minimal', 'space']),
+]
+
+OTHER = 'other'
+
+# Elites below this fitness (3 = Pretty good) make a cell weak
+WEAK_FITNESS = 3
+
+_SEPARATORS_RE = re.compile(r'[\s\-]+')
+
+
+class Cell(NamedTuple):
+    bpm_bucket: int
+    time_block: str
+    instrument_family: str
+    genre_family: str
+
+    def label(self) -> str:
+        return (f"{self.time_block} | {self.bpm_bucket}-{self.bpm_bucket + BPM_BUCKET - 1} BPM | "
+                f"{self.instrument_family} | {self.genre_family}")
+
+
+def _family(item: str, families) -> str:
+    lowered = item.lower()
+    for family, keywords in families:
+        if any(keyword in lowered for keyword in keywords):
+            return family
+    return OTHER
+
+
+def dominant_family(text: Optional[str], families) -> str:
+    """The family most items of a comma-separated column belong to (ties: first listed)."""
+    counts = Counter(_family(item, families) for item in (text or '').split(',') if item.strip())
+    counts.pop(OTHER, None)
+    if not counts:
+        return OTHER
+    # Counter keeps first-seen order, and most_common() is stable
+    return counts.most_common(1)[0][0]
+
+
+def block_key(time_block: Optional[str]) -> str:
+    """Time_Block with spelling variants folded together ("Wind-Down" = "Wind Down")."""
+    return _SEPARATORS_RE.sub(' ', (time_block or '').strip()).title()
+
+
+def bpm_bucket(bpm: Optional[int]) -> int:
+    return -1 if bpm is None else bpm // BPM_BUCKET * BPM_BUCKET
+
+
+def descriptor(prompt: Mapping[str, str]) -> Cell:
+    """The archive cell a prompt (or candidate row) falls in."""
+    return Cell(
+        bpm_bucket(parse_bpm(prompt.get('BPM'))),
+        block_key(prompt.get('Time_Block')),
+        dominant_family(prompt.get('Key_Instruments'), INSTRUMENT_FAMILIES),
+        dominant_family(prompt.get('Primary_Genres'), GENRE_FAMILIES),
+    )
+
+
+def fitness(rating: Optional[str]) -> Optional[int]:
+    """Rating tier plus one for ⭐, or None when unrated or unrecognized."""
+    score = parse_rating_score(rating)
+    return score.fitness if score else None
+
+
+def _better(new: Optional[int], old: Optional[int]) -> bool:
+    if new is None:
+        return False
+    return old is None or new > old
+
+
+class Elite:
+    """A cell's best prompt, plus how many prompts share the cell."""
+
+    __slots__ = ('prompt', 'fitness', 'count')
+
+    def __init__(self, prompt: Mapping[str, str], fitness: Optional[int]):
+        self.prompt = prompt
+        self.fitness = fitness
+        self.count = 1
+
+    @property
+    def prompt_id(self) -> str:
+        return self.prompt['Prompt_ID']
+
+
+class EliteArchive:
+    """Grid of cells, each holding its elite."""
+
+    def __init__(self, prompts: Iterable[Mapping[str, str]] = ()):
+        self.cells: Dict[Cell, Elite] = {}
+        # Block key -> (display name, lowest BPM bucket, highest BPM bucket)
+        self.blocks: Dict[str, Tuple[str, int, int]] = {}
+        for prompt in prompts:
+            self.insert(prompt)
+
+    def __len__(self) -> int:
+        return len(self.cells)
+
+    def insert(self, prompt: Mapping[str, str]) -> bool:
+        """Add a prompt. Returns True if it became its cell's elite."""
+        cell = descriptor(prompt)
+        score = fitness(prompt.get('Rating'))
+
+        if cell.bpm_bucket >= 0:
+            name, low, high = self.blocks.get(cell.time_block, (prompt['Time_Block'], cell.bpm_bucket, cell.bpm_bucket))
+            self.blocks[cell.time_block] = (name, min(low, cell.bpm_bucket), max(high, cell.bpm_bucket))
+
+        elite = self.cells.get(cell)
+        if elite is None:
+            self.cells[cell] = Elite(prompt, score)
+            return True
+        elite.count += 1
+        if _better(score, elite.fitness):
+            elite.prompt, elite.fitness = prompt, score
+            return True
+        return False
+
+    def elite(self, cell: Cell) -> Optional[Elite]:
+        return self.cells.get(cell)
+
+    def improves(self, candidate: Mapping[str, str]) -> bool:
+        """Would candidate fill an empty cell or beat its cell's elite?"""
+        elite = self.cells.get(descriptor(candidate))
+        return elite is None or _better(fitness(candidate.get('Rating')), elite.fitness)
+
+    def is_weak(self, elite: Elite) -> bool:
+        return elite.fitness is None or elite.fitness < WEAK_FITNESS
+
+    def grid(self, time_block: Optional[str] = None) -> Iterable[Cell]:
+        """Every cell of one block's grid (or all blocks'), over the BPM buckets each block uses."""
+        keys = [block_key(time_block)] if time_block else list(self.blocks)
+        for key in keys:
+            if key not in self.blocks:
+                raise ValueError(f"Unknown Time_Block {time_block!r}")
+            _, low, high = self.blocks[key]
+            for bucket in range(low, high + 1, BPM_BUCKET):
+                for instrument_family, _ in INSTRUMENT_FAMILIES:
+                    for genre_family, _ in GENRE_FAMILIES:
+                        yield Cell(bucket, key, instrument_family, genre_family)
+
+    def gaps(self, time_block: Optional[str] = None) -> List[Cell]:
+        """Empty cells of the grid."""
+        return [cell for cell in self.grid(time_block) if cell not in self.cells]
+
+    def weak(self, time_block: Optional[str] = None) -> List[Cell]:
+        """Occupied cells whose elite is unrated or below Pretty good."""
+        key = block_key(time_block) if time_block else None
+        return [cell for cell, elite in self.cells.items()
+                if (key is None or cell.time_block == key) and self.is_weak(elite)]
+
+    def coverage(self) -> Dict[str, Dict[str, int]]:
+        """Per block: grid size, filled cells, strong (good elite) cells and weak cells."""
+        report = {}
+        for key, (name, low, high) in self.blocks.items():
+            size = ((high - low) // BPM_BUCKET + 1) * len(INSTRUMENT_FAMILIES) * len(GENRE_FAMILIES)
+            elites = [elite for cell, elite in self.cells.items() if cell.time_block == key]
+            weak = sum(1 for elite in elites if self.is_weak(elite))
+            report[name] = {'cells': size, 'filled': len(elites), 'strong': len(elites) - weak, 'weak': weak}
+        return report
+
+    def select(self, candidates: Iterable[Mapping[str, str]], limit: Optional[int] = None) -> List[Mapping[str, str]]:
+        """
+        Candidates that fill a gap or replace a weak elite, at most one per
+        cell, in order, up to limit.
+        """
+        picked = []
+        cells = set()
+        for candidate in candidates:
+            cell = descriptor(candidate)
+            elite = self.cells.get(cell)
+            if cell in cells or (elite is not None and not self.is_weak(elite)):
+                continue
+            cells.add(cell)
+            picked.append(candidate)
+            if limit is not None and len(picked) >= limit:
+                break
+        return picked
+
+
+# Resolved CSV path -> (rows the archive was built from, archive)
+_archives: Dict[Path, Tuple[tuple, EliteArchive]] = {}
+
+
+def get_archive(csv_path: Optional[Path] = None) -> EliteArchive:
+    """Return the process-wide archive for a library, rebuilt when the library changes."""
+    path = Path(csv_path or csv_utils.CSV_PATH).resolve()
+    prompts = csv_utils.load_prompts(path, lazy=True)
+    built, archive = _archives.get(path, (None, None))
+    if built is not prompts:
+        with prompt_profile.span('elites.build', rows=len(prompts)):
+            archive = EliteArchive(prompts)
+        _archives[path] = (prompts, archive)
+    return archive
+
+
+def _print_cells(archive: EliteArchive, cells: List[Cell], limit: int = 50):
+    for cell in cells[:limit]:
+        elite = archive.elite(cell)
+        held = f"#{elite.prompt_id} ({elite.prompt['Rating'] or 'unrated'})" if elite else 'empty'
+        print(f"  {cell.label():70} {held}")
+    if len(cells) > limit:
+        print(f"  ... and {len(cells) - limit} more")
+
+
+def main():
+    args = sys.argv[1:]
+    archive = get_archive()
+
+    try:
+        if args and args[0] == '--gaps':
+            block = args[1] if len(args) > 1 else None
+            gaps = archive.gaps(block)
+            print(f"\n🕳️  {len(gaps)} empty cell(s){' in ' + block if block else ''}:\n")
+            _print_cells(archive, gaps)
+            return
+
+        if args and args[0] == '--weak':
+            block = args[1] if len(args) > 1 else None
+            weak = sorted(archive.weak(block))
+            print(f"\n⚠️  {len(weak)} weak cell(s) (elite unrated or below Pretty good):\n")
+            _print_cells(archive, weak)
+            return
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    if args and args[0] == '--cell' and len(args) > 1:
+        prompt = csv_utils.get_prompt(args[1])
+        if prompt is None:
+            print(f"❌ Prompt {args[1]} not found")
+            sys.exit(1)
+        cell = descriptor(prompt)
+        elite = archive.elite(cell)
+        print(f"Prompt {args[1]}: {cell.label()}")
+        if elite:
+            print(f"  Elite: #{elite.prompt_id} ({elite.prompt['Rating'] or 'unrated'}), "
+                  f"{elite.count} prompt(s) in this cell")
+        return
+
+    if args:
+        print("Usage: python prompt_elites.py [--gaps [block] | --weak [block] | --cell <prompt_id>]")
+        sys.exit(1)
+
+    print(f"\n📊 MAP-Elites coverage ({len(archive)} filled cells)\n")
+    print(f"  {'Time_Block':30} {'cells':>6} {'filled':>7} {'strong':>7} {'weak':>5}")
+    for name, row in archive.coverage().items():
+        print(f"  {name:30} {row['cells']:>6} {row['filled']:>7} {row['strong']:>7} {row['weak']:>5}")
+
+if __name__ == "__main__":
+    prompt_profile.run(main)
@@ -0,0 +1,448 @@
+#!/usr/bin/env python3
+"""
+Breed new candidate prompts with the genetic algorithm in
+docs/genetic-algorithm.md.
+
+Each generation is split 50% clones, 30% hybrids and 20% mutations:
+
+    clone     one parent's genes; BPM nudged by up to ±2
+    hybrid    two parents crossed over: Primary_Genres, Key_Instruments and
+              Mood_Keywords take a leading run from parent A and fill up
+              from parent B; BPM is their average
+    mutation  one parent plus an element from influences_library.csv
+              (instrument, effect, rhythm, texture, or a genre influence's
+              first Elements_To_Use item); influences marked Avoid are
+              never used
+
+Parents are rated prompts of tier Pretty good and above, chosen in
+proportion to their rating (Excellent ⭐ weighs most). With a target
+Time_Block, parents come from that block when it has at least two, and
+every candidate takes the block's brain-wave target, duration type and
+BPM range.
+
+Candidates are complete rows: Notes use the lineage notation ("Parent #5
+clone", "Hybrid: #5 + #17", "Mutation: Dub Delay (Prompt #13 DNA)"), and
+Suno_Short_Prompt is filled in. Full_Prompt is a draft built from the
+genes, meant to be refined before generating in Suno.
+
+Output is deterministic for a given seed and library, with or without
+--workers: the generation is bred in fixed-size chunks, each with its own
+seed, so a process pool produces the same rows as a single process.
+
+Usage:
+    python prompt_evolve.py 20
+    python prompt_evolve.py 20 --block "Midday Refresh" --seed 7
+    python prompt_evolve.py 5000 --workers 4 --format jsonl > generation.jsonl
+    python prompt_evolve.py 10 --split 60/30/10
+    python prompt_evolve.py 10 --block "Midday Refresh" --gaps    # only empty/weak MAP-Elites cells
+    python prompt_evolve.py 20 --block "Morning Warmup" --write   # append to the library
+
+With --write, candidates that nearly duplicate a library prompt or an
+earlier candidate (prompt_dedupe.py) are skipped and listed; pass
+--allow-duplicates to append them anyway.
+"""
+
+import random
+import re
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
+import csv_utils
+import prompt_dedupe
+import prompt_profile
+from prompt_lock import library_lock
+from prompt_output import parse_output_args, write_rows
+from prompt_record import RatingScore, parse_bpm, parse_rating_score
+
+SPLIT = (0.5, 0.3, 0.2)
+
+# Lowest rating tier that makes a prompt a parent (3 = Pretty good)
+PARENT_MIN_TIER = 3
+BPM_JITTER = 2
+
+# Candidates per unit of work; also the unit each chunk seed covers
+CHUNK_SIZE = 256
+
+# Candidates bred per requested one when only gap-filling candidates are kept
+GAP_OVERSAMPLE = 20
+
+_PAREN_RE = re.compile(r'\s*\([^)]*\)')
+
+
+def _split_list(text: Optional[str]) -> List[str]:
+    return [item.strip() for item in (text or '').split(',') if item.strip()]
+
+
+def _join_words(items: Sequence[str]) -> str:
+    if len(items) < 2:
+        return ''.join(items)
+    return f"{', '.join(items[:-1])} and {items[-1]}"
+
+
+def parent_weight(rating: Union[str, RatingScore, None], min_tier: int = PARENT_MIN_TIER) -> float:
+    """Selection weight for a rating: 0 below min_tier, then 1, 2, ... with +2 for ⭐."""
+    score = parse_rating_score(rating) if rating is None or isinstance(rating, str) else rating
+    if score is None or score.tier is None or score.tier < min_tier:
+        return 0.0
+    return score.tier - min_tier + 1 + (2 if score.starred else 0)
+
+
+def parse_split(text: str) -> Tuple[float, float, float]:
+    """Parse a clone/hybrid/mutation split such as 50/30/20."""
+    parts = [float(part) for part in text.split('/')]
+    if len(parts) != 3 or min(parts) < 0 or not sum(parts):
+        raise ValueError("--split needs three non-negative numbers, e.g. 50/30/20")
+    total = sum(parts)
+    return tuple(part / total for part in parts)
+
+
+def operator_plan(count: int, split: Sequence[float] = SPLIT, seed: int = 0) -> List[str]:
+    """The operator for each candidate: exact split counts, in seeded random order."""
+    clones = round(count * split[0])
+    hybrids = min(count - clones, round(count * split[1]))
+    plan = ['clone'] * clones + ['hybrid'] * hybrids + ['mutation'] * (count - clones - hybrids)
+    random.Random(f"{seed}:plan").shuffle(plan)
+    return plan
+
+
+def crossover(rng: random.Random, first: Sequence[str], second: Sequence[str]) -> List[str]:
+    """A leading run of first, filled up from second to the parents' average length."""
+    size = max(1, round((len(first) + len(second)) / 2))
+    take = rng.randint(1, max(1, min(len(first), size - 1))) if first else 0
+    child = list(first[:take])
+    seen = {item.lower() for item in child}
+    for item in list(second) + list(first[take:]):
+        if len(child) >= size:
+            break
+        if item.lower() not in seen:
+            child.append(item)
+            seen.add(item.lower())
+    return child
+
+
+def draft_full_prompt(genres: Sequence[str], instruments: Sequence[str], moods: Sequence[str],
+                      bpm: int, brain_wave: str) -> str:
+    """A Full_Prompt draft in the shape of docs/prompt-templates.md."""
+    lead = instruments[0] if instruments else 'Synth pads'
+    text = f"{lead[:1].upper()}{lead[1:]} repeats with hypnotic precision at {bpm} BPM"
+    if len(instruments) > 1:
+        text += f", supported by {_join_words(instruments[1:])}"
+    text += f" in this {' and '.join(genres) or 'ambient'} instrumental."
+    if moods:
+        text += f" {' '.join(moods[:1]).capitalize()}{''.join(' ' + m for m in moods[1:])} atmosphere"
+        text += f" designed for {brain_wave.lower()}." if brain_wave else "."
+    return text
+
+
+class Parent:
+    """The genes of one rated prompt."""
+
+    __slots__ = ('prompt_id', 'time_block', 'bpm', 'brain_wave', 'duration',
+                 'genres', 'instruments', 'moods', 'weight')
+
+    def __init__(self, prompt: Mapping[str, str], weight: float):
+        self.prompt_id = prompt['Prompt_ID']
+        self.time_block = prompt['Time_Block']
+        self.bpm = parse_bpm(prompt['BPM'])
+        self.brain_wave = prompt['Brain_Wave_Target']
+        self.duration = prompt['Duration_Type']
+        self.genres = _split_list(prompt['Primary_Genres'])
+        self.instruments = _split_list(prompt['Key_Instruments'])
+        self.moods = (prompt['Mood_Keywords'] or '').split()
+        self.weight = weight
+
+
+class Mutation:
+    """One usable element of an influence."""
+
+    __slots__ = ('influence_id', 'name', 'element')
+
+    def __init__(self, influence: Mapping[str, str]):
+        self.influence_id = influence['Influence_ID']
+        self.name = _PAREN_RE.sub('', influence['Name']).strip()
+        if influence['Category'] == 'Genre Influences':
+            # Artist and style names don't belong in a Suno prompt; use what to take from them
+            elements = _split_list(influence['Elements_To_Use'])
+            self.element = (elements[0] if elements else self.name).lower()
+        else:
+            self.element = self.name.lower()
+
+
+class GenePool:
+    """Parents, mutations and per-block settings, ready for breeding."""
+
+    def __init__(self, prompts: Sequence[Mapping[str, str]], influences: Sequence[Mapping[str, str]],
+                 min_tier: int = PARENT_MIN_TIER, scores: Optional[Mapping[str, RatingScore]] = None):
+        """
+        scores maps Prompt_ID to its parsed rating, e.g. the qualifying
+        entries of the fitness index; without it each Rating is parsed here.
+        """
+        self.fieldnames = [key for key in (prompts[0].keys() if prompts else ()) if key is not None]
+        if scores is None:
+            scores = {p['Prompt_ID']: parse_rating_score(p['Rating']) for p in prompts}
+        self.parents = [Parent(p, weight) for p in prompts
+                        if (weight := parent_weight(scores.get(p['Prompt_ID']), min_tier)) and parse_bpm(p['BPM'])]
+        self.mutations = [Mutation(i) for i in influences if i.get('Status') != 'Avoid' and i.get('Name')]
+        if not self.parents:
+            raise ValueError("No rated parents to breed from (rate some prompts Pretty good or better)")
+
+        # Time_Block -> (most common Brain_Wave_Target, most common Duration_Type, min BPM, max BPM)
+        self.blocks: Dict[str, Tuple[str, str, int, int]] = {}
+        by_block: Dict[str, List[Mapping[str, str]]] = {}
+        for prompt in prompts:
+            by_block.setdefault(prompt['Time_Block'], []).append(prompt)
+        for block, rows in by_block.items():
+            bpms = [bpm for bpm in (parse_bpm(p['BPM']) for p in rows) if bpm]
+            self.blocks[block] = (
+                Counter(p['Brain_Wave_Target'] for p in rows).most_common(1)[0][0],
+                Counter(p['Duration_Type'] for p in rows).most_common(1)[0][0],
+                min(bpms, default=60), max(bpms, default=140),
+            )
+
+    @classmethod
+    def from_library(cls, min_tier: int = PARENT_MIN_TIER) -> 'GenePool':
+        from prompt_fitness import fitness_view
+        parents = dict(fitness_view().top(None, min_tier=min_tier))
+        return cls(csv_utils.load_prompts(), csv_utils.read_influences(), min_tier, parents)
+
+    def parents_for(self, time_block: Optional[str]) -> List[Parent]:
+        """Parents to breed for a block: the block's own if it has two or more."""
+        if time_block is None:
+            return self.parents
+        if time_block not in self.blocks:
+            raise ValueError(f"Unknown Time_Block {time_block!r} (blocks: {', '.join(self.blocks)})")
+        local = [parent for parent in self.parents if parent.time_block == time_block]
+        return local if len(local) >= 2 else self.parents
+
+    def breed(self, operators: Sequence[str], seed: int, chunk: int, first_id: int,
+              time_block: Optional[str] = None) -> List[Dict[str, str]]:
+        """Breed one chunk of candidates, numbered from first_id."""
+        rng = random.Random(f"{seed}:{chunk}")
+        parents = self.parents_for(time_block)
+        cum_weights = []
+        total = 0.0
+        for parent in parents:
+            total += parent.weight
+            cum_weights.append(total)
+
+        def pick(exclude: Optional[Parent] = None) -> Parent:
+            for _ in range(8):
+                parent = rng.choices(parents, cum_weights=cum_weights)[0]
+                if parent is not exclude:
+                    return parent
+            return parent
+
+        can_cross = len(parents) > 1
+        return [self._candidate(rng, operator, pick, can_cross, str(first_id + offset), time_block)
+                for offset, operator in enumerate(operators)]
+
+    def _candidate(self, rng: random.Random, operator: str, pick, can_cross: bool,
+                   prompt_id: str, time_block: Optional[str]) -> Dict[str, str]:
+        first = pick()
+        if operator == 'hybrid' and can_cross:
+            second = pick(exclude=first)
+            genres = crossover(rng, first.genres, second.genres)
+            instruments = crossover(rng, first.instruments, second.instruments)
+            moods = crossover(rng, first.moods, second.moods)
+            bpm = (first.bpm + second.bpm) // 2
+            notes = f"Hybrid: #{first.prompt_id} + #{second.prompt_id}"
+        elif operator == 'mutation' and self.mutations:
+            present = {i.lower() for i in first.instruments}
+            for _ in range(8):
+                # Prefer an element the parent doesn't already have
+                mutation = rng.choice(self.mutations)
+                if mutation.element not in present:
+                    break
+            genres, moods = list(first.genres), list(first.moods)
+            instruments = [i for i in first.instruments if i.lower() != mutation.element]
+            if len(instruments) >= 3:
+                # Replace a supporting instrument, keeping the lead
+                instruments[rng.randrange(1, len(instruments))] = mutation.element
+            else:
+                instruments.append(mutation.element)
+            bpm = first.bpm
+            notes = f"Mutation: {mutation.name} (Prompt #{first.prompt_id} DNA)"
+        else:
+            genres, instruments, moods = list(first.genres), list(first.instruments), list(first.moods)
+            bpm = first.bpm
+            notes = f"Parent #{first.prompt_id} clone"
+
+        block = time_block or first.time_block
+        brain_wave, duration, low, high = self.blocks[block]
+        if block == first.time_block:
+            brain_wave, duration = first.brain_wave, first.duration
+        bpm = min(high, max(low, bpm + rng.randint(-BPM_JITTER, BPM_JITTER)))
+
+        row = dict.fromkeys(self.fieldnames, '')
+        row.update({
+            'Prompt_ID': prompt_id,
+            'Time_Block': block,
+            'BPM': str(bpm),
+            'Brain_Wave_Target': brain_wave,
+            'Duration_Type': duration,
+            'Primary_Genres': ', '.join(genres),
+            'Key_Instruments': ', '.join(instruments),
+            'Mood_Keywords': ' '.join(moods),
+            'Suno_Short_Prompt': ', '.join(genres + instruments + [f"{bpm} BPM", 'instrumental']),
+            'Full_Prompt': draft_full_prompt(genres, instruments, moods, bpm, brain_wave),
+            'Notes': notes,
+        })
+        return row
+
+
+def next_prompt_id(prompts: Sequence[Mapping[str, str]]) -> int:
+    """The first unused numeric Prompt_ID (BONUS-N IDs are ignored)."""
+    numbers = [int(p['Prompt_ID']) for p in prompts if (p['Prompt_ID'] or '').isdigit()]
+    return max(numbers, default=0) + 1
+
+
+# Set in each pool worker by _init_worker, so the pool is pickled once per worker
+_worker_pool: Optional[GenePool] = None
+
+
+def _init_worker(pool: GenePool):
+    global _worker_pool
+    _worker_pool = pool
+
+
+def _breed_chunk(task: tuple) -> List[Dict[str, str]]:
+    return _worker_pool.breed(*task)
+
+
+def generate(count: int, seed: int = 0, time_block: Optional[str] = None,
+             split: Sequence[float] = SPLIT, workers: int = 1,
+             pool: Optional[GenePool] = None, first_id: Optional[int] = None) -> List[Dict[str, str]]:
+    """
+    Breed a generation of count candidate rows.
+
+    Args:
+        seed: Same seed, library and arguments give the same candidates
+        time_block: Breed for this Time_Block (parents, BPM range, brain wave)
+        split: Clone/hybrid/mutation fractions
+        workers: Breed chunks in this many processes; rows are pickled back,
+            so this only pays off for very large generations on several cores
+        pool: A GenePool to reuse across generations (default: the library)
+        first_id: Prompt_ID of the first candidate (default: next unused)
+
+    Examples:
+        generate(20)
+        generate(10, seed=7, time_block='Midday Refresh')
+        generate(10000, workers=4)
+    """
+    if pool is None:
+        pool = GenePool.from_library()
+    if first_id is None:
+        first_id = next_prompt_id(csv_utils.load_prompts())
+    pool.parents_for(time_block)  # reject an unknown block before forking
+
+    plan = operator_plan(count, split, seed)
+    tasks = [(plan[start:start + CHUNK_SIZE], seed, start // CHUNK_SIZE, first_id + start, time_block)
+             for start in range(0, count, CHUNK_SIZE)]
+
+    with prompt_profile.span('evolve.breed', rows=count, workers=workers):
+        if workers > 1 and len(tasks) > 1:
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(pool,)) as executor:
+                chunks = list(executor.map(_breed_chunk, tasks))
+        else:
+            chunks = [pool.breed(*task) for task in tasks]
+    return [row for chunk in chunks for row in chunk]
+
+
+def generate_for_gaps(count: int, seed: int = 0, time_block: Optional[str] = None,
+                      split: Sequence[float] = SPLIT, workers: int = 1) -> List[Dict[str, str]]:
+    """
+    Breed up to count candidates that each land in an empty or weak cell of
+    the MAP-Elites archive (see prompt_elites.py), one per cell.
+
+    GAP_OVERSAMPLE times as many candidates are bred and filtered, so the
+    kept candidates no longer follow the clone/hybrid/mutation split
+    exactly, and fewer than count come back if the gaps are out of reach.
+    """
+    from prompt_elites import get_archive
+
+    first_id = next_prompt_id(csv_utils.load_prompts())
+    bred = generate(count * GAP_OVERSAMPLE, seed=seed, time_block=time_block, split=split,
+                    workers=workers, first_id=first_id)
+    picked = get_archive().select(bred, limit=count)
+    return [{**row, 'Prompt_ID': str(first_id + offset)} for offset, row in enumerate(picked)]
+
+
+def append_generation(candidates: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """
+    Append candidates to the library, renumbered from the next unused ID.
+
+    The read and write happen under the exclusive library lock, so IDs
+    can't collide with a concurrent append. Returns the rows as written.
+    """
+    with library_lock(csv_utils.CSV_PATH, exclusive=True):
+        prompts = csv_utils.read_prompts()
+        first_id = next_prompt_id(prompts)
+        rows = [{**row, 'Prompt_ID': str(first_id + offset)} for offset, row in enumerate(candidates)]
+        csv_utils.write_prompts(prompts + rows)
+    return rows
+
+
+def _option(args: List[str], name: str) -> Optional[str]:
+    if name not in args:
+        return None
+    position = args.index(name)
+    if position + 1 >= len(args):
+        raise ValueError(f"{name} needs a value")
+    value = args[position + 1]
+    del args[position:position + 2]
+    return value
+
+
+def main():
+    try:
+        options, args = parse_output_args(sys.argv[1:])
+        write = '--write' in args
+        if write:
+            args.remove('--write')
+        gaps = '--gaps' in args
+        if gaps:
+            args.remove('--gaps')
+        allow_duplicates = '--allow-duplicates' in args
+        if allow_duplicates:
+            args.remove('--allow-duplicates')
+        block = _option(args, '--block')
+        seed = int(_option(args, '--seed') or 0)
+        workers = int(_option(args, '--workers') or 1)
+        split = parse_split(_option(args, '--split') or '50/30/20')
+        if len(args) != 1:
+            raise ValueError("Usage: python prompt_evolve.py <count> [--block <Time_Block>] [--seed N] "
+                             "[--workers N] [--split 50/30/20] [--gaps] [--write [--allow-duplicates]]")
+        count = int(args[0])
+        breed = generate_for_gaps if gaps else generate
+        candidates = breed(count, seed=seed, time_block=block, split=split, workers=workers)
+        if write:
+            if not allow_duplicates:
+                # Kept candidates are renumbered on append, so name earlier
+                # candidates by their Notes rather than a provisional ID
+                notes = {row['Prompt_ID']: row['Notes'] for row in candidates}
+                candidates, flagged = prompt_dedupe.split_duplicates(candidates)
+                for candidate, duplicate_id, score in flagged:
+                    target = f"candidate '{notes[duplicate_id]}'" if duplicate_id in notes else f"#{duplicate_id}"
+                    print(f"⚠️  Skipped '{candidate['Notes']}': {score:.2f} similar to {target}",
+                          file=sys.stderr)
+            candidates = append_generation(candidates)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    if options.machine:
+        write_rows(options.page(candidates), options)
+        return
+
+    operators = Counter(row['Notes'].split()[0].rstrip(':') for row in candidates)
+    print(f"\n✅ Bred {len(candidates)} candidate(s) ({operators.get('Parent', 0)} clones, "
+          f"{operators.get('Hybrid', 0)} hybrids, {operators.get('Mutation', 0)} mutations)"
+          f"{' and appended them to the library' if write else ''}:\n")
+    for row in options.page(candidates):
+        print(f"  {row['Prompt_ID']:>6} | {row['Time_Block']:30} | BPM {row['BPM']:>3} | {row['Primary_Genres']}")
+        print(f"         └─ {row['Notes']}: {row['Key_Instruments']}")
+
+if __name__ == "__main__":
+    prompt_profile.run(main)
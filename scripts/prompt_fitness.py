@@ -0,0 +1,296 @@
+#!/usr/bin/env python3
+"""
+Fitness index: rated prompts ranked by score, overall and per Time_Block.
+
+Each rating is parsed once into a RatingScore (prompt_record): tier,
+star and tags. Fitness is the tier plus one for ⭐, so Excellent ⭐ = 6
+down to Terrible = 0. Ratings without a recognizable tier ("Needs
+testing") keep their tags but aren't ranked.
+
+The index holds the scores plus sorted rankings - one for the whole
+library and one per Time_Block (spelling variants folded, as in
+prompt_elites.py) - so "top 5 parents for Midday Refresh" is a slice of
+a list rather than a scan with string matching.
+
+Like the stats view (prompt_stats.py), it is persisted next to the CSV
+(programming_music_prompts.csv.fitness), stamped with the CSV version it
+describes. update_prompts() applies each change as a delta, and journal
+compaction carries the stamp over. If the stamp doesn't match - the CSV
+was edited some other way - the index is rebuilt from the Rating and
+Time_Block columns.
+
+Usage:
+    python prompt_fitness.py                          # top 10 overall
+    python prompt_fitness.py "Midday Refresh" -n 5    # top 5 for a block
+    python prompt_fitness.py "Midday Refresh" --min-tier 3   # parents only
+    python prompt_fitness.py --tag vocals             # prompts whose rating mentions vocals
+    python prompt_fitness.py --rebuild
+"""
+
+import bisect
+import json
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+import csv_utils
+import prompt_profile
+from prompt_elites import block_key
+from prompt_record import RatingScore, parse_rating_score
+
+FITNESS_SUFFIX = '.fitness'
+FITNESS_VERSION = 2
+
+DEFAULT_TOP = 10
+
+
+def _id_order(prompt_id: str) -> int:
+    return int(prompt_id) if prompt_id.isdigit() else 1 << 62
+
+
+def _rank_key(prompt_id: str, score: RatingScore) -> tuple:
+    # Best first; ties in prompt ID order
+    return (-score.fitness, _id_order(prompt_id), prompt_id)
+
+
+class FitnessIndex:
+    """Parsed ratings by prompt ID, with rankings kept sorted on every change."""
+
+    def __init__(self, prompts: Optional[Iterable[Mapping[str, str]]] = None):
+        # Prompt_ID -> (Time_Block key, score)
+        self.entries: Dict[str, Tuple[str, RatingScore]] = {}
+        # Sorted _rank_key tuples, overall and per Time_Block key
+        self.ranked: List[tuple] = []
+        self.by_block: Dict[str, List[tuple]] = {}
+        if prompts is not None:
+            for prompt in prompts:
+                self.add(prompt)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, prompt: Mapping[str, str]):
+        """Index a prompt's rating, replacing what was indexed for its ID."""
+        self.set(prompt['Prompt_ID'], block_key(prompt.get('Time_Block')),
+                 parse_rating_score(prompt.get('Rating')))
+
+    def set(self, prompt_id: str, block: str, score: Optional[RatingScore]):
+        self.remove(prompt_id)
+        if score is None:
+            return
+        self.entries[prompt_id] = (block, score)
+        if score.fitness is not None:
+            key = _rank_key(prompt_id, score)
+            bisect.insort(self.ranked, key)
+            bisect.insort(self.by_block.setdefault(block, []), key)
+
+    def remove(self, prompt_id: str):
+        entry = self.entries.pop(prompt_id, None)
+        if entry is None or entry[1].fitness is None:
+            return
+        block, score = entry
+        key = _rank_key(prompt_id, score)
+        for ranking in (self.ranked, self.by_block[block]):
+            position = bisect.bisect_left(ranking, key)
+            if position < len(ranking) and ranking[position] == key:
+                del ranking[position]
+        if not self.by_block[block]:
+            del self.by_block[block]
+
+    def score(self, prompt_id: str) -> Optional[RatingScore]:
+        entry = self.entries.get(str(prompt_id))
+        return entry[1] if entry else None
+
+    def top(self, n: Optional[int] = DEFAULT_TOP, time_block: Optional[str] = None,
+            min_tier: Optional[int] = None) -> List[Tuple[str, RatingScore]]:
+        """
+        The n best-rated prompts (all of them if n is None), optionally in
+        one Time_Block and at or above a tier, best first.
+
+        Raises:
+            ValueError: If time_block has no rated prompts
+        """
+        if time_block is None:
+            ranking = self.ranked
+        else:
+            ranking = self.by_block.get(block_key(time_block))
+            if ranking is None:
+                raise ValueError(f"No rated prompts in Time_Block {time_block!r} "
+                                 f"(blocks: {', '.join(sorted(self.by_block))})")
+        results = []
+        for _, _, prompt_id in ranking:
+            score = self.entries[prompt_id][1]
+            if min_tier is not None and score.tier < min_tier:
+                if score.fitness < min_tier:
+                    break  # fitness >= tier, so every later tier is lower too
+                continue
+            results.append((prompt_id, score))
+            if n is not None and len(results) >= n:
+                break
+        return results
+
+    def starred(self) -> List[str]:
+        """IDs of ⭐ prompts, in ID order."""
+        return sorted((pid for pid, (_, score) in self.entries.items() if score.starred), key=_id_order)
+
+    def tagged(self, tag: str) -> List[str]:
+        """IDs of prompts whose rating has a tag, in ID order."""
+        return sorted((pid for pid, (_, score) in self.entries.items() if tag in score.tags), key=_id_order)
+
+    def to_state(self) -> Dict:
+        return {pid: [block, score.tier, score.starred, sorted(score.tags)]
+                for pid, (block, score) in self.entries.items()}
+
+    @classmethod
+    def from_state(cls, state: Dict) -> 'FitnessIndex':
+        index = cls()
+        for pid, (block, tier, starred, tags) in state.items():
+            index.entries[pid] = (block, RatingScore(tier, starred, frozenset(tags)))
+        # One sort instead of an insort per entry
+        for pid, (block, score) in index.entries.items():
+            if score.fitness is not None:
+                key = _rank_key(pid, score)
+                index.ranked.append(key)
+                index.by_block.setdefault(block, []).append(key)
+        index.ranked.sort()
+        for ranking in index.by_block.values():
+            ranking.sort()
+        return index
+
+
+def view_path(csv_path: Optional[Path] = None) -> Path:
+    return csv_utils.sidecar_path(FITNESS_SUFFIX, csv_path)
+
+
+def _read_view(csv_path: Optional[Path] = None) -> Tuple[Optional[list], Optional[FitnessIndex]]:
+    """Return (stamp, index) from the persisted view, or (None, None)."""
+    try:
+        with open(view_path(csv_path), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') == FITNESS_VERSION:
+            return data['stamp'], FitnessIndex.from_state(data['entries'])
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None, None
+
+
+def _write_view(index: FitnessIndex, stamp: tuple, csv_path: Optional[Path] = None):
+    data = {'version': FITNESS_VERSION, 'stamp': list(stamp), 'entries': index.to_state()}
+    try:
+        csv_utils.write_atomic(view_path(csv_path), json.dumps(data, ensure_ascii=False).encode('utf-8'))
+    except OSError:
+        pass  # a read-only directory just means no persisted view
+
+
+def rebuild_view(csv_path: Optional[Path] = None) -> FitnessIndex:
+    """Re-parse every rating and persist the index."""
+    path = Path(csv_path or csv_utils.CSV_PATH)
+    stamp = csv_utils.library_stamp(path)
+    prompts = csv_utils.load_prompts(path, lazy=True)
+    with prompt_profile.span('fitness.rebuild', rows=len(prompts)):
+        index = FitnessIndex(prompts)
+        _write_view(index, stamp, path)
+    return index
+
+
+def fitness_view(csv_path: Optional[Path] = None) -> FitnessIndex:
+    """Return the current fitness index from the persisted view, rebuilding it if stale."""
+    path = Path(csv_path or csv_utils.CSV_PATH)
+    stamp, index = _read_view(path)
+    if index is not None and stamp == list(csv_utils.library_stamp(path)):
+        return index
+    return rebuild_view(path)
+
+
+def apply_changes(changes: Iterable[Tuple[Mapping[str, str], Mapping[str, str]]],
+                  before_stamp: tuple, csv_path: Optional[Path] = None):
+    """
+    Update the persisted index after rows changed from old to new.
+
+    As with prompt_stats.apply_changes(), a view that doesn't describe
+    before_stamp is left stale and rebuilt on the next read.
+    """
+    path = Path(csv_path or csv_utils.CSV_PATH)
+    stamp, index = _read_view(path)
+    if index is None or stamp != list(before_stamp):
+        return
+
+    for old, new in changes:
+        if (old.get('Rating'), old.get('Time_Block')) != (new.get('Rating'), new.get('Time_Block')):
+            index.add(new)
+    _write_view(index, csv_utils.library_stamp(path), path)
+
+
+def restamp_view(before_stamp: tuple, csv_path: Optional[Path] = None):
+    """Carry the index over to a new stamp whose rows are unchanged (journal compaction)."""
+    path = Path(csv_path or csv_utils.CSV_PATH)
+    stamp, index = _read_view(path)
+    if index is not None and stamp == list(before_stamp):
+        _write_view(index, csv_utils.library_stamp(path), path)
+
+
+def top_parents(time_block: Optional[str] = None, n: Optional[int] = DEFAULT_TOP,
+                min_tier: Optional[int] = None) -> List[Tuple[str, RatingScore]]:
+    """
+    Best-rated prompts of the current library, best first.
+
+    Example:
+        for prompt_id, score in top_parents('Midday Refresh', 5, min_tier=3):
+            print(prompt_id, score.fitness, sorted(score.tags))
+    """
+    return fitness_view().top(n, time_block, min_tier)
+
+
+def _option(args: List[str], name: str) -> Optional[str]:
+    if name not in args:
+        return None
+    position = args.index(name)
+    if position + 1 >= len(args):
+        raise ValueError(f"{name} needs a value")
+    value = args[position + 1]
+    del args[position:position + 2]
+    return value
+
+
+def main():
+    from prompt_stats import TIER_LABELS
+
+    args = sys.argv[1:]
+    try:
+        n = int(_option(args, '-n') or DEFAULT_TOP)
+        min_tier = _option(args, '--min-tier')
+        min_tier = int(min_tier) if min_tier is not None else None
+        tag = _option(args, '--tag')
+        rebuild = '--rebuild' in args
+        if rebuild:
+            args.remove('--rebuild')
+        if len(args) > 1:
+            raise ValueError("Usage: python prompt_fitness.py [Time_Block] [-n 10] [--min-tier N] "
+                             "[--tag <tag>] [--rebuild]")
+
+        index = rebuild_view() if rebuild else fitness_view()
+        if tag:
+            ids = index.tagged(tag)
+            ranked = [(pid, index.score(pid)) for pid in ids[:n]]
+            label = f"rated prompt(s) tagged {tag!r}"
+        else:
+            ranked = index.top(n, args[0] if args else None, min_tier)
+            label = f"top rated prompt(s){' for ' + args[0] if args else ''}"
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    if rebuild:
+        print(f"✅ Rebuilt the fitness index ({len(index)} rated prompts)")
+    if not ranked:
+        print(f"⚠️  No {label}")
+        return
+    print(f"\n📊 {len(ranked)} {label}:\n")
+    for prompt_id, score in ranked:
+        prompt = csv_utils.get_prompt(prompt_id) or {}
+        fitness = '-' if score.fitness is None else score.fitness
+        print(f"  {prompt_id:>6} | {fitness} {TIER_LABELS[score.tier]:<11} {'⭐' if score.starred else '  '} | "
+              f"{prompt.get('Time_Block', ''):30} | {', '.join(sorted(score.tags))}")
+
+if __name__ == "__main__":
+    prompt_profile.run(main)
@@ -0,0 +1,351 @@
+#!/usr/bin/env python3
+"""
+Byte-offset index for single-prompt lookups without parsing the whole CSV.
+
+A sidecar file (programming_music_prompts.csv.idx) maps each Prompt_ID to
+the byte range of its record. Entries are fixed-width and sorted by a hash
+of the ID, so a lookup is a binary search over a memory-mapped file followed
+by parsing just the one record - the cost doesn't grow with the library.
+
+The sidecar records the CSV's mtime and size and is rebuilt automatically
+when they change. Record boundaries honour quoted fields, so multi-line
+values and embedded commas are handled.
+
+A second sidecar (programming_music_prompts.csv.cols) holds just the short
+columns plus each record's byte range. load_light() builds LazyPrompt rows
+from it: list, filter and stats code reads the short columns without
+parsing the long prose, and Full_Prompt/Notes are parsed from the CSV only
+when something asks for them.
+
+Usage:
+    python prompt_index.py            # (re)build the sidecars
+    python prompt_index.py 40         # look up one prompt through it
+"""
+
+import csv
+import hashlib
+import io
+import marshal
+import mmap
+import os
+import re
+import struct
+import sys
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import csv_utils
+from prompt_record import INTERNED_FIELDS
+import prompt_profile
+
+INDEX_SUFFIX = '.idx'
+MAGIC = b'PMPIDX1\0'
+
+COLUMNS_SUFFIX = '.cols'
+COLUMNS_VERSION = 1
+
+# Long prose columns that LazyPrompt only parses on access
+HEAVY_FIELDS = ('Full_Prompt', 'Notes')
+
+# magic, CSV mtime_ns, CSV size, byte offset of first record, entry count
+_HEADER = struct.Struct('<8sQQQQ')
+# ID hash, record start, record end
+_ENTRY = struct.Struct('<QQQ')
+
+_BOUNDARY_RE = re.compile(rb'["\n]')
+
+
+def index_path(csv_path: Optional[Path] = None, suffix: str = INDEX_SUFFIX) -> Path:
+    """Sidecar location for a CSV file."""
+    return csv_utils.sidecar_path(suffix, csv_path)
+
+
+def _write_atomic(target: Path, data: bytes):
+    """Write a sidecar; a read-only directory just means no sidecar."""
+    try:
+        csv_utils.write_atomic(target, data)
+    except OSError:
+        pass
+
+
+def _id_hash(prompt_id: str) -> int:
+    return int.from_bytes(hashlib.blake2b(prompt_id.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def iter_records(data) -> Iterator[Tuple[int, int]]:
+    """
+    Yield (start, end) byte ranges of the CSV records in data.
+
+    Newlines inside quoted fields don't end a record. The range includes the
+    trailing newline, if any.
+    """
+    start = 0
+    in_quotes = False
+    for match in _BOUNDARY_RE.finditer(data):
+        if match.group() == b'"':
+            in_quotes = not in_quotes
+        elif not in_quotes:
+            end = match.end()
+            yield start, end
+            start = end
+    if start < len(data):
+        yield start, len(data)
+
+
+def parse_record(data: bytes) -> List[str]:
+    """Parse one CSV record into its field values."""
+    return next(csv.reader(io.StringIO(data.decode('utf-8'), newline='')), [])
+
+
+def _record_id(data: bytes) -> str:
+    """Extract the first field of a record, parsing only as much as needed."""
+    if data.startswith(b'"'):
+        fields = parse_record(data)
+        return fields[0] if fields else ''
+    return data.split(b',', 1)[0].rstrip(b'\r\n').decode('utf-8')
+
+
+def _to_prompt(fieldnames: List[str], values: List[str]) -> Dict[str, str]:
+    """Build a prompt dict shaped like a csv.DictReader row."""
+    prompt = dict(zip(fieldnames, values))
+    for field in fieldnames[len(values):]:
+        prompt[field] = None
+    if len(values) > len(fieldnames):
+        prompt[None] = values[len(fieldnames):]
+    return prompt
+
+
+def build_index(csv_path: Optional[Path] = None) -> bytes:
+    """Scan the CSV, write the sidecar, and return its contents."""
+    path = Path(csv_path or csv_utils.CSV_PATH)
+    stat = path.stat()
+    data = path.read_bytes()
+
+    records = iter_records(data)
+    header_end = next(records, (0, 0))[1]
+
+    entries = []
+    for start, end in records:
+        record = data[start:end]
+        if not record.strip():
+            continue
+        entries.append((_id_hash(_record_id(record)), start, end))
+    entries.sort()
+
+    index = _HEADER.pack(MAGIC, stat.st_mtime_ns, stat.st_size, header_end, len(entries))
+    index += b''.join(_ENTRY.pack(*entry) for entry in entries)
+
+    _write_atomic(index_path(path), index)
+    return index
+
+
+def _load_index(path: Path):
+    """Return an up-to-date index buffer for the CSV (mmap or bytes)."""
+    stat = path.stat()
+    target = index_path(path)
+    try:
+        with open(target, 'rb') as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, mtime_ns, size, _, count = _HEADER.unpack_from(buffer, 0)
+        if (magic == MAGIC and (mtime_ns, size) == (stat.st_mtime_ns, stat.st_size)
+                and len(buffer) == _HEADER.size + count * _ENTRY.size):
+            return buffer
+        buffer.close()
+    except (OSError, ValueError, struct.error):
+        pass
+    return build_index(path)
+
+
+def lookup(prompt_id: str, csv_path: Optional[Path] = None) -> Optional[Dict[str, str]]:
+    """Fetch one prompt through the offset index. Returns None if not found."""
+    path = Path(csv_path or csv_utils.CSV_PATH)
+    if path.stat().st_size == 0:
+        return None
+
+    index = _load_index(path)
+    _, _, _, header_end, count = _HEADER.unpack_from(index, 0)
+    target = _id_hash(prompt_id)
+
+    # Leftmost entry with this hash
+    low, high = 0, count
+    while low < high:
+        middle = (low + high) // 2
+        if _ENTRY.unpack_from(index, _HEADER.size + middle * _ENTRY.size)[0] < target:
+            low = middle + 1
+        else:
+            high = middle
+
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        fieldnames = parse_record(data[:header_end])
+        # Entries sharing a hash are in file order; the first real match wins
+        for position in range(low, count):
+            entry_hash, start, end = _ENTRY.unpack_from(index, _HEADER.size + position * _ENTRY.size)
+            if entry_hash != target:
+                break
+            values = parse_record(data[start:end])
+            if values and values[0] == prompt_id:
+                return _to_prompt(fieldnames, values)
+    return None
+
+
+class _RecordSource:
+    """Reads single records from one version of a CSV file."""
+
+    def __init__(self, path: Path, stamp: Tuple[int, int], fieldnames: List[str]):
+        self.path = path
+        self.stamp = stamp
+        self.fieldnames = fieldnames
+        self._opened = False
+        self._data = None
+
+    def _open(self) -> Optional[mmap.mmap]:
+        """Map the file if it is still the stamped version, else return None."""
+        # The CSV is only ever replaced, never rewritten in place, so a mapping
+        # of the stamped version stays valid whatever happens to the path later
+        with open(self.path, 'rb') as f:
+            info = os.fstat(f.fileno())
+            if (info.st_mtime_ns, info.st_size) != self.stamp:
+                return None
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def read(self, prompt_id: str, start: int, end: int) -> Dict[str, str]:
+        """Parse a record, falling back to an ID lookup if the file has changed."""
+        if not self._opened:
+            self._data = self._open()
+            self._opened = True
+        if self._data is None:
+            return lookup(prompt_id, self.path) or {}
+        return _to_prompt(self.fieldnames, parse_record(self._data[start:end]))
+
+
+class LazyPrompt(Mapping):
+    """
+    Read-only prompt row that parses its long text columns on first access.
+
+    Behaves like the csv.DictReader row it stands for: same keys, same
+    values. Short columns are held in memory; anything else triggers one
+    record parse through the byte offsets, after which the row is complete.
+    """
+
+    __slots__ = ('_light', '_full', '_source', '_span', '_keys')
+
+    def __init__(self, light: Dict[str, str], keys: tuple, source: _RecordSource, span: Tuple[int, int]):
+        self._light = light
+        self._full = None
+        self._keys = keys
+        self._source = source
+        self._span = span
+
+    def _load(self) -> Dict[str, str]:
+        if self._full is None:
+            self._full = self._source.read(self._light.get('Prompt_ID'), *self._span)
+        return self._full
+
+    def __getitem__(self, key):
+        if self._full is None and key in self._light:
+            return self._light[key]
+        return self._load()[key]
+
+    def __contains__(self, key) -> bool:
+        return key in self._keys
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __repr__(self) -> str:
+        return f"LazyPrompt({self._light.get('Prompt_ID')!r})"
+
+
+def build_columns(csv_path: Optional[Path] = None) -> tuple:
+    """Parse the CSV once and write the short-column sidecar. Returns its contents."""
+    path = Path(csv_path or csv_utils.CSV_PATH)
+    stat = path.stat()
+    data = path.read_bytes()
+
+    records = iter_records(data)
+    header = next(records, None)
+    fieldnames = parse_record(data[header[0]:header[1]]) if header else []
+    light_fields = [field for field in fieldnames if field not in HEAVY_FIELDS]
+    positions = [fieldnames.index(field) for field in light_fields]
+
+    rows = []
+    for start, end in records:
+        values = parse_record(data[start:end])
+        if not values:
+            continue
+        light = tuple(values[i] if i < len(values) else None for i in positions)
+        rows.append(light + (len(values), start, end))
+
+    columns = (COLUMNS_VERSION, stat.st_mtime_ns, stat.st_size, fieldnames, light_fields, rows)
+    _write_atomic(index_path(path, COLUMNS_SUFFIX), marshal.dumps(columns))
+    return columns
+
+
+def _load_columns(path: Path) -> tuple:
+    """Return up-to-date short-column data for the CSV, rebuilding if stale."""
+    stat = path.stat()
+    try:
+        columns = marshal.loads(index_path(path, COLUMNS_SUFFIX).read_bytes())
+        if columns[0] == COLUMNS_VERSION and tuple(columns[1:3]) == (stat.st_mtime_ns, stat.st_size):
+            return columns
+    except (OSError, ValueError, EOFError, TypeError, IndexError):
+        pass
+    return build_columns(path)
+
+
+# Resolved CSV path -> (stamp, rows)
+_light_cache: Dict[Path, Tuple[tuple, Tuple[LazyPrompt, ...]]] = {}
+
+
+def load_light(csv_path: Optional[Path] = None) -> Tuple[LazyPrompt, ...]:
+    """
+    Return the library as LazyPrompt rows, cached per process.
+
+    Only the short columns are loaded up front; Full_Prompt and Notes are
+    read from the CSV per row when accessed.
+    """
+    path = Path(csv_path or csv_utils.CSV_PATH).resolve()
+    stat = path.stat()
+    stamp = (stat.st_mtime_ns, stat.st_size)
+
+    cached = _light_cache.get(path)
+    if cached and cached[0] == stamp:
+        return cached[1]
+
+    _, mtime_ns, size, fieldnames, light_fields, rows = _load_columns(path)
+    source = _RecordSource(path, (mtime_ns, size), fieldnames)
+    full_keys = tuple(fieldnames)
+    extra_keys = full_keys + (None,)
+    width = len(light_fields)
+
+    prompts = tuple(
+        LazyPrompt({field: sys.intern(value) if field in INTERNED_FIELDS and value else value
+                    for field, value in zip(light_fields, row[:width])},
+                   extra_keys if row[width] > len(fieldnames) else full_keys,
+                   source, (row[width + 1], row[width + 2]))
+        for row in rows
+    )
+    _light_cache[path] = ((mtime_ns, size), prompts)
+    return prompts
+
+
+def main():
+    if len(sys.argv) > 1:
+        prompt = lookup(sys.argv[1])
+        if not prompt:
+            print(f"❌ Prompt {sys.argv[1]} not found")
+            sys.exit(1)
+        csv_utils.print_prompt(prompt)
+        return
+
+    index = build_index()
+    build_columns()
+    count = _HEADER.unpack_from(index, 0)[4]
+    print(f"✅ Indexed {count} prompts in {index_path()} and {index_path(suffix=COLUMNS_SUFFIX)}")
+
+if __name__ == "__main__":
+    prompt_profile.run(main)
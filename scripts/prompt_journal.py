@@ -0,0 +1,192 @@
+#!/usr/bin/env python3
+"""
+Append-only change journal for the prompt CSV.
+
+Long-running writers - batch mode and the daemon - run inside deferred().
+There update_prompts() doesn't rewrite the CSV for every rating or
+Generated flag: it appends one JSON line per batch to
+programming_music_prompts.csv.journal and fsyncs it. Readers
+(load_prompts, get_prompt) replay the journal over the base CSV, so
+changes are visible immediately. A crash mid-append leaves at most one
+truncated line, which replay skips.
+
+Outside deferred() - add_rating.py, mark_generated.py, library calls -
+every update rewrites the CSV before it returns, so git, an editor or any
+script reading the CSV directly sees it.
+
+Compaction folds the journal back into the CSV with an atomic
+temp-file + fsync + rename, then removes the journal. It runs when the
+deferred() block ends, once the journal passes JOURNAL_COMPACT_BYTES,
+whenever write_prompts() rewrites the file, or on demand:
+
+    python prompt_journal.py status
+    python prompt_journal.py compact
+
+Set PROMPTS_JOURNAL=0 to disable journaling and rewrite the CSV directly
+even in batch mode and the daemon.
+"""
+
+import json
+import os
+import sys
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+import prompt_profile
+
+JOURNAL_SUFFIX = '.journal'
+
+JOURNAL_ENABLED = os.environ.get('PROMPTS_JOURNAL', '1') != '0'
+JOURNAL_COMPACT_BYTES = int(os.environ.get('PROMPTS_JOURNAL_MAX_BYTES', 256 * 1024))
+
+# Journal path -> (stamp, merged updates)
+_replay_cache: Dict[Path, Tuple[tuple, Dict[str, Dict[str, str]]]] = {}
+# Nesting depth of deferred() blocks in this process
+_deferred_depth = 0
+
+
+def journal_path(csv_path: Path) -> Path:
+    csv_path = Path(csv_path)
+    return csv_path.with_name(csv_path.name + JOURNAL_SUFFIX)
+
+
+def journal_stamp(csv_path: Path) -> tuple:
+    """(mtime_ns, size) of the journal, or (0, 0) when there is none."""
+    try:
+        stat = journal_path(csv_path).stat()
+    except FileNotFoundError:
+        return (0, 0)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def journal_size(csv_path: Path) -> int:
+    return journal_stamp(csv_path)[1]
+
+
+def append(csv_path: Path, updates: Dict[str, Dict[str, str]]):
+    """Durably append one batch of {prompt_id: {field: value}} updates."""
+    line = json.dumps({'updates': updates}, ensure_ascii=False).encode('utf-8') + b'\n'
+    path = journal_path(csv_path)
+
+    with open(path, 'ab+') as f:
+        # Don't glue a new entry onto a line truncated by an earlier crash
+        if f.tell() > 0:
+            f.seek(-1, os.SEEK_END)
+            if f.read(1) != b'\n':
+                line = b'\n' + line
+        f.write(line)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def replay(csv_path: Path) -> Dict[str, Dict[str, str]]:
+    """
+    Merge every journalled update into {prompt_id: {field: value}}.
+
+    Later entries win. Lines that don't parse (a torn final write) are skipped.
+    """
+    path = journal_path(csv_path)
+    stamp = journal_stamp(csv_path)
+    if stamp == (0, 0):
+        return {}
+
+    cached = _replay_cache.get(path)
+    if cached and cached[0] == stamp:
+        return cached[1]
+
+    merged: Dict[str, Dict[str, str]] = {}
+    with open(path, 'rb') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            for prompt_id, changes in entry.get('updates', {}).items():
+                merged.setdefault(prompt_id, {}).update(changes)
+
+    _replay_cache[path] = (stamp, merged)
+    return merged
+
+
+def deferring() -> bool:
+    """Whether update_prompts() should journal instead of rewriting the CSV."""
+    return JOURNAL_ENABLED and _deferred_depth > 0
+
+
+@contextmanager
+def deferred(csv_path: Optional[Path] = None):
+    """
+    Journal updates made inside the block, and compact when it ends.
+
+    Example:
+        with prompt_journal.deferred():
+            for prompt_id, rating in ratings:
+                csv_utils.add_rating(prompt_id, rating)
+    """
+    global _deferred_depth
+    _deferred_depth += 1
+    try:
+        yield
+    finally:
+        _deferred_depth -= 1
+        if not _deferred_depth:
+            compact(csv_path)
+
+
+def clear(csv_path: Path):
+    """Remove the journal (after its changes are in the CSV)."""
+    path = journal_path(csv_path)
+    _replay_cache.pop(path, None)
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def compact(csv_path: Optional[Path] = None) -> int:
+    """Fold the journal into the CSV atomically. Returns prompts changed."""
+    import csv_utils
+    from prompt_db import restamp as restamp_db
+    from prompt_fitness import restamp_view as restamp_fitness
+    from prompt_lineage import restamp_graph
+    from prompt_lock import library_lock
+    from prompt_stats import restamp_view
+    from search_index import restamp_index
+
+    path = Path(csv_path or csv_utils.CSV_PATH)
+    with library_lock(path, exclusive=True):
+        pending = replay(path)
+        if not pending:
+            clear(path)
+            return 0
+
+        before = csv_utils.library_stamp(path)
+        csv_utils.write_prompts(csv_utils.read_prompts(path), path)
+        restamp_view(before, path)
+        restamp_fitness(before, path)
+        restamp_graph(before, path)
+        restamp_db(before, path)
+        restamp_index(before, path)
+    return len(pending)
+
+
+def main():
+    import csv_utils
+
+    command = sys.argv[1] if len(sys.argv) > 1 else 'status'
+
+    if command == 'compact':
+        count = compact()
+        print(f"✅ Compacted journal: {count} prompt(s) folded into {csv_utils.CSV_PATH.name}")
+    elif command == 'status':
+        pending = replay(csv_utils.CSV_PATH)
+        print(f"📒 Journal: {journal_size(csv_utils.CSV_PATH)} bytes, {len(pending)} prompt(s) with pending changes")
+        for prompt_id, changes in pending.items():
+            print(f"  {prompt_id:>6} | {changes}")
+    else:
+        print("Usage: python prompt_journal.py status|compact")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    prompt_profile.run(main)
@@ -0,0 +1,349 @@
+#!/usr/bin/env python3
+"""
+Lineage graph: which prompts each prompt was bred from.
+
+Notes record ancestry in a loose notation (docs/genetic-algorithm.md):
+
+    Parent #5 clone                     Clone of #108 (very good)
+    Hybrid: #13 + #21                   Hybrid of #119 + #110
+    Mutation: marimba (Prompt #13 DNA)  Based on prompt #5
+    Parent DNA: Prompt #4 clone         Inspired by #105
+
+Every #N in a prompt's Notes is a parent, except influence references.
+An influence is cited as a bare "(#N)" or "(#N - ...)" after its name,
+and "(WEIGHTED - ...)" remarks cite prompts where an influence worked
+rather than parents. Parents must have a lower Prompt_ID than the child,
+which keeps the graph acyclic.
+
+Parent IDs are kept in a sidecar (programming_music_prompts.csv.lineage)
+with a digest of each prompt's Notes, stamped with the library version
+they describe. As for the fitness index, update_prompts() applies edited
+Notes as deltas and journal compaction carries the stamp over. If the
+library changed some other way, only new or edited Notes are parsed, so
+a new generation costs one parse per new prompt. Children lists are
+derived from the parents on load.
+
+Ancestor and descendant queries walk the graph breadth-first and touch
+only the lineage asked for. Lineage ratings come from the fitness index
+(prompt_fitness.py).
+
+Usage:
+    python prompt_lineage.py 13                  # parents, children and how descendants score
+    python prompt_lineage.py --ancestors 201
+    python prompt_lineage.py --descendants 13
+    python prompt_lineage.py --founders          # prompts with the most descendants
+"""
+
+import hashlib
+import marshal
+import re
+import sys
+from collections import deque
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+import csv_utils
+import prompt_profile
+
+LINEAGE_SUFFIX = '.lineage'
+LINEAGE_VERSION = 2
+
+DEFAULT_FOUNDERS = 10
+
+_REFERENCE_RE = re.compile(r"#(\d+)")
+# Influence citations and WEIGHTED remarks: not parents
+_NOT_PARENTS_RE = re.compile(r"\(#\d+(?:\)| -[^)]*\))|\(WEIGHTED[^)]*\)")
+
+
+def _id_order(prompt_id: str) -> int:
+    return int(prompt_id) if prompt_id.isdigit() else 1 << 62
+
+
+def parse_parents(notes: Optional[str], prompt_id: Optional[str] = None) -> Tuple[str, ...]:
+    """
+    Parent IDs named in a prompt's Notes, in order of mention.
+
+    With prompt_id, only IDs lower than it are kept.
+
+    Example:
+        parse_parents("Hybrid: Debussy (#62) + minimal house parent (#13 DNA)", '92')
+        # ('13',)
+    """
+    text = _NOT_PARENTS_RE.sub('', notes or '')
+    limit = _id_order(prompt_id) if prompt_id is not None else None
+    parents = []
+    for match in _REFERENCE_RE.finditer(text):
+        parent = str(int(match.group(1)))
+        if parent not in parents and (limit is None or int(parent) < limit):
+            parents.append(parent)
+    return tuple(parents)
+
+
+def _digest(notes: Optional[str]) -> bytes:
+    return hashlib.blake2b((notes or '').encode('utf-8'), digest_size=8).digest()
+
+
+class LineageGraph:
+    """Parent and child edges by Prompt_ID."""
+
+    def __init__(self):
+        # Prompt_ID -> (Notes digest, parent IDs)
+        self.entries: Dict[str, Tuple[bytes, Tuple[str, ...]]] = {}
+        self.children: Dict[str, Set[str]] = {}
+        # Library version the graph describes
+        self.stamp: Optional[list] = None
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def add(self, prompt_id: str, digest: bytes, parents: Tuple[str, ...]):
+        self.remove(prompt_id)
+        self.entries[prompt_id] = (digest, parents)
+        for parent in parents:
+            self.children.setdefault(parent, set()).add(prompt_id)
+
+    def remove(self, prompt_id: str):
+        entry = self.entries.pop(prompt_id, None)
+        if entry is None:
+            return
+        for parent in entry[1]:
+            siblings = self.children.get(parent)
+            if siblings is not None:
+                siblings.discard(prompt_id)
+                if not siblings:
+                    del self.children[parent]
+
+    def sync(self, prompts: Iterable[Mapping[str, str]]) -> int:
+        """
+        Bring the graph up to date with a full library, parsing only new
+        or edited Notes. Returns the number of prompts added, changed or
+        removed.
+        """
+        seen = set()
+        changed = 0
+        for prompt in prompts:
+            prompt_id = prompt['Prompt_ID']
+            seen.add(prompt_id)
+            notes = prompt.get('Notes')
+            digest = _digest(notes)
+            entry = self.entries.get(prompt_id)
+            if entry is None or entry[0] != digest:
+                self.add(prompt_id, digest, parse_parents(notes, prompt_id))
+                changed += 1
+        for prompt_id in [pid for pid in self.entries if pid not in seen]:
+            self.remove(prompt_id)
+            changed += 1
+        return changed
+
+    def parents(self, prompt_id: str) -> Tuple[str, ...]:
+        entry = self.entries.get(prompt_id)
+        return entry[1] if entry else ()
+
+    def _walk(self, prompt_id: str, step, max_depth: Optional[int]) -> Dict[str, int]:
+        depths: Dict[str, int] = {}
+        queue = deque([(prompt_id, 0)])
+        while queue:
+            current, depth = queue.popleft()
+            if max_depth is not None and depth >= max_depth:
+                continue
+            for relative in step(current):
+                if relative not in depths:
+                    depths[relative] = depth + 1
+                    queue.append((relative, depth + 1))
+        return depths
+
+    def ancestors(self, prompt_id: str, max_depth: Optional[int] = None) -> Dict[str, int]:
+        """Ancestor IDs mapped to generations back (1 = parent)."""
+        return self._walk(prompt_id, self.parents, max_depth)
+
+    def descendants(self, prompt_id: str, max_depth: Optional[int] = None) -> Dict[str, int]:
+        """Descendant IDs mapped to generations down (1 = child)."""
+        return self._walk(prompt_id, lambda pid: self.children.get(pid, ()), max_depth)
+
+    def founders(self) -> List[Tuple[str, int]]:
+        """(Prompt_ID, descendant count) for prompts with children, most descendants first."""
+        counts = [(pid, len(self.descendants(pid))) for pid in self.children]
+        counts.sort(key=lambda item: (-item[1], _id_order(item[0])))
+        return counts
+
+    def to_state(self) -> tuple:
+        return (LINEAGE_VERSION, self.stamp, self.entries)
+
+    @classmethod
+    def from_state(cls, state: tuple) -> Optional['LineageGraph']:
+        if state[0] != LINEAGE_VERSION:
+            return None
+        _, stamp, entries = state
+        graph = cls()
+        graph.stamp = stamp
+        for prompt_id, (digest, parents) in entries.items():
+            graph.add(prompt_id, digest, parents)
+        return graph
+
+
+def lineage_path(csv_path: Optional[Path] = None) -> Path:
+    return csv_utils.sidecar_path(LINEAGE_SUFFIX, csv_path)
+
+
+def _read_graph(path: Path) -> Optional[LineageGraph]:
+    try:
+        return LineageGraph.from_state(marshal.loads(lineage_path(path).read_bytes()))
+    except (OSError, ValueError, EOFError, TypeError):
+        return None
+
+
+def _write_graph(graph: LineageGraph, path: Path):
+    try:
+        csv_utils.write_atomic(lineage_path(path), marshal.dumps(graph.to_state()))
+    except OSError:
+        pass  # a read-only directory just means parsing again next time
+
+
+# Resolved CSV path -> graph; its stamp says which library version it describes
+_graphs: Dict[Path, LineageGraph] = {}
+
+
+def get_graph(csv_path: Optional[Path] = None) -> LineageGraph:
+    """Return the lineage graph for a library, synced with the file on disk."""
+    path = Path(csv_path or csv_utils.CSV_PATH).resolve()
+    stamp = list(csv_utils.library_stamp(path))
+
+    graph = _graphs.get(path)
+    if graph is None:
+        graph = _read_graph(path) or LineageGraph()
+    if graph.stamp != stamp:
+        with prompt_profile.span('lineage.sync') as timing:
+            timing.add('changed', graph.sync(csv_utils.load_prompts(path, lazy=True)))
+        graph.stamp = stamp
+        _write_graph(graph, path)
+    _graphs[path] = graph
+    return graph
+
+
+def _stored_graph(path: Path, stamp: tuple) -> Optional[LineageGraph]:
+    graph = _graphs.get(path) or _read_graph(path)
+    return graph if graph is not None and graph.stamp == list(stamp) else None
+
+
+def apply_changes(changes: Iterable[Tuple[Mapping[str, str], Mapping[str, str]]],
+                  before_stamp: tuple, csv_path: Optional[Path] = None):
+    """
+    Update the persisted graph after rows changed from old to new.
+
+    As with prompt_stats.apply_changes(), a graph that doesn't describe
+    before_stamp is left stale and synced on the next read.
+    """
+    path = Path(csv_path or csv_utils.CSV_PATH).resolve()
+    graph = _stored_graph(path, before_stamp)
+    if graph is None:
+        return
+    for old, new in changes:
+        if old.get('Notes') != new.get('Notes'):
+            notes = new.get('Notes')
+            graph.add(new['Prompt_ID'], _digest(notes), parse_parents(notes, new['Prompt_ID']))
+    graph.stamp = list(csv_utils.library_stamp(path))
+    _write_graph(graph, path)
+
+
+def restamp_graph(before_stamp: tuple, csv_path: Optional[Path] = None):
+    """Carry the graph over to a new stamp whose rows are unchanged (journal compaction)."""
+    path = Path(csv_path or csv_utils.CSV_PATH).resolve()
+    graph = _stored_graph(path, before_stamp)
+    if graph is not None:
+        graph.stamp = list(csv_utils.library_stamp(path))
+        _write_graph(graph, path)
+
+
+def lineage_ratings(prompt_ids: Iterable[str]) -> Dict:
+    """
+    Aggregate ratings of a set of prompts, from the fitness index.
+
+    Returns counts (prompts, rated, starred), mean fitness (tier + 1 for
+    ⭐, None if nothing is rated) and the number of prompts per tier.
+
+    Example:
+        lineage_ratings(get_graph().descendants('13'))
+    """
+    from prompt_fitness import fitness_view
+
+    index = fitness_view()
+    prompt_ids = list(prompt_ids)
+    scores = [score for score in map(index.score, prompt_ids) if score is not None and score.fitness is not None]
+    tiers: Dict[int, int] = {}
+    for score in scores:
+        tiers[score.tier] = tiers.get(score.tier, 0) + 1
+    return {
+        'prompts': len(prompt_ids),
+        'rated': len(scores),
+        'starred': sum(1 for score in scores if score.starred),
+        'mean_fitness': sum(score.fitness for score in scores) / len(scores) if scores else None,
+        'tiers': dict(sorted(tiers.items(), reverse=True)),
+    }
+
+
+def _print_rows(depths: Mapping[str, int], direction: str):
+    for prompt_id in sorted(depths, key=lambda pid: (depths[pid], _id_order(pid))):
+        prompt = csv_utils.get_prompt(prompt_id) or {}
+        print(f"  {prompt_id:>6} | {direction}{depths[prompt_id]} | {prompt.get('Time_Block', '?'):30} | "
+              f"{prompt.get('Rating') or '-'}")
+
+
+def _print_ratings(label: str, ratings: Dict):
+    from prompt_stats import TIER_LABELS
+
+    mean = ratings['mean_fitness']
+    print(f"\n📊 {label}: {ratings['prompts']} prompt(s), {ratings['rated']} rated, {ratings['starred']} ⭐"
+          + (f", mean fitness {mean:.2f}" if mean is not None else ''))
+    if ratings['tiers']:
+        print('   ' + ', '.join(f"{TIER_LABELS[tier]} {count}" for tier, count in ratings['tiers'].items()))
+
+
+def main():
+    args = sys.argv[1:]
+    graph = get_graph()
+
+    if args == ['--founders'] or (len(args) == 2 and args[0] == '--founders' and args[1].isdigit()):
+        limit = int(args[1]) if len(args) == 2 else DEFAULT_FOUNDERS
+        print("\n🌳 Prompts with the most descendants:\n")
+        for prompt_id, count in graph.founders()[:limit]:
+            ratings = lineage_ratings(graph.descendants(prompt_id))
+            mean = ratings['mean_fitness']
+            print(f"  {prompt_id:>6} | {count:>4} descendant(s) | {ratings['rated']:>3} rated | "
+                  f"mean fitness {'-' if mean is None else f'{mean:.2f}'}")
+        return
+
+    if len(args) == 2 and args[0] in ('--ancestors', '--descendants'):
+        mode, prompt_id = args[0], args[1]
+    elif len(args) == 1 and not args[0].startswith('-'):
+        mode, prompt_id = None, args[0]
+    else:
+        print("Usage: python prompt_lineage.py <prompt_id> | --ancestors <prompt_id> | "
+              "--descendants <prompt_id> | --founders [N]")
+        sys.exit(1)
+
+    if prompt_id not in graph.entries:
+        print(f"❌ Prompt {prompt_id} not found")
+        sys.exit(1)
+
+    if mode == '--ancestors':
+        depths = graph.ancestors(prompt_id)
+        print(f"\n🌳 {len(depths)} ancestor(s) of #{prompt_id}:\n")
+        _print_rows(depths, '-')
+        return
+    if mode == '--descendants':
+        depths = graph.descendants(prompt_id)
+        print(f"\n🌳 {len(depths)} descendant(s) of #{prompt_id}:\n")
+        _print_rows(depths, '+')
+        _print_ratings(f"Descendants of #{prompt_id}", lineage_ratings(depths))
+        return
+
+    parents = graph.parents(prompt_id)
+    children = sorted(graph.children.get(prompt_id, ()), key=_id_order)
+    print(f"\n🌳 Prompt #{prompt_id}")
+    print(f"  Parents:  {', '.join('#' + pid for pid in parents) or '-'}")
+    print(f"  Children: {', '.join('#' + pid for pid in children) or '-'}")
+    print(f"  Ancestors: {len(graph.ancestors(prompt_id))} | Descendants: {len(graph.descendants(prompt_id))}")
+    _print_ratings(f"Descendants of #{prompt_id}", lineage_ratings(graph.descendants(prompt_id)))
+
+if __name__ == "__main__":
+    prompt_profile.run(main)
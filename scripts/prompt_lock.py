@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Advisory locking and a version counter for the prompt library.
+
+Readers take a shared lock and writers an exclusive one on a sidecar lock
+file (programming_music_prompts.csv.lock). The CSV itself can't be locked
+because writes replace it by rename. Locks are re-entrant within a thread,
+so a writer can call read helpers without deadlocking on itself.
+
+The lock file also stores the library version: a counter bumped by every
+write. update_prompts(..., expected_version=v) only applies if the library
+is still at version v, raising VersionConflict otherwise, and
+update_with_retry() wraps the read-compute-write loop:
+
+    def append_note(prompt):
+        return {'Notes': prompt['Notes'] + ' [keeper]'}
+
+    update_with_retry('40', append_note)
+
+Parallel rating and generation sessions can then share one library without
+silently losing each other's updates.
+
+Uses fcntl.flock; where that isn't available (Windows) locks are no-ops.
+"""
+
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Mapping, Optional
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+LOCK_SUFFIX = '.lock'
+LOCK_TIMEOUT = float(os.environ.get('PROMPTS_LOCK_TIMEOUT', 30))
+
+_held = threading.local()
+
+
+class VersionConflict(ValueError):
+    """The library changed since the version an update was based on."""
+
+    def __init__(self, expected: int, actual: int):
+        # args stay (expected, actual) so the daemon can rebuild it on the client
+        super().__init__(expected, actual)
+        self.expected = expected
+        self.actual = actual
+
+    def __str__(self) -> str:
+        return f"Library is at version {self.actual}, expected {self.expected}"
+
+
+def lock_path(csv_path: Path) -> Path:
+    csv_path = Path(csv_path)
+    return csv_path.with_name(csv_path.name + LOCK_SUFFIX)
+
+
+def _held_locks() -> Dict[Path, list]:
+    """Per-thread map of lock path -> [file, exclusive, depth]."""
+    if not hasattr(_held, 'locks'):
+        _held.locks = {}
+    return _held.locks
+
+
+@contextmanager
+def library_lock(csv_path: Path, exclusive: bool = False,
+                 timeout: Optional[float] = None) -> Iterator[int]:
+    """
+    Hold a shared (default) or exclusive lock on the library.
+
+    Yields the file descriptor of the lock file. Nested calls in the same
+    thread reuse the outer lock; nesting an exclusive lock inside a shared
+    one is not allowed.
+
+    Raises:
+        TimeoutError: If the lock isn't acquired within timeout seconds
+    """
+    path = lock_path(csv_path).resolve()
+    held = _held_locks()
+
+    if path in held:
+        entry = held[path]
+        if exclusive and not entry[1]:
+            raise RuntimeError("Cannot upgrade a shared library lock to exclusive")
+        entry[2] += 1
+        try:
+            yield entry[0].fileno()
+        finally:
+            entry[2] -= 1
+        return
+
+    f = open(path, 'a+b')
+    try:
+        if fcntl is not None:
+            mode = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+            deadline = time.monotonic() + (LOCK_TIMEOUT if timeout is None else timeout)
+            delay = 0.005
+            while True:
+                try:
+                    fcntl.flock(f.fileno(), mode | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if time.monotonic() >= deadline:
+                        raise TimeoutError(f"Timed out waiting for {path.name}")
+                    time.sleep(delay)
+                    delay = min(delay * 2, 0.1)
+
+        held[path] = [f, exclusive, 1]
+        try:
+            yield f.fileno()
+        finally:
+            del held[path]
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    finally:
+        f.close()
+
+
+def _read_version(fd: int) -> int:
+    data = os.pread(fd, 64, 0)
+    try:
+        return int(data.strip() or 0)
+    except ValueError:
+        return 0
+
+
+def library_version(csv_path: Path) -> int:
+    """Current library version (0 for a library that has never been written)."""
+    with library_lock(csv_path) as fd:
+        return _read_version(fd)
+
+
+def bump_version(csv_path: Path, expected: Optional[int] = None) -> int:
+    """
+    Increment the version; call while holding the exclusive lock.
+
+    Raises:
+        VersionConflict: If expected is given and doesn't match
+    """
+    with library_lock(csv_path, exclusive=True) as fd:
+        current = _read_version(fd)
+        if expected is not None and current != expected:
+            raise VersionConflict(expected, current)
+        data = f"{current + 1}\n".encode()
+        os.ftruncate(fd, 0)
+        os.pwrite(fd, data, 0)
+        os.fsync(fd)
+        return current + 1
+
+
+def update_with_retry(prompt_id: str, compute: Callable[[Mapping[str, str]], Dict[str, str]],
+                      retries: int = 5, csv_path: Optional[Path] = None) -> Dict[str, str]:
+    """
+    Read a prompt, compute updates from it, and apply them with compare-and-swap.
+
+    If another writer got in between the read and the write, the prompt is
+    re-read and compute() runs again, up to retries times.
+
+    Returns:
+        The updates that were applied
+
+    Raises:
+        ValueError: If the prompt doesn't exist
+        VersionConflict: If every attempt conflicted
+    """
+    import csv_utils
+
+    path = Path(csv_path or csv_utils.CSV_PATH)
+    for attempt in range(retries + 1):
+        version = library_version(path)
+        prompt = csv_utils.get_prompt(prompt_id)
+        if prompt is None:
+            raise ValueError(f"Prompt {prompt_id} not found")
+        updates = compute(prompt)
+        try:
+            csv_utils.update_prompts({prompt_id: updates}, expected_version=version)
+            return updates
+        except VersionConflict:
+            if attempt == retries:
+                raise
+            time.sleep(0.01 * (attempt + 1))
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Machine-readable output for the query scripts.
+
+find_prompts.py, show_prompt.py, prompt_query.py and search_index.py
+accept the same output options:
+
+    --format text|json|jsonl|tsv   text is the default human-readable output
+    --fields Prompt_ID,BPM,Rating  columns to include (default: all)
+    --offset N --limit N           pagination
+
+json writes one array, jsonl one object per line, and tsv a header line
+then one line per row, with tabs, newlines and backslashes escaped as \\t,
+\\n and \\\\. Rows are written and flushed as they are found, so a consumer
+can stop reading early.
+
+Examples:
+    python find_prompts.py --rated no --format jsonl --fields Prompt_ID,Time_Block,BPM --limit 10
+    python show_prompt.py 40 --format json --fields Prompt_ID,Suno_Short_Prompt
+"""
+
+import json
+import sys
+from itertools import islice
+from typing import Iterable, List, Mapping, Optional, Tuple
+
+import prompt_profile
+from prompt_record import FIELD_SLOTS
+
+FORMATS = ('text', 'json', 'jsonl', 'tsv')
+
+# Columns of the library CSV, in file order
+COLUMNS = list(FIELD_SLOTS)
+
+# Columns some scripts compute and add to their rows (show_prompt.py --similar)
+COMPUTED_COLUMNS = ['Similarity']
+
+_COLUMNS_LOWER = {column.lower(): column for column in COLUMNS + COMPUTED_COLUMNS}
+
+
+class OutputOptions:
+    """Parsed --format/--fields/--offset/--limit options."""
+
+    def __init__(self):
+        self.format = 'text'
+        self.fields: Optional[List[str]] = None
+        self.offset = 0
+        self.limit: Optional[int] = None
+
+    @property
+    def machine(self) -> bool:
+        return self.format != 'text'
+
+    def fetch_limit(self) -> Optional[int]:
+        """How many matches to ask for so the requested page is covered."""
+        return None if self.limit is None else self.offset + self.limit
+
+    def page(self, rows: Iterable) -> Iterable:
+        """Apply --offset/--limit to a stream of rows."""
+        if self.offset or self.limit is not None:
+            return islice(rows, self.offset, self.fetch_limit())
+        return rows
+
+
+def resolve_fields(text: str) -> List[str]:
+    """Parse a comma-separated --fields value into column names (case-insensitive)."""
+    fields = []
+    for name in (part.strip() for part in text.split(',')):
+        if not name:
+            continue
+        column = _COLUMNS_LOWER.get(name.lower())
+        if column is None:
+            raise ValueError(f"Unknown field {name!r} (fields: {', '.join(COLUMNS)})")
+        fields.append(column)
+    return fields
+
+
+def parse_output_args(args: List[str]) -> Tuple[OutputOptions, List[str]]:
+    """
+    Take the output options out of a script's arguments.
+
+    Returns (options, remaining args).
+
+    Raises:
+        ValueError: For a bad format, field or number
+    """
+    options = OutputOptions()
+    remaining = []
+    position = 0
+    while position < len(args):
+        arg = args[position]
+        if arg in ('--format', '--fields', '--offset', '--limit'):
+            if position + 1 >= len(args):
+                raise ValueError(f"{arg} needs a value")
+            value = args[position + 1]
+            position += 2
+            if arg == '--format':
+                if value not in FORMATS:
+                    raise ValueError(f"--format must be one of {', '.join(FORMATS)}")
+                options.format = value
+            elif arg == '--fields':
+                options.fields = resolve_fields(value)
+            else:
+                try:
+                    number = int(value)
+                except ValueError:
+                    raise ValueError(f"{arg} needs a number")
+                if number < 0:
+                    raise ValueError(f"{arg} can't be negative")
+                if arg == '--offset':
+                    options.offset = number
+                else:
+                    options.limit = number
+        else:
+            remaining.append(arg)
+            position += 1
+    return options, remaining
+
+
+def project(row: Mapping[str, str], fields: Optional[List[str]]) -> dict:
+    """The requested columns of a row (all named columns by default)."""
+    if fields is None:
+        return {key: row[key] for key in row if key is not None}
+    return {field: row.get(field) for field in fields}
+
+
+def _tsv_value(value) -> str:
+    if value is None:
+        return ''
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n').replace('\r', '\\r')
+
+
+def write_rows(rows: Iterable[Mapping[str, str]], options: OutputOptions, out=None) -> int:
+    """
+    Stream rows in a machine-readable format. Returns the number written.
+
+    Pagination is not applied here - pass options.page(rows) for that.
+    """
+    out = out or sys.stdout
+    count = 0
+    fields = options.fields
+
+    # Rows are usually a lazy pipeline, so this span includes the scan and
+    # filter stages feeding it (they are recorded as their own spans too)
+    with prompt_profile.span('serialize.output', format=options.format) as timing:
+        if options.format == 'json':
+            out.write('[')
+        for row in rows:
+            record = project(row, fields)
+            if options.format == 'tsv':
+                if count == 0:
+                    out.write('\t'.join(fields or record.keys()) + '\n')
+                out.write('\t'.join(_tsv_value(value) for value in record.values()) + '\n')
+            elif options.format == 'json':
+                out.write((',\n' if count else '\n') + json.dumps(record, ensure_ascii=False))
+            else:
+                out.write(json.dumps(record, ensure_ascii=False) + '\n')
+            out.flush()
+            count += 1
+
+        if options.format == 'json':
+            out.write('\n]\n' if count else ']\n')
+        elif options.format == 'tsv' and count == 0:
+            out.write('\t'.join(fields or COLUMNS) + '\n')
+        out.flush()
+        timing.add('rows', count)
+    return count
+
+
+def write_row(row: Optional[Mapping[str, str]], options: OutputOptions, out=None):
+    """Write a single row: a JSON object (null if missing) or one-line jsonl/tsv."""
+    out = out or sys.stdout
+    if options.format == 'json':
+        out.write(json.dumps(project(row, options.fields) if row is not None else None,
+                             ensure_ascii=False) + '\n')
+        out.flush()
+    else:
+        write_rows([row] if row is not None else [], options, out)
+
+
+def print_prompt(prompt: Mapping[str, str], verbose: bool = False):
+    """Pretty print a prompt (the text format of show_prompt.py)."""
+    print(f"\n{'='*60}")
+    print(f"Prompt {prompt['Prompt_ID']}: {prompt['Time_Block']}")
+    print(f"{'='*60}")
+    print(f"BPM: {prompt['BPM']} | {prompt['Brain_Wave_Target']}")
+    print(f"Genres: {prompt['Primary_Genres']}")
+    print(f"Instruments: {prompt['Key_Instruments']}")
+
+    if verbose:
+        print(f"\nMood: {prompt['Mood_Keywords']}")
+        print(f"\nSuno Prompt:\n{prompt['Suno_Short_Prompt']}")
+        print(f"\nFull Description:\n{prompt['Full_Prompt']}")
+
+    print(f"\nNotes: {prompt['Notes']}")
+    print(f"Generated: {prompt['Generated']}")
+
+    if prompt.get('Rating') and prompt['Rating'].strip():
+        print(f"Rating: {prompt['Rating']}")
+
+
+def print_similar(rows: Iterable[Mapping[str, str]]):
+    """Print prompt_similar results (rows with a Similarity column)."""
+    for row in rows:
+        print(f"  {row['Prompt_ID']:>6}  {row['Similarity']} | {row['Time_Block']:30} | "
+              f"BPM {row['BPM']:>3} | {row['Primary_Genres']}")
+        print(f"          └─ {row['Key_Instruments']}")
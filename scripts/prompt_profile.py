@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Opt-in timing spans and row counters for the library code.
+
+csv_utils and the modules around it wrap their hot paths in named spans.
+These cover load (snapshot, parse, journal), scan, filter, sort,
+serialize and write. Streaming pipelines also count rows scanned and
+rows returned. Profiling is off by default. A disabled span is a shared
+no-op object, and pipelines are handed back unwrapped, so the cost is one
+flag check per call.
+
+Nothing is switched on at import. The command-line scripts take
+--profile, or read the PROMPTS_PROFILE environment variable, by running
+their main() through run():
+
+    --profile / PROMPTS_PROFILE=1           summary table on stderr at exit
+    --profile=trace.json                    Chrome trace file (open it in
+    PROMPTS_PROFILE=trace.json              chrome://tracing or Perfetto)
+
+Examples:
+    python find_prompts.py --search saxophone --profile
+    PROMPTS_PROFILE=/tmp/trace.json python stats.py --all
+    PROMPTS_DAEMON=0 python show_prompt.py 40 --profile   # time it in-process
+
+Spans are cheap enough to leave in place:
+
+    with profile.span('parse') as s:
+        rows = ...
+        s.add('rows', len(rows))
+
+    rows = profile.track('filter', rows, 'returned')
+"""
+
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+PROFILE_ENV = 'PROMPTS_PROFILE'
+
+enabled = False
+# Chrome trace output path; None prints the summary table instead
+trace_path: Optional[str] = None
+
+# (name, start ns, duration ns, thread id, args)
+_spans: List[tuple] = []
+_counters: Dict[str, int] = defaultdict(int)
+_origin_ns = time.perf_counter_ns()
+_registered = False
+
+
+class _NullSpan:
+    """What span() returns while profiling is off."""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return None
+
+    def add(self, key: str, n: int = 1):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('name', 'args', 'start')
+
+    def __init__(self, name: str, args: Dict):
+        self.name = name
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc):
+        _spans.append((self.name, self.start, time.perf_counter_ns() - self.start,
+                       threading.get_ident(), self.args))
+        return None
+
+    def add(self, key: str, n: int = 1):
+        """Add n to a count recorded with this span."""
+        self.args[key] = self.args.get(key, 0) + n
+
+
+def span(name: str, /, **args):
+    """Time a with-block as a span called name, with optional args."""
+    if not enabled:
+        return _NULL_SPAN
+    return _Span(name, args)
+
+
+def count(name: str, n: int = 1):
+    """Add n to a global counter (for events too small to time, like cache hits)."""
+    if enabled:
+        _counters[name] += n
+
+
+def _tracked(name: str, iterable: Iterable, counter: str):
+    iterator = iter(iterable)
+    start = time.perf_counter_ns()
+    busy = 0
+    items = 0
+    try:
+        while True:
+            before = time.perf_counter_ns()
+            try:
+                item = next(iterator)
+            except StopIteration:
+                busy += time.perf_counter_ns() - before
+                break
+            busy += time.perf_counter_ns() - before
+            items += 1
+            yield item
+    finally:
+        # Only time spent producing items counts, not time the consumer
+        # spends between them
+        _spans.append((name, start, busy, threading.get_ident(), {counter: items}))
+
+
+def track(name: str, iterable: Iterable, counter: str = 'rows') -> Iterable:
+    """
+    Time a lazy pipeline stage and count the items it yields.
+
+    Returns iterable unchanged while profiling is off. The span is recorded
+    when the stage is exhausted or closed (break, islice, garbage collection).
+    """
+    if not enabled:
+        return iterable
+    return _tracked(name, iterable, counter)
+
+
+def reset():
+    """Forget everything recorded so far."""
+    _spans.clear()
+    _counters.clear()
+
+
+def enable(setting: str = '1'):
+    """
+    Start profiling. At exit, a setting of '1', 'table' or 'yes' prints the
+    summary table; anything else is the path of a Chrome trace to write.
+    """
+    global enabled, trace_path, _registered
+    enabled = True
+    trace_path = None if setting.lower() in ('1', 'table', 'yes') else setting
+    if not _registered:
+        atexit.register(_report_at_exit)
+        _registered = True
+
+
+def disable():
+    global enabled
+    enabled = False
+
+
+def summary() -> Dict[str, Dict]:
+    """Per span name: calls, total/mean/max ms and summed counts."""
+    totals: Dict[str, Dict] = {}
+    for name, _, duration, _, args in _spans:
+        entry = totals.setdefault(name, {'calls': 0, 'total_ms': 0.0, 'max_ms': 0.0})
+        ms = duration / 1e6
+        entry['calls'] += 1
+        entry['total_ms'] += ms
+        entry['max_ms'] = max(entry['max_ms'], ms)
+        for key, value in args.items():
+            if isinstance(value, int) and not isinstance(value, bool):
+                entry[key] = entry.get(key, 0) + value
+    for entry in totals.values():
+        entry['mean_ms'] = entry['total_ms'] / entry['calls']
+    return totals
+
+
+def print_summary(out=None):
+    """Print the summary table, slowest span first."""
+    out = out or sys.stderr
+    totals = summary()
+    print(f"\n📊 Profile ({len(_spans)} spans)", file=out)
+    print(f"  {'span':<24} {'calls':>6} {'total ms':>10} {'mean ms':>10} {'max ms':>10}  counts", file=out)
+    for name, entry in sorted(totals.items(), key=lambda item: -item[1]['total_ms']):
+        counts = ', '.join(f"{key}={value:,}" for key, value in entry.items()
+                           if key not in ('calls', 'total_ms', 'max_ms', 'mean_ms'))
+        print(f"  {name:<24} {entry['calls']:>6} {entry['total_ms']:>10.2f} "
+              f"{entry['mean_ms']:>10.3f} {entry['max_ms']:>10.2f}  {counts}", file=out)
+    if _counters:
+        print("  counters: " + ', '.join(f"{key}={value:,}" for key, value in sorted(_counters.items())), file=out)
+
+
+def chrome_trace() -> Dict:
+    """The recorded spans in Chrome trace event format."""
+    pid = os.getpid()
+    events = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0,
+               'args': {'name': ' '.join([os.path.basename(sys.argv[0] or 'python')] + sys.argv[1:])}}]
+    for name, start, duration, tid, args in _spans:
+        events.append({'name': name, 'cat': name.split('.')[0], 'ph': 'X', 'pid': pid, 'tid': tid,
+                       'ts': (start - _origin_ns) / 1e3, 'dur': duration / 1e3,
+                       'args': {key: value for key, value in args.items() if value is not None}})
+    return {'traceEvents': events, 'displayTimeUnit': 'ms', 'otherData': {'counters': dict(_counters)}}
+
+
+def write_trace(path: str):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(chrome_trace(), f, default=str)
+
+
+def _report_at_exit():
+    if not _spans and not _counters:
+        return
+    if trace_path:
+        try:
+            write_trace(trace_path)
+            print(f"📊 Profile trace ({len(_spans)} spans) written to {trace_path}", file=sys.stderr)
+        except OSError as e:
+            print(f"❌ Could not write profile trace: {e}", file=sys.stderr)
+    else:
+        print_summary()
+
+
+def profile_option(args: List[str]) -> Tuple[Optional[str], List[str]]:
+    """
+    Split a --profile[=trace.json] option off a script's arguments.
+
+    Returns (setting, remaining args). The setting falls back to
+    PROMPTS_PROFILE and is None when profiling stays off.
+
+    Example:
+        setting, args = prompt_profile.profile_option(['--profile', '40'])
+    """
+    setting = os.environ.get(PROFILE_ENV, '')
+    rest = list(args)
+    for position, arg in enumerate(rest):
+        if arg == '--profile' or arg.startswith('--profile='):
+            setting = arg.partition('=')[2] or '1'
+            del rest[position]
+            break
+    return (setting if setting and setting != '0' else None), rest
+
+
+def run(main: Callable[[], Any]) -> Any:
+    """
+    Run a script's main() with --profile taken off sys.argv and profiling
+    enabled if it (or PROMPTS_PROFILE) asks for it.
+
+    Example:
+        if __name__ == "__main__":
+            prompt_profile.run(main)
+    """
+    setting, sys.argv[1:] = profile_option(sys.argv[1:])
+    if setting:
+        enable(setting)
+    return main()
@@ -0,0 +1,390 @@
+#!/usr/bin/env python3
+"""
+Small query language for filtering, sorting and limiting prompts.
+
+A query is a list of space-separated terms (quote values with spaces).
+All terms must match. Prefix a term with - to negate it.
+
+    bpm:100-110                 numeric range (also bpm:<100, bpm:>=105, bpm:108)
+    id:41  id:BONUS-3|41        Prompt_ID (id:100-120, id:>200 compare numeric IDs)
+    block:"Deep Focus Block 1|Deep Focus Block 2"
+                                set membership (| separates values)
+    instrument:sax              Key_Instruments contains "sax"
+    genre:"bossa nova|samba"    Primary_Genres contains either
+    mood:hypnotic  notes:clone  substring match on text columns
+    generated:yes  rated:no  excellent:yes
+    -block:"Morning Warmup"     negation
+    sort:-bpm  sort:block,bpm   sort keys (- for descending)
+    limit:10                    top-k
+
+Field names: id, block, bpm, wave, duration, genre, instrument, mood, suno,
+full, notes, generated, refined, rating, rated, excellent - or any CSV
+column name.
+
+The query compiles to a list of predicates evaluated in a single pass. When
+it constrains Time_Block or BPM, cached secondary indexes narrow the rows
+that need checking.
+
+Usage:
+    python prompt_query.py 'generated:yes rated:no bpm:<100'
+    python prompt_query.py 'block:"Deep Focus Block 1|Deep Focus Block 2" sort:-bpm limit:5'
+"""
+
+import heapq
+import operator
+import re
+import shlex
+import sys
+from bisect import bisect_left, bisect_right
+from collections import defaultdict
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+import csv_utils
+import prompt_profile
+
+FIELD_ALIASES = {
+    'id': 'Prompt_ID',
+    'block': 'Time_Block',
+    'bpm': 'BPM',
+    'wave': 'Brain_Wave_Target',
+    'duration': 'Duration_Type',
+    'genre': 'Primary_Genres',
+    'instrument': 'Key_Instruments',
+    'mood': 'Mood_Keywords',
+    'suno': 'Suno_Short_Prompt',
+    'full': 'Full_Prompt',
+    'notes': 'Notes',
+    'generated': 'Generated',
+    'refined': 'Suno_Refined',
+    'rating': 'Rating',
+}
+
+NUMERIC_FIELDS = {'BPM'}
+# Strings that compare as numbers when both sides parse
+ID_FIELDS = {'Prompt_ID'}
+LIST_FIELDS = {'Primary_Genres', 'Key_Instruments'}
+TEXT_FIELDS = {'Mood_Keywords', 'Suno_Short_Prompt', 'Full_Prompt', 'Notes', 'Rating'}
+
+_RANGE_RE = re.compile(r'^(-?\d+(?:\.\d+)?)-(-?\d+(?:\.\d+)?)$')
+_COMPARE_RE = re.compile(r'^(<=|>=|<|>|=)?\s*(-?\d+(?:\.\d+)?)$')
+_ID_COMPARE_RE = re.compile(r'^(<=|>=|<|>)\s*(.+)$')
+_ID_OPERATORS = {'<': operator.lt, '<=': operator.le, '>': operator.gt, '>=': operator.ge}
+
+Predicate = Callable[[Mapping[str, str]], bool]
+
+
+def _number(value: Optional[str]) -> Optional[float]:
+    """Parse a numeric column, returning None for blanks and non-numbers."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _id_key(value: Optional[str]) -> Tuple[Optional[float], str]:
+    """(number, '') for a numeric ID, (None, lowercased text) otherwise."""
+    number = _number(value)
+    return (number, '') if number is not None else (None, (value or '').strip().lower())
+
+
+def _is_yes(value: str) -> bool:
+    return value.lower() in ('yes', 'y', 'true', '1')
+
+
+class Query:
+    """A compiled query: predicates plus index hints, sort keys and limit."""
+
+    def __init__(self):
+        self.predicates: List[Predicate] = []
+        self.sort_keys: List[Tuple[str, bool]] = []   # (field, descending)
+        self.limit: Optional[int] = None
+        # Positive constraints the secondary indexes can answer
+        self.blocks: Optional[set] = None
+        self.bpm_range: Optional[Tuple[float, float]] = None
+
+    def matches(self, prompt: Mapping[str, str]) -> bool:
+        return all(predicate(prompt) for predicate in self.predicates)
+
+    def _sort_key(self, item: Tuple[int, Mapping[str, str]]) -> tuple:
+        position, prompt = item
+        key = []
+        for field, descending in self.sort_keys:
+            value = prompt.get(field) or ''
+            number = _number(value) if field in NUMERIC_FIELDS or field in ID_FIELDS else None
+            if number is not None:
+                key.append((0, -number if descending else number, ''))
+            elif descending:
+                # Invert each character so a plain ascending sort puts z before a
+                key.append((1, 0, ''.join(chr(0x10FFFF - ord(c)) for c in value.lower())))
+            else:
+                key.append((1, 0, value.lower()))
+        key.append(position)
+        return tuple(key)
+
+    def run(self, prompts: Iterable[Mapping[str, str]], limit: Optional[int] = None) -> List[Mapping[str, str]]:
+        """
+        Evaluate the query over prompts in a single streaming pass.
+
+        limit caps the results on top of the query's own limit. Without
+        sort keys it stops reading as soon as limit matches are found;
+        with sort keys and a limit only the best limit rows are kept.
+        """
+        if self.limit is not None:
+            limit = self.limit if limit is None else min(self.limit, limit)
+        prompts = prompt_profile.track('scan', prompts, 'scanned')
+        matched = ((position, prompt) for position, prompt in enumerate(prompts) if self.matches(prompt))
+        matched = prompt_profile.track('filter', matched, 'returned')
+
+        if not self.sort_keys:
+            results = []
+            for _, prompt in matched:
+                if limit is not None and len(results) >= limit:
+                    break
+                results.append(prompt)
+            return results
+
+        with prompt_profile.span('sort'):
+            if limit is not None:
+                best = heapq.nsmallest(limit, matched, key=self._sort_key)
+            else:
+                best = sorted(matched, key=self._sort_key)
+        return [prompt for _, prompt in best]
+
+
+def _field(name: str) -> str:
+    """Resolve a field alias to its CSV column name."""
+    return FIELD_ALIASES.get(name.lower(), name)
+
+
+def _compile_id(field: str, value: str) -> Predicate:
+    """
+    Compile a Prompt_ID term. IDs are strings - hand-added ones like
+    BONUS-3 aren't numbers - so a range only matches numeric IDs, and a
+    comparison or equality is numeric when both sides parse and textual
+    when neither does.
+    """
+    match = _RANGE_RE.match(value)
+    if match:
+        low, high = float(match.group(1)), float(match.group(2))
+
+        def in_range(p):
+            number = _number(p.get(field))
+            return number is not None and low <= number <= high
+        return in_range
+
+    match = _ID_COMPARE_RE.match(value)
+    if match:
+        compare, wanted = _ID_OPERATORS[match.group(1)], _id_key(match.group(2))
+
+        def compares(p):
+            key = _id_key(p.get(field))
+            return (key[0] is None) == (wanted[0] is None) and compare(key, wanted)
+        return compares
+
+    wanted = {_id_key(option) for option in value.lstrip('=').split('|') if option.strip()}
+    return lambda p: _id_key(p.get(field)) in wanted
+
+
+def _compile_term(query: Query, name: str, value: str, negate: bool) -> Predicate:
+    """Compile one field:value term into a predicate, recording index hints."""
+    key = name.lower()
+
+    if key == 'rated':
+        want = _is_yes(value)
+        return lambda p: bool((p.get('Rating') or '').strip()) == want
+
+    if key == 'excellent':
+        want = _is_yes(value)
+        return lambda p: ('⭐' in (p.get('Rating') or '')) == want
+
+    field = _field(name)
+
+    if field == 'Generated':
+        want = _is_yes(value)
+        return lambda p: (p.get('Generated') == 'Yes') == want
+
+    if field in ID_FIELDS:
+        return _compile_id(field, value)
+
+    if field in NUMERIC_FIELDS:
+        match = _RANGE_RE.match(value)
+        if match:
+            low, high = float(match.group(1)), float(match.group(2))
+        else:
+            match = _COMPARE_RE.match(value)
+            if not match:
+                raise ValueError(f"Expected a number or range for {name}: {value!r}")
+            op, number = match.group(1) or '=', float(match.group(2))
+            low, high = {
+                '=': (number, number),
+                '<': (float('-inf'), number - 1e-9),
+                '<=': (float('-inf'), number),
+                '>': (number + 1e-9, float('inf')),
+                '>=': (number, float('inf')),
+            }[op]
+        if field == 'BPM' and not negate:
+            current = query.bpm_range or (float('-inf'), float('inf'))
+            query.bpm_range = (max(current[0], low), min(current[1], high))
+
+        def in_range(p, field=field, low=low, high=high):
+            number = _number(p.get(field))
+            return number is not None and low <= number <= high
+        return in_range
+
+    options = [option.strip().lower() for option in value.split('|') if option.strip()]
+
+    if field in LIST_FIELDS or field in TEXT_FIELDS:
+        return lambda p: any(option in (p.get(field) or '').lower() for option in options)
+
+    if field == 'Time_Block' and not negate:
+        query.blocks = set(options) if query.blocks is None else query.blocks & set(options)
+
+    wanted = set(options)
+    return lambda p: (p.get(field) or '').strip().lower() in wanted
+
+
+def compile_query(text: str) -> Query:
+    """
+    Compile query text into a Query.
+
+    Raises:
+        ValueError: On malformed terms, or a negated sort: or limit:
+    """
+    query = Query()
+
+    for term in shlex.split(text):
+        negate = term.startswith('-') and len(term) > 1
+        if negate:
+            term = term[1:]
+
+        if ':' not in term:
+            raise ValueError(f"Expected field:value, got {term!r}")
+        name, value = term.split(':', 1)
+
+        if name.lower() in ('sort', 'limit') and negate:
+            raise ValueError(f"{name}: can't be negated (for descending order use sort:-{value.lstrip('-')})"
+                             if name.lower() == 'sort' else f"{name}: can't be negated")
+
+        if name.lower() == 'sort':
+            for key in value.split(','):
+                descending = key.startswith('-')
+                query.sort_keys.append((_field(key.lstrip('-')), descending))
+            continue
+
+        if name.lower() == 'limit':
+            query.limit = int(value)
+            continue
+
+        predicate = _compile_term(query, name, value, negate)
+        if negate:
+            predicate = (lambda inner: lambda p: not inner(p))(predicate)
+        query.predicates.append(predicate)
+
+    return query
+
+
+class SecondaryIndexes:
+    """Time_Block and BPM lookups over a loaded library."""
+
+    def __init__(self, prompts: Tuple[Mapping[str, str], ...]):
+        self.blocks: Dict[str, List[int]] = defaultdict(list)
+        bpms = []
+        for position, prompt in enumerate(prompts):
+            self.blocks[(prompt.get('Time_Block') or '').strip().lower()].append(position)
+            bpm = _number(prompt.get('BPM'))
+            if bpm is not None:
+                bpms.append((bpm, position))
+        bpms.sort()
+        self.bpm_values = [bpm for bpm, _ in bpms]
+        self.bpm_positions = [position for _, position in bpms]
+
+    def candidates(self, query: Query) -> Optional[List[int]]:
+        """Positions that can satisfy the query's indexed terms, or None for all."""
+        found: Optional[set] = None
+
+        if query.blocks is not None:
+            found = {position for block in query.blocks for position in self.blocks.get(block, [])}
+
+        if query.bpm_range is not None:
+            low, high = query.bpm_range
+            start = bisect_left(self.bpm_values, low)
+            end = bisect_right(self.bpm_values, high)
+            in_range = set(self.bpm_positions[start:end])
+            found = in_range if found is None else found & in_range
+
+        return None if found is None else sorted(found)
+
+
+# Resolved CSV path -> (rows the indexes were built from, indexes)
+_indexes: Dict[Path, Tuple[tuple, SecondaryIndexes]] = {}
+
+
+def get_indexes(csv_path: Optional[Path] = None) -> SecondaryIndexes:
+    """Return secondary indexes for the cached library, rebuilding if it changed."""
+    path = Path(csv_path or csv_utils.CSV_PATH).resolve()
+    prompts = csv_utils.load_prompts(path)
+
+    built, indexes = _indexes.get(path, (None, None))
+    if built is not prompts:
+        indexes = SecondaryIndexes(prompts)
+        _indexes[path] = (prompts, indexes)
+    return indexes
+
+
+def query_prompts(query, prompts: Optional[Iterable[Mapping[str, str]]] = None,
+                  csv_path: Optional[Path] = None, limit: Optional[int] = None) -> List[Dict[str, str]]:
+    """
+    Run a query (text or compiled Query) and return matching prompt rows.
+
+    With prompts given the query streams over them directly. Otherwise it
+    runs against the cached library, using secondary indexes when the query
+    constrains Time_Block or BPM. limit caps the results on top of any
+    limit: term in the query.
+
+    Examples:
+        query_prompts('bpm:100-110 generated:yes rated:no')
+        query_prompts('instrument:saxophone sort:-bpm limit:3')
+    """
+    if isinstance(query, str):
+        query = compile_query(query)
+
+    if prompts is None:
+        library = csv_utils.load_prompts(csv_path)
+        positions = get_indexes(csv_path).candidates(query)
+        prompts = library if positions is None else (library[position] for position in positions)
+
+    return [dict(prompt) for prompt in query.run(prompts, limit)]
+
+
+def main():
+    from prompt_output import parse_output_args, write_rows
+
+    if len(sys.argv) < 2:
+        print("Usage: python prompt_query.py '<query>' [--format json|jsonl|tsv] [--fields <a,b,...>] [--offset N] [--limit N]")
+        print(__doc__)
+        sys.exit(1)
+
+    try:
+        options, args = parse_output_args(sys.argv[1:])
+        results = options.page(query_prompts(' '.join(args), limit=options.fetch_limit()))
+        if options.machine:
+            write_rows(results, options)
+            return
+        results = list(results)
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    if not results:
+        print("No prompts found matching criteria.")
+        return
+
+    print(f"\n✅ Found {len(results)} prompt(s):\n")
+    for prompt in results:
+        print(f"  {prompt['Prompt_ID']:>6} | {prompt['Time_Block']:30} | BPM {prompt['BPM']:>3} | {prompt['Primary_Genres']}")
+        if prompt.get('Rating') and prompt['Rating'].strip():
+            print(f"         └─ {prompt['Rating']}")
+
+if __name__ == "__main__":
+    prompt_profile.run(main)
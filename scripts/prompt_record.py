@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Compact typed record for one prompt row.
+
+Prompt stores each column in a __slots__ attribute instead of a per-row
+dict, interns the low-cardinality categorical values (Time_Block,
+Brain_Wave_Target, Duration_Type, ...) so every row shares one string
+object, and exposes typed accessors:
+
+    prompt.bpm            int (None if blank or not a number)
+    prompt.generated      bool
+    prompt.rating_tier    0 (Terrible) .. 5 (Excellent), None if unrated
+    prompt.starred        bool (rating contains ⭐)
+    prompt.rating_score   RatingScore(tier, starred, tags), None if unrated
+
+It is also a read-only Mapping with exactly the keys and string values of
+the csv.DictReader row, so existing code (prompt['BPM'], print_prompt,
+dict(prompt)) keeps working unchanged.
+"""
+
+import re
+import sys
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+# CSV column -> slot name
+FIELD_SLOTS = {
+    'Prompt_ID': 'prompt_id',
+    'Time_Block': 'time_block',
+    'BPM': 'bpm_text',
+    'Brain_Wave_Target': 'brain_wave_target',
+    'Duration_Type': 'duration_type',
+    'Primary_Genres': 'primary_genres',
+    'Key_Instruments': 'key_instruments',
+    'Mood_Keywords': 'mood_keywords',
+    'Suno_Short_Prompt': 'suno_short_prompt',
+    'Full_Prompt': 'full_prompt',
+    'Notes': 'notes',
+    'Generated': 'generated_text',
+    'Suno_Refined': 'suno_refined',
+    'Rating': 'rating',
+}
+
+# Columns with few distinct values, stored as shared interned strings
+INTERNED_FIELDS = {'Time_Block', 'BPM', 'Brain_Wave_Target', 'Duration_Type', 'Generated', 'Suno_Refined'}
+
+# Rating words mapped to a 0-5 tier
+RATING_TIERS = [
+    ('terrible', 0),
+    ('bad', 1),
+    ('okay', 2),
+    ('mixed', 2),
+    ('needs testing', None),
+    ('pretty good', 3),
+    ('very good', 4),
+    ('excellent', 5),
+]
+
+# Display label per tier, and for prompts without a rating
+TIER_LABELS = {
+    0: 'Terrible',
+    1: 'Bad',
+    2: 'Okay',
+    3: 'Pretty good',
+    4: 'Very good',
+    5: 'Excellent',
+    None: 'Other',
+}
+UNRATED = 'Unrated'
+
+# A rating word, unless negated ("not bad")
+_RATING_RE = re.compile(r"(?<!not )(?<!n't )\b(?:" + '|'.join(re.escape(word) for word, _ in RATING_TIERS) + r")\b",
+                        re.IGNORECASE)
+_TIERS = dict(RATING_TIERS)
+
+# Keyword tags: tag -> phrases in the rating text that add it
+RATING_KEYWORDS = {
+    'inconsistent': ('one version', 'other version', 'mediocre'),
+    'playful': ('playful', 'toy', "children's", 'music box'),
+    'distracting': ('distracting', 'annoying'),
+    'vocals': ('vocal',),
+    'texture': ('texture',),
+    'untested': ('needs testing', 'test rating'),
+}
+
+
+class RatingScore(NamedTuple):
+    """A free-text rating, parsed."""
+
+    tier: Optional[int]
+    starred: bool
+    # A sentiment tag (positive, mixed or negative, from the tier) plus
+    # any RATING_KEYWORDS tags
+    tags: FrozenSet[str]
+
+    @property
+    def fitness(self) -> Optional[int]:
+        """Tier plus one for ⭐ (0-6), None when the tier is unknown."""
+        return None if self.tier is None else self.tier + (1 if self.starred else 0)
+
+
+def parse_bpm(text: Optional[str]) -> Optional[int]:
+    """Parse the BPM column, returning None for blanks and non-numbers."""
+    try:
+        return int(text)
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_rating(text: Optional[str]) -> Tuple[Optional[int], bool]:
+    """
+    Return (tier, starred) for a free-text rating; tier is None when unknown.
+
+    The verdict is the leading phrase, before any " - " comment, so
+    "Very good - not bad for a clone" is Very good; the comment is only
+    searched when the leading phrase has no tier word. Negated words are
+    skipped, so "not bad, very good" is Very good too.
+    """
+    if not text or not text.strip():
+        return None, False
+    verdict, _, comment = text.partition(' - ')
+    match = _RATING_RE.search(verdict) or _RATING_RE.search(comment)
+    tier = _TIERS[match.group().lower()] if match else None
+    return tier, '⭐' in text
+
+
+@lru_cache(maxsize=4096)
+def parse_rating_score(text: Optional[str]) -> Optional[RatingScore]:
+    """
+    Parse a free-text rating into tier, star and tags; None when blank.
+
+    Example:
+        parse_rating_score("Bad - harp sounds like a toy, too playful")
+        # RatingScore(tier=1, starred=False, tags=frozenset({'negative', 'playful'}))
+    """
+    if not text or not text.strip():
+        return None
+    tier, starred = parse_rating(text)
+    lowered = text.lower()
+    tags = {tag for tag, phrases in RATING_KEYWORDS.items() if any(phrase in lowered for phrase in phrases)}
+    if tier is not None:
+        tags.add('positive' if tier >= 3 else 'mixed' if tier == 2 else 'negative')
+    return RatingScore(tier, starred, frozenset(tags))
+
+
+def typed_value(field: str, text: Optional[str]):
+    """Convert a column's text to its typed value (int BPM, bool Generated)."""
+    if field == 'BPM':
+        return parse_bpm(text)
+    if field == 'Generated':
+        return text == 'Yes'
+    return text
+
+
+def _intern(value):
+    return sys.intern(value) if isinstance(value, str) else value
+
+
+class Prompt(Mapping):
+    """One prompt row: typed attributes plus a read-only dict-compatible view."""
+
+    __slots__ = tuple(FIELD_SLOTS.values()) + ('bpm', '_keys', '_other')
+
+    def __init__(self, row: Mapping, keys: Optional[Tuple] = None):
+        """
+        Args:
+            row: A csv.DictReader-style row
+            keys: Shared tuple of the row's keys in order. Passing the same
+                tuple for every row of a file avoids storing one per row.
+        """
+        object.__setattr__(self, '_keys', keys if keys is not None else tuple(row.keys()))
+        other = None
+        for key in self._keys:
+            value = row.get(key)
+            slot = FIELD_SLOTS.get(key)
+            if slot is None:
+                if other is None:
+                    other = {}
+                other[key] = value
+            else:
+                object.__setattr__(self, slot, _intern(value) if key in INTERNED_FIELDS else value)
+        for key, slot in FIELD_SLOTS.items():
+            if key not in self._keys:
+                object.__setattr__(self, slot, None)
+        object.__setattr__(self, '_other', other)
+        object.__setattr__(self, 'bpm', parse_bpm(self.bpm_text))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("Prompt is read-only - use dict(prompt) for a modifiable copy")
+
+    @property
+    def generated(self) -> bool:
+        return self.generated_text == 'Yes'
+
+    @property
+    def rating_tier(self) -> Optional[int]:
+        return parse_rating(self.rating)[0]
+
+    @property
+    def starred(self) -> bool:
+        return bool(self.rating) and '⭐' in self.rating
+
+    @property
+    def rating_score(self) -> Optional[RatingScore]:
+        return parse_rating_score(self.rating)
+
+    def __getitem__(self, key):
+        if key in self._keys:
+            slot = FIELD_SLOTS.get(key)
+            return getattr(self, slot) if slot is not None else self._other[key]
+        raise KeyError(key)
+
+    def __contains__(self, key) -> bool:
+        return key in self._keys
+
+    def __iter__(self):
+        return iter(self._keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __repr__(self) -> str:
+        return f"Prompt({self.prompt_id!r}, {self.time_block!r}, bpm={self.bpm})"
+
+    def to_dict(self) -> Dict[str, str]:
+        """Return a modifiable csv.DictReader-style copy."""
+        return {key: self[key] for key in self._keys}
+
+
+def iter_rows(rows: Iterable[Mapping]) -> Iterator[Prompt]:
+    """Convert DictReader rows to Prompts one at a time, sharing key tuples between rows."""
+    shared: Dict[Tuple, Tuple] = {}
+    for row in rows:
+        keys = tuple(row.keys())
+        yield Prompt(row, shared.setdefault(keys, keys))
+
+
+def from_rows(rows: Iterable[Mapping]) -> Tuple[Prompt, ...]:
+    """Convert DictReader rows to Prompts, sharing key tuples between rows."""
+    return tuple(iter_rows(rows))
+
+
+def from_columns(fieldnames: Sequence[str], columns: Sequence[Sequence],
+                 extras: Optional[Dict[int, List[str]]] = None) -> Tuple[Prompt, ...]:
+    """
+    Build Prompts from column-wise values (one sequence per field, all the
+    same length), as stored by prompt_snapshot. Equivalent to from_rows()
+    on the matching DictReader rows, but fills each slot a column at a time.
+
+    extras maps a row position to its surplus values (DictReader's None key).
+    """
+    extras = extras or {}
+    keys = tuple(fieldnames)
+    extra_keys = keys + (None,)
+    count = len(columns[0]) if columns else 0
+    prompts = [object.__new__(Prompt) for _ in range(count)]
+    others: Dict[int, Dict] = {position: {None: values} for position, values in extras.items()}
+
+    for field, column in zip(keys, columns):
+        slot = FIELD_SLOTS.get(field)
+        if slot is None:
+            for position, value in enumerate(column):
+                others.setdefault(position, {})[field] = value
+            continue
+        if field in INTERNED_FIELDS:
+            column = [_intern(value) for value in column]
+        setter = getattr(Prompt, slot).__set__
+        for prompt, value in zip(prompts, column):
+            setter(prompt, value)
+
+    for field, slot in FIELD_SLOTS.items():
+        if field not in keys:
+            setter = getattr(Prompt, slot).__set__
+            for prompt in prompts:
+                setter(prompt, None)
+
+    bpm_setter = getattr(Prompt, 'bpm').__set__
+    keys_setter = getattr(Prompt, '_keys').__set__
+    other_setter = getattr(Prompt, '_other').__set__
+    bpms: Dict = {}
+    for position, prompt in enumerate(prompts):
+        text = prompt.bpm_text
+        bpm = bpms[text] if text in bpms else bpms.setdefault(text, parse_bpm(text))
+        bpm_setter(prompt, bpm)
+        keys_setter(prompt, extra_keys if position in extras else keys)
+        other_setter(prompt, others.get(position))
+    return tuple(prompts)
@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""
+"More like this": nearest prompts by TF-IDF cosine similarity.
+
+Each prompt becomes a sparse vector of terms:
+
+    g:<genre>  i:<instrument>  m:<mood>    whole Primary_Genres,
+                                           Key_Instruments and Mood_Keywords
+                                           items ("i:upright bass")
+    <word>                                 words of those items and of
+                                           Full_Prompt (3+ letters, common
+                                           English words dropped)
+
+Term counts are damped (1 + log count) and weighted by inverse document
+frequency, so a rare instrument says more about a prompt than "groove";
+terms in over a fifth of the prompts are ignored altogether. Each prompt
+keeps only its TOP_TERMS highest-weighted terms (chosen when it is
+indexed), and similarity is the cosine of these pruned vectors.
+Document frequencies still count every term of every prompt.
+
+Postings lists map each term to the prompts that kept it, ordered by
+the weight the term carries in each prompt's normalized vector (as of
+when the list was last written). A query
+touches only prompts that share a term with it, walks at most
+MAX_POSTINGS entries of each list, and keeps the top k with a heap.
+
+The index is kept in a sidecar (programming_music_prompts.csv.tfidf)
+stamped with the library version it describes, in the blob layout of
+prompt_blobs.py: a query reads the postings of its own terms and
+nothing else. When the stamp doesn't match, rows are compared against a
+digest of their text and only new or edited prompts are re-tokenized.
+Row norms depend on the document frequencies, so they are recomputed
+from the stored vectors (no tokenizing) after a change.
+
+Usage:
+    python prompt_similar.py 40                # 10 prompts most like #40
+    python prompt_similar.py 40 -k 5
+    python prompt_similar.py --text "vibraphone, upright bass, late night jazz"
+    python show_prompt.py 40 --similar 10
+"""
+
+import hashlib
+import heapq
+import math
+import re
+import struct
+import sys
+import zlib
+from array import array
+from itertools import islice
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+import csv_utils
+import prompt_profile
+from prompt_blobs import BlobReader, BlobWriter, read_blobs
+from prompt_output import print_similar
+
+SIMILAR_SUFFIX = '.tfidf'
+SIMILAR_VERSION = 2
+
+DEFAULT_K = 10
+
+# Terms in more than this share of prompts are ignored: they barely move
+# the scores but their postings lists are the longest to walk
+MAX_DF = 0.2
+# Terms kept per prompt, highest TF-IDF weight first
+TOP_TERMS = 24
+# Postings walked per query term, highest impact first
+MAX_POSTINGS = 2000
+
+# (column, term prefix) for the comma-separated columns
+LIST_FIELDS = (('Primary_Genres', 'g'), ('Key_Instruments', 'i'), ('Mood_Keywords', 'm'))
+TEXT_FIELDS = ('Full_Prompt',)
+
+STOPWORDS = frozenset("""
+    and the with for that this from into over under through while its are was were
+    has have had but not all any some each more most very just than then them they
+    their there these those who what when where which will would can could should
+    like feel feels feeling sound sounds track music song instrumental bpm
+""".split())
+
+_WORD_RE = re.compile(r"[a-z][a-z'-]+")
+
+
+def terms(prompt: Mapping[str, str]) -> Dict[str, int]:
+    """Term counts for a prompt (see the module docstring for the terms)."""
+    counts: Dict[str, int] = {}
+    for field, prefix in LIST_FIELDS:
+        for item in (prompt.get(field) or '').split(','):
+            item = ' '.join(item.lower().split())
+            if not item:
+                continue
+            key = f"{prefix}:{item}"
+            counts[key] = counts.get(key, 0) + 1
+            for word in _WORD_RE.findall(item):
+                if len(word) > 2 and word not in STOPWORDS:
+                    counts[word] = counts.get(word, 0) + 1
+    for field in TEXT_FIELDS:
+        for word in _WORD_RE.findall((prompt.get(field) or '').lower()):
+            if len(word) > 2 and word not in STOPWORDS:
+                counts[word] = counts.get(word, 0) + 1
+    return counts
+
+
+def _digest(prompt: Mapping[str, str]) -> bytes:
+    text = '\x1f'.join(prompt.get(field) or '' for field in
+                       [field for field, _ in LIST_FIELDS] + list(TEXT_FIELDS))
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest()
+
+
+def _damped(counts: Mapping[str, int]) -> Dict[str, float]:
+    return {term: 1.0 + math.log(count) for term, count in counts.items()}
+
+
+def _term_key(term: str) -> int:
+    # Document frequencies are keyed by a term hash, so a prompt's full
+    # term set can be stored compactly and subtracted when it changes
+    return zlib.crc32(term.encode('utf-8'))
+
+
+class SimilarityIndex:
+    """Pruned TF-IDF rows by prompt ID, with impact-ordered postings per term."""
+
+    def __init__(self):
+        # Prompt_ID -> text digest
+        self.digests: Dict[str, bytes] = {}
+        # _term_key -> number of prompts using the term
+        self.df: Dict[int, int] = {}
+        # Prompt_ID -> vector length under the current IDF
+        self.norms: Dict[str, float] = {}
+        # Prompt_ID -> ({kept term: damped count}, _term_key of every term as
+        # array bytes), for prompts read from the sidecar or indexed since
+        self.vectors: Dict[str, Tuple[Dict[str, float], bytes]] = {}
+        # term -> {Prompt_ID: damped count}, likewise; {} for a dropped term
+        self.postings: Dict[str, Dict[str, float]] = {}
+        # Library version the index describes, and the sidecar it was read from
+        self.stamp: Optional[list] = None
+        self._blobs: Optional[BlobReader] = None
+
+    def __len__(self) -> int:
+        return len(self.digests)
+
+    def idf(self, term: str) -> float:
+        """Inverse document frequency; 0 for unknown terms and terms above MAX_DF."""
+        df = self.df.get(_term_key(term), 0)
+        if not df or df > MAX_DF * len(self.digests):
+            return 0.0
+        return math.log((len(self.digests) + 1) / (df + 1))
+
+    def vector(self, prompt_id: str) -> Optional[Dict[str, float]]:
+        """A prompt's kept terms and damped counts, or None if it isn't indexed."""
+        entry = self._entry(prompt_id)
+        return entry[0] if entry else None
+
+    def _entry(self, prompt_id: str) -> Optional[Tuple[Dict[str, float], bytes]]:
+        entry = self.vectors.get(prompt_id)
+        if entry is None and self._blobs is not None and prompt_id in self.digests:
+            entry = self._blobs.load('docs', prompt_id)
+        return entry
+
+    def _postings(self, term: str) -> Dict[str, float]:
+        postings = self.postings.get(term)
+        if postings is None:
+            postings = self.postings[term] = dict(self._blobs.load('terms', term, ()) if self._blobs else ())
+        return postings
+
+    def remove(self, prompt_id: str):
+        entry = self._entry(prompt_id)
+        if self.digests.pop(prompt_id, None) is None:
+            return
+        self.norms.pop(prompt_id, None)
+        self.vectors.pop(prompt_id, None)
+        vector, keys = entry
+        for key in array('I', keys):
+            self.df[key] -= 1
+            if not self.df[key]:
+                del self.df[key]
+        for term in vector:
+            self._postings(term).pop(prompt_id, None)
+
+    def sync(self, prompts: Iterable[Mapping[str, str]]) -> int:
+        """
+        Bring the index up to date with a full library, tokenizing only new
+        or edited prompts. Returns the number added, changed or removed.
+        """
+        seen = set()
+        changed = []
+        for prompt in prompts:
+            prompt_id = prompt['Prompt_ID']
+            seen.add(prompt_id)
+            digest = _digest(prompt)
+            if self.digests.get(prompt_id) != digest:
+                changed.append((prompt_id, digest, _damped(terms(prompt))))
+        removed = [pid for pid in self.digests if pid not in seen]
+        for prompt_id in removed:
+            self.remove(prompt_id)
+
+        # Count every new term set first, so pruning sees the final IDF
+        for prompt_id, digest, vector in changed:
+            self.remove(prompt_id)
+            keys = array('I', sorted({_term_key(term) for term in vector}))
+            for key in keys:
+                self.df[key] = self.df.get(key, 0) + 1
+            self.digests[prompt_id] = digest
+            self.vectors[prompt_id] = ({}, keys.tobytes())
+        for prompt_id, _, vector in changed:
+            kept = heapq.nlargest(TOP_TERMS, ((weight * self.idf(term), term) for term, weight in vector.items()))
+            kept = {term: vector[term] for score, term in kept if score > 0}
+            self.vectors[prompt_id] = (kept, self.vectors[prompt_id][1])
+            for term, weight in kept.items():
+                self._postings(term)[prompt_id] = weight
+
+        if changed or removed:
+            self._update_norms()
+        return len(changed) + len(removed)
+
+    def _update_norms(self):
+        idf: Dict[str, float] = {}
+        for prompt_id in self.digests:
+            vector = self._entry(prompt_id)[0]
+            total = 0.0
+            for term, weight in vector.items():
+                if term not in idf:
+                    idf[term] = self.idf(term)
+                total += (weight * idf[term]) ** 2
+            self.norms[prompt_id] = math.sqrt(total)
+
+    def query(self, vector: Mapping[str, float], k: int = DEFAULT_K,
+              exclude: Optional[str] = None) -> List[Tuple[str, float]]:
+        """The k indexed prompts with the highest cosine similarity to vector."""
+        # term -> (query TF-IDF weight, IDF)
+        weights = {}
+        for term, weight in vector.items():
+            idf = self.idf(term)
+            if idf:
+                weights[term] = (weight * idf, idf)
+        query_norm = math.sqrt(sum(w * w for w, _ in weights.values()))
+        if not query_norm:
+            return []
+
+        scores: Dict[str, float] = {}
+        get = scores.get
+        for term, (query_weight, idf) in weights.items():
+            factor = query_weight * idf
+            for pid, weight in islice(self._postings(term).items(), MAX_POSTINGS):
+                scores[pid] = get(pid, 0.0) + factor * weight
+        scores.pop(exclude, None)
+
+        norms = self.norms
+        best = heapq.nlargest(k, ((pid, score / (norms[pid] * query_norm)) for pid, score in scores.items()),
+                              key=lambda item: item[1])
+        return best
+
+    def similar_to(self, prompt_id: str, k: int = DEFAULT_K) -> List[Tuple[str, float]]:
+        """The k prompts most like an indexed prompt (itself excluded)."""
+        vector = self.vector(prompt_id)
+        if vector is None:
+            raise LookupError(f"Prompt {prompt_id} not found")
+        return self.query(vector, k, exclude=prompt_id)
+
+    def to_bytes(self) -> bytes:
+        """Serialize the index: a header, then one blob per term and per prompt."""
+        writer = BlobWriter()
+        stored = self._blobs
+        norms = self.norms
+        for term in set(self.postings).union(stored.keys('terms') if stored else ()):
+            if term not in self.postings:
+                writer.put('terms', term, stored.raw('terms', term))
+            elif self.postings[term]:
+                writer.dump('terms', term, sorted(self.postings[term].items(),
+                                                  key=lambda item: -item[1] / (norms[item[0]] or 1.0)))
+        for prompt_id in self.digests:
+            if prompt_id in self.vectors:
+                writer.dump('docs', prompt_id, self.vectors[prompt_id])
+            else:
+                writer.put('docs', prompt_id, stored.raw('docs', prompt_id))
+        return writer.to_bytes((SIMILAR_VERSION, self.stamp, self.digests, self.df, self.norms))
+
+    @classmethod
+    def from_file(cls, path: Path) -> Optional['SimilarityIndex']:
+        """Open a serialized index; vectors and postings are read as queries need them."""
+        header, blobs = read_blobs(path)
+        version, stamp, digests, df, norms = header
+        if version != SIMILAR_VERSION:
+            return None
+        index = cls()
+        index.stamp, index.digests, index.df, index.norms = stamp, digests, df, norms
+        index._blobs = blobs
+        return index
+
+
+def similar_path(csv_path: Optional[Path] = None) -> Path:
+    return csv_utils.sidecar_path(SIMILAR_SUFFIX, csv_path)
+
+
+def _read_index(path: Path) -> Optional[SimilarityIndex]:
+    try:
+        return SimilarityIndex.from_file(similar_path(path))
+    except (OSError, ValueError, EOFError, TypeError, struct.error):
+        return None
+
+
+def _write_index(index: SimilarityIndex, path: Path) -> SimilarityIndex:
+    """Persist the index and return it re-opened from the sidecar (or as is, if it can't be written)."""
+    try:
+        csv_utils.write_atomic(similar_path(path), index.to_bytes())
+    except OSError:
+        return index  # a read-only directory just means tokenizing again next time
+    return _read_index(path) or index
+
+
+# Resolved CSV path -> index; its stamp says which library version it describes
+_indexes: Dict[Path, SimilarityIndex] = {}
+
+
+def get_index(csv_path: Optional[Path] = None) -> SimilarityIndex:
+    """Return the TF-IDF index for a library, synced with the file on disk."""
+    path = Path(csv_path or csv_utils.CSV_PATH).resolve()
+    stamp = list(csv_utils.library_stamp(path))
+
+    index = _indexes.get(path)
+    if index is None:
+        index = _read_index(path) or SimilarityIndex()
+    if index.stamp != stamp:
+        with prompt_profile.span('similar.sync') as timing:
+            timing.add('changed', index.sync(csv_utils.load_prompts(path)))
+        index.stamp = stamp
+        index = _write_index(index, path)
+    _indexes[path] = index
+    return index
+
+
+def _with_scores(matches: List[Tuple[str, float]]) -> List[Dict[str, str]]:
+    rows = []
+    for prompt_id, score in matches:
+        row = csv_utils.get_prompt(prompt_id)
+        if row is not None:
+            rows.append({**row, 'Similarity': f"{score:.3f}"})
+    return rows
+
+
+def similar_prompts(prompt_id: str, k: int = DEFAULT_K) -> List[Dict[str, str]]:
+    """
+    The k prompts most like prompt_id, most similar first. Each row is a
+    copy with an extra Similarity column (cosine, "0.000" to "1.000").
+
+    Raises:
+        LookupError: If there is no such prompt
+
+    Example:
+        for row in similar_prompts('40', 5):
+            print(row['Prompt_ID'], row['Similarity'])
+    """
+    with prompt_profile.span('similar.query', k=k):
+        matches = get_index().similar_to(str(prompt_id), k)
+    return _with_scores(matches)
+
+
+def similar_to_text(text: str, k: int = DEFAULT_K) -> List[Dict[str, str]]:
+    """Like similar_prompts(), for free text such as "vibraphone, upright bass"."""
+    counts = terms({'Full_Prompt': text})
+    # Comma-separated items may name a genre, instrument or mood
+    for item in text.split(','):
+        item = ' '.join(item.lower().split())
+        if item:
+            for _, prefix in LIST_FIELDS:
+                counts[f"{prefix}:{item}"] = 1
+    with prompt_profile.span('similar.query', k=k):
+        matches = get_index().query(_damped(counts), k)
+    return _with_scores(matches)
+
+
+def main():
+    args = sys.argv[1:]
+    k = DEFAULT_K
+    if '-k' in args:
+        position = args.index('-k')
+        try:
+            k = int(args[position + 1])
+        except (IndexError, ValueError):
+            print("❌ -k needs a number")
+            sys.exit(1)
+        del args[position:position + 2]
+
+    if len(args) == 2 and args[0] == '--text':
+        rows = similar_to_text(args[1], k)
+        label = 'the text'
+    elif len(args) == 1 and not args[0].startswith('-'):
+        try:
+            rows = similar_prompts(args[0], k)
+        except LookupError as e:
+            print(f"❌ {e}")
+            sys.exit(1)
+        label = f"#{args[0]}"
+    else:
+        print("Usage: python prompt_similar.py <prompt_id> [-k 10] | --text <prompt text> [-k 10]")
+        sys.exit(1)
+
+    if not rows:
+        print(f"⚠️  Nothing shares a distinctive term with {label}")
+        return
+    print(f"\n🔗 {len(rows)} prompt(s) most like {label}:\n")
+    print_similar(rows)
+
+if __name__ == "__main__":
+    prompt_profile.run(main)
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Binary snapshot of the parsed library for fast cold starts.
+
+Parsing the quoted, multi-line CSV with csv.DictReader is most of the cost
+of a script's first load_prompts(). The snapshot sidecar
+(programming_music_prompts.csv.snap) stores the parsed rows column by
+column with marshal, which loads several times faster than parsing.
+
+It is written by write_prompts() and after any full parse, and records the
+CSV's mtime, size and SHA-1. load() only uses it when the mtime and size
+still match, so the CSV stays the source of truth. The SHA-1 is only
+checked when the mtime can't be trusted on its own: when it is a whole
+number of milliseconds (a filesystem with coarse timestamps, where an edit
+can keep both), or with PROMPTS_CACHE_HASH=1. A missing, stale, corrupt or
+older-version snapshot is ignored, and the CSV is parsed instead.
+
+Usage:
+    python prompt_snapshot.py           # rebuild the snapshot
+    python prompt_snapshot.py status    # is the snapshot current?
+"""
+
+import csv
+import hashlib
+import marshal
+import sys
+from pathlib import Path
+from typing import Mapping, Optional, Sequence, Tuple
+
+import csv_utils
+from prompt_record import Prompt, from_columns
+import prompt_profile
+
+SNAPSHOT_SUFFIX = '.snap'
+SNAPSHOT_VERSION = 1
+
+
+def snapshot_path(csv_path: Optional[Path] = None) -> Path:
+    return csv_utils.sidecar_path(SNAPSHOT_SUFFIX, csv_path)
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+
+def _coarse(mtime_ns: int) -> bool:
+    """Whether a timestamp looks truncated to milliseconds or coarser."""
+    return mtime_ns % 1_000_000 == 0
+
+
+def _as_read(value) -> str:
+    """A written value as DictReader will read it back from the file."""
+    if value is None:
+        return ''
+    return str(value).replace('\r\n', '\n').replace('\r', '\n')
+
+
+def _as_is(value):
+    return value
+
+
+def save(prompts: Sequence[Mapping[str, str]], csv_path: Optional[Path] = None,
+         data: Optional[bytes] = None, written: bool = False):
+    """
+    Write the snapshot for rows that match the CSV's current contents.
+
+    Args:
+        prompts: Rows without journalled changes applied - either exactly as
+            DictReader parsed them, or as just passed to write_prompts()
+        data: The CSV's bytes, if already in memory
+        written: prompts were written rather than parsed, so normalize
+            values the way the CSV round-trip will (None -> '', str(), newlines)
+    """
+    path = Path(csv_path or csv_utils.CSV_PATH)
+    if data is None:
+        data = path.read_bytes()
+    stat = path.stat()
+
+    fieldnames = [key for key in (prompts[0].keys() if prompts else ()) if key is not None]
+    convert = _as_read if written else _as_is
+    columns = [[convert(prompt.get(field)) for prompt in prompts] for field in fieldnames]
+    extras = {position: [convert(value) for value in prompt[None]]
+              for position, prompt in enumerate(prompts) if prompt.get(None)}
+
+    snapshot = (SNAPSHOT_VERSION, stat.st_mtime_ns, stat.st_size, _digest(data),
+                fieldnames, len(prompts), columns, extras)
+    try:
+        csv_utils.write_atomic(snapshot_path(path), marshal.dumps(snapshot))
+    except OSError:
+        pass  # a read-only directory just means no snapshot
+
+
+def _read(path: Path) -> Optional[tuple]:
+    """Return the snapshot if it describes the CSV's current contents."""
+    try:
+        snapshot = marshal.loads(snapshot_path(path).read_bytes())
+        version, mtime_ns, size, digest = snapshot[:4]
+    except (OSError, ValueError, EOFError, TypeError):
+        return None
+    if version != SNAPSHOT_VERSION:
+        return None
+
+    stat = path.stat()
+    if (mtime_ns, size) != (stat.st_mtime_ns, stat.st_size):
+        return None
+    if (csv_utils.CACHE_VERIFY_HASH or _coarse(mtime_ns)) and digest != _digest(path.read_bytes()):
+        return None
+    return snapshot
+
+
+def load(csv_path: Optional[Path] = None) -> Optional[Tuple[Prompt, ...]]:
+    """Rows of the CSV from the snapshot, or None if it can't be trusted."""
+    path = Path(csv_path or csv_utils.CSV_PATH)
+    snapshot = _read(path)
+    if snapshot is None:
+        return None
+
+    try:
+        _, _, _, _, fieldnames, count, columns, extras = snapshot
+        if len(columns) != len(fieldnames) or any(len(column) != count for column in columns):
+            return None
+        return from_columns(fieldnames, columns, extras)
+    except (TypeError, ValueError, KeyError, AttributeError):
+        return None
+
+
+def main():
+    path = csv_utils.CSV_PATH
+    if len(sys.argv) > 1 and sys.argv[1] == 'status':
+        if _read(path) is not None:
+            print(f"✅ Snapshot is current: {snapshot_path()}")
+        else:
+            print("❌ No current snapshot (the next full load will write one)")
+            sys.exit(1)
+        return
+
+    with open(path, 'r', encoding='utf-8') as f:
+        rows = list(csv.DictReader(f))
+    save(rows, path)
+    print(f"✅ Snapshot of {len(rows)} prompts written to {snapshot_path()}")
+
+if __name__ == "__main__":
+    prompt_profile.run(main)
@@ -0,0 +1,283 @@
+#!/usr/bin/env python3
+"""
+Single-pass faceted statistics over the prompt library.
+
+FacetStats accumulates every facet in one walk over the rows:
+    - totals: prompts, generated, rated, excellent (⭐)
+    - count per Time_Block
+    - Time_Block x rating tier cross-tab
+    - BPM histogram per Time_Block
+    - instrument and genre frequencies (split Key_Instruments/Primary_Genres)
+    - generated -> rated -> excellent funnel ratios
+
+Rows can also be removed (add with sign=-1), so the same aggregator can be
+kept up to date by deltas instead of recomputed.
+
+The aggregator is persisted as a materialized view next to the CSV
+(programming_music_prompts.csv.stats.json), stamped with the CSV version it
+describes. update_prompts() applies each change as a delta (remove old
+row, add new row), so reading stats never walks the library. If the stamp
+doesn't match - the CSV was edited some other way - the view is rebuilt
+from scratch. check_view() rebuilds it and reports any drift.
+"""
+
+import json
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import csv_utils
+import prompt_profile
+from prompt_record import TIER_LABELS, UNRATED, parse_bpm, parse_rating
+
+VIEW_SUFFIX = '.stats.json'
+VIEW_VERSION = 2
+
+BPM_BUCKET = 5
+
+
+def split_list(value: Optional[str]) -> List[str]:
+    """Split a comma-separated column into normalized (lowercase) items."""
+    return [item.strip().lower() for item in (value or '').split(',') if item.strip()]
+
+
+def rating_label(rating: Optional[str]) -> str:
+    """Bucket a free-text rating into a tier label."""
+    if not rating or not rating.strip():
+        return UNRATED
+    return TIER_LABELS[parse_rating(rating)[0]]
+
+
+def bpm_bucket(bpm: Optional[int]) -> str:
+    """Histogram bucket label for a BPM, e.g. 95-99."""
+    if bpm is None:
+        return 'Unknown'
+    low = bpm // BPM_BUCKET * BPM_BUCKET
+    return f"{low}-{low + BPM_BUCKET - 1}"
+
+
+def bucket_order(label: str) -> int:
+    """Sort key for bpm_bucket labels (Unknown last)."""
+    return int(label.split('-')[0]) if label[:1].isdigit() else 1 << 30
+
+
+def _bump(counter: Dict, key, sign: int):
+    counter[key] += sign
+    if not counter[key]:
+        del counter[key]
+
+
+class FacetStats:
+    """Counts and cross-tabs for a set of prompts, updated row by row."""
+
+    def __init__(self, prompts: Optional[Iterable[Mapping[str, str]]] = None):
+        self.total = 0
+        self.generated = 0
+        self.rated = 0
+        self.excellent = 0
+        self.bpm_sum = 0
+        self.bpm_count = 0
+        self.by_time_block: Counter = Counter()
+        self.block_by_rating: Dict[str, Counter] = defaultdict(Counter)
+        self.bpm_by_block: Dict[str, Counter] = defaultdict(Counter)
+        self.rating_distribution: Counter = Counter()
+        self.instruments: Counter = Counter()
+        self.genres: Counter = Counter()
+
+        for prompt in prompts or ():
+            self.add(prompt)
+
+    def add(self, prompt: Mapping[str, str], sign: int = 1):
+        """Count a prompt (sign=1) or uncount it (sign=-1)."""
+        block = prompt.get('Time_Block', 'Unknown')
+        rating = prompt.get('Rating') or ''
+        bpm = parse_bpm(prompt.get('BPM'))
+        label = rating_label(rating)
+
+        self.total += sign
+        if prompt.get('Generated') == 'Yes':
+            self.generated += sign
+        if rating.strip():
+            self.rated += sign
+        if '⭐' in rating:
+            self.excellent += sign
+        if bpm is not None:
+            self.bpm_sum += sign * bpm
+            self.bpm_count += sign
+
+        _bump(self.by_time_block, block, sign)
+        _bump(self.block_by_rating[block], label, sign)
+        _bump(self.bpm_by_block[block], bpm_bucket(bpm), sign)
+        _bump(self.rating_distribution, label, sign)
+        for instrument in split_list(prompt.get('Key_Instruments')):
+            _bump(self.instruments, instrument, sign)
+        for genre in split_list(prompt.get('Primary_Genres')):
+            _bump(self.genres, genre, sign)
+
+        for table in (self.block_by_rating, self.bpm_by_block):
+            if not table[block]:
+                del table[block]
+
+    def remove(self, prompt: Mapping[str, str]):
+        self.add(prompt, sign=-1)
+
+    def to_state(self) -> Dict:
+        """Serializable snapshot of the raw counters."""
+        return {
+            'total': self.total,
+            'generated': self.generated,
+            'rated': self.rated,
+            'excellent': self.excellent,
+            'bpm_sum': self.bpm_sum,
+            'bpm_count': self.bpm_count,
+            'by_time_block': dict(self.by_time_block),
+            'block_by_rating': {block: dict(counts) for block, counts in self.block_by_rating.items()},
+            'bpm_by_block': {block: dict(counts) for block, counts in self.bpm_by_block.items()},
+            'rating_distribution': dict(self.rating_distribution),
+            'instruments': dict(self.instruments),
+            'genres': dict(self.genres),
+        }
+
+    @classmethod
+    def from_state(cls, state: Dict) -> 'FacetStats':
+        stats = cls()
+        for key in ('total', 'generated', 'rated', 'excellent', 'bpm_sum', 'bpm_count'):
+            setattr(stats, key, state[key])
+        for key in ('by_time_block', 'rating_distribution', 'instruments', 'genres'):
+            setattr(stats, key, Counter(state[key]))
+        for key in ('block_by_rating', 'bpm_by_block'):
+            setattr(stats, key, defaultdict(Counter, {block: Counter(counts) for block, counts in state[key].items()}))
+        return stats
+
+    def funnel(self) -> Dict[str, float]:
+        """Conversion ratios through generate -> rate -> excellent."""
+        def ratio(part, whole):
+            return part / whole if whole else 0.0
+        return {
+            'generated_ratio': ratio(self.generated, self.total),
+            'rated_ratio': ratio(self.rated, self.total),
+            'rated_of_generated': ratio(self.rated, self.generated),
+            'excellent_of_rated': ratio(self.excellent, self.rated),
+        }
+
+    def as_dict(self) -> Dict:
+        """All facets as plain dicts (a superset of the classic get_stats keys)."""
+        return {
+            'total': self.total,
+            'generated': self.generated,
+            'rated': self.rated,
+            'excellent': self.excellent,
+            'by_time_block': dict(self.by_time_block),
+            'block_by_rating': {block: dict(counts) for block, counts in self.block_by_rating.items()},
+            # Buckets in BPM order, so stats.py prints them as they come
+            'bpm_by_block': {block: dict(sorted(counts.items(), key=lambda item: bucket_order(item[0])))
+                             for block, counts in self.bpm_by_block.items()},
+            'rating_distribution': dict(self.rating_distribution),
+            'instruments': dict(self.instruments.most_common()),
+            'genres': dict(self.genres.most_common()),
+            'average_bpm': self.bpm_sum / self.bpm_count if self.bpm_count else None,
+            'funnel': self.funnel(),
+        }
+
+
+def compute_stats(prompts: Iterable[Mapping[str, str]]) -> Dict:
+    """Compute every facet in a single pass over prompts."""
+    return FacetStats(prompts).as_dict()
+
+
+def view_path(csv_path: Optional[Path] = None) -> Path:
+    return csv_utils.sidecar_path(VIEW_SUFFIX, csv_path)
+
+
+def _read_view(csv_path: Optional[Path] = None) -> Tuple[Optional[list], Optional[FacetStats]]:
+    """Return (stamp, stats) from the persisted view, or (None, None)."""
+    try:
+        with open(view_path(csv_path), 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('version') == VIEW_VERSION:
+            return data['stamp'], FacetStats.from_state(data['stats'])
+    except (OSError, ValueError, KeyError, TypeError):
+        pass
+    return None, None
+
+
+def _write_view(stats: FacetStats, stamp: tuple, csv_path: Optional[Path] = None):
+    data = {'version': VIEW_VERSION, 'stamp': list(stamp), 'stats': stats.to_state()}
+    try:
+        csv_utils.write_atomic(view_path(csv_path), json.dumps(data, ensure_ascii=False).encode('utf-8'))
+    except OSError:
+        pass  # a read-only directory just means no persisted view
+
+
+def rebuild_view(csv_path: Optional[Path] = None) -> FacetStats:
+    """Recompute the view from the library and persist it."""
+    path = Path(csv_path or csv_utils.CSV_PATH)
+    stamp = csv_utils.library_stamp(path)
+    prompts = csv_utils.load_prompts(path, lazy=True)
+    with prompt_profile.span('stats.rebuild', rows=len(prompts)):
+        stats = FacetStats(prompts)
+        _write_view(stats, stamp, path)
+    return stats
+
+
+def stats_view(csv_path: Optional[Path] = None) -> FacetStats:
+    """Return current stats from the persisted view, rebuilding it if stale."""
+    path = Path(csv_path or csv_utils.CSV_PATH)
+    stamp, stats = _read_view(path)
+    if stats is not None and stamp == list(csv_utils.library_stamp(path)):
+        return stats
+    return rebuild_view(path)
+
+
+def apply_changes(changes: Sequence[Tuple[Mapping[str, str], Mapping[str, str]]],
+                  before_stamp: tuple, csv_path: Optional[Path] = None):
+    """
+    Update the persisted view after rows changed from old to new.
+
+    before_stamp is the CSV stamp the changes were applied on top of. If the
+    view doesn't describe that version it is left stale and will be rebuilt
+    on the next read.
+    """
+    path = Path(csv_path or csv_utils.CSV_PATH)
+    stamp, stats = _read_view(path)
+    if stats is None or stamp != list(before_stamp):
+        return
+
+    for old, new in changes:
+        stats.remove(old)
+        stats.add(new)
+    _write_view(stats, csv_utils.library_stamp(path), path)
+
+
+def restamp_view(before_stamp: tuple, csv_path: Optional[Path] = None):
+    """
+    Carry the view over to a new library stamp whose contents are unchanged
+    (journal compaction rewrites the CSV without changing any row).
+    """
+    path = Path(csv_path or csv_utils.CSV_PATH)
+    stamp, stats = _read_view(path)
+    if stats is not None and stamp == list(before_stamp):
+        _write_view(stats, csv_utils.library_stamp(path), path)
+
+
+def check_view(csv_path: Optional[Path] = None) -> List[str]:
+    """
+    Compare the persisted view with a full recount, then replace it.
+
+    Returns a description of each facet that disagreed (empty if consistent).
+    """
+    path = Path(csv_path or csv_utils.CSV_PATH)
+    stamp, stored = _read_view(path)
+    fresh = rebuild_view(path)
+
+    if stored is None:
+        return ['no persisted view']
+
+    problems = []
+    if stamp != list(csv_utils.library_stamp(path)):
+        problems.append('view was stale (CSV changed outside update_prompts)')
+    stored_state, fresh_state = stored.to_state(), fresh.to_state()
+    for key, value in fresh_state.items():
+        if stored_state.get(key) != value:
+            problems.append(f"{key} differed")
+    return problems
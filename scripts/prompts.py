@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Single entry point for the prompt library scripts.
+
+Each subcommand runs the corresponding script, imported only when that
+subcommand is used, so `--help` and simple commands start without loading
+the library code.
+
+Usage:
+    python prompts.py show 40 --verbose
+    python prompts.py find --excellent
+    python prompts.py stats --all
+    python prompts.py rate 40 "Excellent ⭐"
+    python prompts.py mark 40 41 42
+    python prompts.py batch ops.txt          # '-' or no file for stdin
+    python prompts.py help find              # full help for one command
+    python prompts.py --profile find --excellent   # timing table on stderr
+
+Batch files hold one command per line, in the same form as above without
+`python prompts.py`, plus `#` comments:
+
+    rate 40 Excellent - sax texture perfect ⭐
+    rate 41 Very good
+    mark 40 41 42 43
+    show 40
+    stats --funnel
+
+Everything runs in one process against one loaded library. Consecutive
+rate/mark lines are merged into a single update batch, which is applied
+before the next read command and at the end. Batches are journalled and
+folded into the CSV once, when the batch finishes.
+"""
+
+import importlib
+import shlex
+import sys
+from typing import Dict, List, Tuple
+
+import prompt_profile
+
+# Command -> (module, one-line description). Modules are imported on use.
+COMMANDS: Dict[str, Tuple[str, str]] = {
+    'show': ('show_prompt', 'Show one prompt'),
+    'find': ('find_prompts', 'Find prompts by block, BPM, rating, text or query'),
+    'query': ('prompt_query', 'Run a field:value query'),
+    'stats': ('stats', 'Library statistics'),
+    'rate': ('add_rating', 'Rate one or more prompts'),
+    'mark': ('mark_generated', 'Mark prompts as generated'),
+    'evolve': ('prompt_evolve', 'Breed a generation of candidate prompts'),
+    'elites': ('prompt_elites', 'MAP-Elites coverage, gaps and weak cells'),
+    'fitness': ('prompt_fitness', 'Top-rated prompts overall or per Time_Block'),
+    'lineage': ('prompt_lineage', 'Ancestors, descendants and lineage ratings'),
+    'dedupe': ('prompt_dedupe', 'Find near-duplicate prompts'),
+    'similar': ('prompt_similar', 'Find prompts most like one prompt or some text'),
+    'journal': ('prompt_journal', 'Show or compact the change journal'),
+    'index': ('prompt_index', 'Rebuild the lookup sidecars'),
+    'daemon': ('prompt_daemon', 'Start, stop or check the library daemon'),
+    'db': ('prompt_db', 'Load or export the SQLite backend'),
+}
+
+WRITE_COMMANDS = {'rate', 'mark'}
+
+
+def usage():
+    print("Usage: python prompts.py <command> [args...]\n")
+    print("Commands:")
+    for name, (_, description) in COMMANDS.items():
+        print(f"  {name:10} {description}")
+    print(f"  {'batch':10} Run many commands from a file or stdin in one process")
+    print(f"  {'help':10} Show full help for a command")
+
+
+def run_command(name: str, args: List[str]) -> int:
+    """Run one subcommand in this process. Returns its exit status."""
+    module_name = COMMANDS[name][0]
+    module = importlib.import_module(module_name)
+
+    saved = sys.argv
+    sys.argv = [f"{module_name}.py"] + list(args)
+    try:
+        with prompt_profile.span('command', command=name):
+            module.main()
+        return 0
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    finally:
+        sys.argv = saved
+
+
+def parse_batch_line(line: str) -> Tuple[str, List[str]]:
+    """Split a batch line into (command, args). Ratings keep the rest of the line verbatim."""
+    parts = line.split(None, 2)
+    if parts[0] == 'rate' and len(parts) == 3:
+        rating = parts[2]
+        if len(rating) > 1 and rating[0] == rating[-1] and rating[0] in '"\'':
+            rating = rating[1:-1]
+        return 'rate', [parts[1], rating]
+    words = shlex.split(line)
+    return words[0], words[1:]
+
+
+class _PendingUpdates:
+    """Rate/mark operations collected from a batch and applied as one update."""
+
+    def __init__(self):
+        self.updates: Dict[str, Dict[str, str]] = {}
+        self.messages: List[Tuple[str, str]] = []
+
+    def add(self, command: str, args: List[str]) -> bool:
+        if command == 'rate':
+            if len(args) % 2:
+                print(f"❌ rate expects <prompt_id> <rating> pairs: {args}")
+                return False
+            for prompt_id, rating in zip(args[::2], args[1::2]):
+                self.updates.setdefault(prompt_id, {})['Rating'] = rating
+                self.messages.append((prompt_id, f"✅ Rated Prompt {prompt_id}: {rating}"))
+        else:
+            for prompt_id in args:
+                self.updates.setdefault(prompt_id, {})['Generated'] = 'Yes'
+                self.messages.append((prompt_id, f"✅ Marked Prompt {prompt_id} as Generated=Yes"))
+        return True
+
+    def flush(self) -> bool:
+        """Apply everything collected so far. Returns False if any ID was missing."""
+        if not self.updates:
+            return True
+        from csv_utils import update_prompts
+
+        missing = set(update_prompts(self.updates))
+        for prompt_id, message in self.messages:
+            print(f"❌ Prompt {prompt_id} not found" if prompt_id in missing else message)
+        self.updates, self.messages = {}, []
+        return not missing
+
+
+def run_batch(lines) -> int:
+    """Run batch lines in order. Returns 1 if any command failed, else 0."""
+    from prompt_journal import deferred
+
+    pending = _PendingUpdates()
+    ok = True
+
+    with deferred():
+        for number, line in enumerate(lines, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            try:
+                command, args = parse_batch_line(line)
+            except ValueError as e:
+                print(f"❌ Line {number}: {e}")
+                ok = False
+                continue
+
+            if command in WRITE_COMMANDS:
+                ok = pending.add(command, args) and ok
+            elif command in COMMANDS:
+                ok = pending.flush() and ok
+                ok = run_command(command, args) == 0 and ok
+            else:
+                print(f"❌ Line {number}: unknown command {command!r}")
+                ok = False
+
+        ok = pending.flush() and ok
+    return 0 if ok else 1
+
+
+def main():
+    args = sys.argv[1:]
+    if not args or args[0] in ('-h', '--help'):
+        usage()
+        sys.exit(0 if args else 1)
+
+    command, rest = args[0], args[1:]
+
+    if command == 'help':
+        if rest and rest[0] in COMMANDS:
+            print(importlib.import_module(COMMANDS[rest[0]][0]).__doc__)
+        elif rest and rest[0] == 'batch':
+            print(__doc__)
+        else:
+            usage()
+        return
+
+    if command == 'batch':
+        path = rest[0] if rest else '-'
+        if path == '-':
+            sys.exit(run_batch(sys.stdin))
+        with open(path, 'r', encoding='utf-8') as f:
+            sys.exit(run_batch(f))
+
+    if command not in COMMANDS:
+        print(f"❌ Unknown command: {command}\n")
+        usage()
+        sys.exit(1)
+
+    sys.exit(run_command(command, rest))
+
+if __name__ == "__main__":
+    prompt_profile.run(main)
@@ -0,0 +1,437 @@
+#!/usr/bin/env python3
+"""
+Inverted full-text index over the descriptive prompt columns.
+
+Ranked (BM25) search with AND/OR and phrase queries.
+
+The index is kept in a sidecar (programming_music_prompts.csv.search)
+stamped with the library version it describes. Each term's postings are
+stored as a separate blob behind a term directory, so a query reads only
+the terms it asks for. csv_utils.update_prompts() hands it the rows it
+changed (apply_changes()), like the stats, fitness and lineage views, so
+a rating only restamps it. When the stamp doesn't match anyway (the CSV
+was edited some other way), the rows are compared against a digest of
+their indexed text and only new or edited rows are re-tokenized;
+untouched postings are copied over as they are.
+
+Query syntax:
+    saxophone rhodes              both terms (AND)
+    saxophone OR mellotron        either term
+    "brushed drums" bossa         phrase plus term
+    sax OR "dub delay" rhodes     sax, or (the phrase "dub delay" and rhodes)
+
+Usage:
+    python search_index.py "brushed drums"
+    python search_index.py "mellotron OR ebow" --limit 5
+"""
+
+import hashlib
+import math
+import re
+import struct
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+import csv_utils
+import prompt_profile
+from prompt_blobs import BlobReader, BlobWriter, read_blobs
+
+SEARCH_SUFFIX = '.search'
+SEARCH_VERSION = 2
+
+SEARCH_FIELDS = ['Primary_Genres', 'Key_Instruments', 'Mood_Keywords',
+                 'Suno_Short_Prompt', 'Full_Prompt', 'Notes']
+
+# Matches in the short categorical columns say more than a passing mention in prose
+FIELD_WEIGHTS = {
+    'Primary_Genres': 2.0,
+    'Key_Instruments': 2.0,
+    'Mood_Keywords': 1.5,
+    'Suno_Short_Prompt': 1.0,
+    'Full_Prompt': 1.0,
+    'Notes': 0.5,
+}
+
+_TOKEN_RE = re.compile(r"\w+")
+_QUERY_RE = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Split text into lowercase word tokens."""
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+
+def parse_query(query: str) -> List[List[List[str]]]:
+    """
+    Parse a query into OR-groups of AND-clauses.
+
+    Each clause is a list of tokens: one token for a plain term, several for
+    a quoted phrase. Unquoted words that tokenize into several tokens (such
+    as "four-on-floor") are treated as phrases.
+    """
+    groups = [[]]
+    for match in _QUERY_RE.finditer(query):
+        phrase, word = match.groups()
+        if word is not None and word == 'OR':
+            groups.append([])
+            continue
+        tokens = tokenize(phrase if phrase is not None else word)
+        if tokens:
+            groups[-1].append(tokens)
+    return [group for group in groups if group]
+
+
+def _digest(values: Iterable[Optional[str]]) -> bytes:
+    text = '\x1f'.join(value or '' for value in values)
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest()
+
+
+class SearchIndex:
+    """Per-field positional postings with BM25F-style scoring."""
+
+    def __init__(self, fields: Optional[List[str]] = None, k1: float = 1.2, b: float = 0.75):
+        self.fields = list(fields or SEARCH_FIELDS)
+        self.k1 = k1
+        self.b = b
+        # term -> field -> prompt ID -> token positions; only terms read from
+        # the sidecar or changed since, and {} for a term that was dropped
+        self.postings: Dict[str, Dict[str, Dict[str, List[int]]]] = {}
+        # prompt ID -> distinct tokens, for prompts indexed since loading
+        self.doc_terms: Dict[str, Tuple[str, ...]] = {}
+        # field -> prompt ID -> token count
+        self.lengths: Dict[str, Dict[str, int]] = {field: {} for field in self.fields}
+        self.total_lengths: Dict[str, int] = {field: 0 for field in self.fields}
+        # prompt ID -> digest of the indexed field values, used to detect changes
+        self.docs: Dict[str, bytes] = {}
+        # prompt ID -> file position, used to break score ties
+        self.order: Dict[str, int] = {}
+        # Library version the index describes, and the sidecar it was read from
+        self.stamp: Optional[list] = None
+        self._blobs: Optional[BlobReader] = None
+
+    def __len__(self) -> int:
+        return len(self.docs)
+
+    def _term(self, token: str) -> Optional[Dict[str, Dict[str, List[int]]]]:
+        by_field = self.postings.get(token)
+        if by_field is None and self._blobs is not None:
+            by_field = self._blobs.load('terms', token)
+            if by_field is not None:
+                self.postings[token] = by_field
+        return by_field
+
+    def add(self, prompt: Mapping[str, str]):
+        """Index a prompt (replacing any previous version of it)."""
+        prompt_id = prompt['Prompt_ID']
+        values = [prompt.get(field) for field in self.fields]
+        digest = _digest(values)
+        if self.docs.get(prompt_id) == digest:
+            return
+        self.remove(prompt_id)
+
+        self.docs[prompt_id] = digest
+        self.order.setdefault(prompt_id, len(self.order))
+        doc_terms = set()
+        for field, value in zip(self.fields, values):
+            tokens = tokenize(value)
+            self.lengths[field][prompt_id] = len(tokens)
+            self.total_lengths[field] += len(tokens)
+            positions: Dict[str, List[int]] = {}
+            for position, token in enumerate(tokens):
+                positions.setdefault(token, []).append(position)
+            for token, token_positions in positions.items():
+                by_field = self._term(token)
+                if by_field is None:
+                    by_field = self.postings[token] = {}
+                by_field.setdefault(field, {})[prompt_id] = token_positions
+            doc_terms.update(positions)
+        self.doc_terms[prompt_id] = tuple(doc_terms)
+
+    def remove(self, prompt_id: str):
+        """Drop a prompt from the index."""
+        if self.docs.pop(prompt_id, None) is None:
+            return
+
+        self.order.pop(prompt_id, None)
+        for field in self.fields:
+            self.total_lengths[field] -= self.lengths[field].pop(prompt_id, 0)
+        doc_terms = self.doc_terms.pop(prompt_id, None)
+        if doc_terms is None and self._blobs is not None:
+            doc_terms = self._blobs.load('docs', prompt_id, ())
+        for token in doc_terms or ():
+            by_field = self._term(token)
+            for field in list(by_field or ()):
+                by_field[field].pop(prompt_id, None)
+                if not by_field[field]:
+                    del by_field[field]
+
+    def sync(self, prompts: Iterable[Mapping[str, str]]) -> int:
+        """
+        Bring the index up to date with a full library.
+
+        Unchanged rows are skipped, so this only re-tokenizes what changed.
+        Returns the number of prompts added, changed or removed.
+        """
+        seen = set()
+        order = {}
+        changed = 0
+        for position, prompt in enumerate(prompts):
+            prompt_id = prompt['Prompt_ID']
+            seen.add(prompt_id)
+            order[prompt_id] = position
+            if self.docs.get(prompt_id) != _digest(prompt.get(field) for field in self.fields):
+                self.add(prompt)
+                changed += 1
+
+        for prompt_id in [pid for pid in self.docs if pid not in seen]:
+            self.remove(prompt_id)
+            changed += 1
+
+        self.order = order
+        return changed
+
+    def to_bytes(self) -> bytes:
+        """Serialize the index: a header, then one blob per term and per prompt."""
+        writer = BlobWriter()
+        stored = self._blobs
+        for term in set(self.postings).union(stored.keys('terms') if stored else ()):
+            if term not in self.postings:
+                writer.put('terms', term, stored.raw('terms', term))
+            elif self.postings[term]:
+                writer.dump('terms', term, self.postings[term])
+        for prompt_id in self.docs:
+            if prompt_id in self.doc_terms:
+                writer.dump('docs', prompt_id, self.doc_terms[prompt_id])
+            else:
+                writer.put('docs', prompt_id, stored.raw('docs', prompt_id))
+        return writer.to_bytes((SEARCH_VERSION, self.stamp, self.fields, self.docs, self.order,
+                                self.lengths, self.total_lengths))
+
+    @classmethod
+    def from_file(cls, path: Path) -> Optional['SearchIndex']:
+        """Open a serialized index; postings are read as queries need them."""
+        header, blobs = read_blobs(path)
+        version, stamp, fields, docs, order, lengths, total_lengths = header
+        if version != SEARCH_VERSION or fields != SEARCH_FIELDS:
+            return None
+        index = cls(fields)
+        index.stamp, index.docs, index.order = stamp, docs, order
+        index.lengths, index.total_lengths = lengths, total_lengths
+        index._blobs = blobs
+        return index
+
+    def _matches(self, clause: List[str], fields: List[str]) -> Dict[str, Dict[str, int]]:
+        """Return prompt ID -> field -> match count for a term or phrase."""
+        first = self._term(clause[0])
+        if not first:
+            return {}
+
+        matches: Dict[str, Dict[str, int]] = {}
+        for field in fields:
+            for prompt_id, positions in first.get(field, {}).items():
+                if len(clause) == 1:
+                    count = len(positions)
+                else:
+                    count = sum(1 for start in positions if self._phrase_at(clause, field, prompt_id, start))
+                if count:
+                    matches.setdefault(prompt_id, {})[field] = count
+        return matches
+
+    def _phrase_at(self, clause: List[str], field: str, prompt_id: str, start: int) -> bool:
+        """Check whether the phrase occurs in a field starting at a position."""
+        for offset, token in enumerate(clause[1:], 1):
+            positions = (self._term(token) or {}).get(field, {}).get(prompt_id)
+            if not positions or start + offset not in positions:
+                return False
+        return True
+
+    def _score(self, matches: Dict[str, int], prompt_id: str, idf: float) -> float:
+        """BM25F contribution of one clause to one prompt."""
+        tf = 0.0
+        for field, count in matches.items():
+            average = self.total_lengths[field] / max(len(self.docs), 1) or 1.0
+            norm = 1 - self.b + self.b * self.lengths[field].get(prompt_id, 0) / average
+            tf += FIELD_WEIGHTS.get(field, 1.0) * count / norm
+        return idf * tf * (self.k1 + 1) / (tf + self.k1)
+
+    def search(self, query: str, fields: Optional[List[str]] = None,
+               mode: str = 'and', limit: Optional[int] = None) -> List[Tuple[str, float]]:
+        """
+        Rank prompts against a query.
+
+        Args:
+            query: Terms, quoted phrases and OR (see module docstring)
+            fields: Restrict matching to these indexed fields
+            mode: 'and' (default) or 'or' - how clauses within a group combine
+            limit: Return at most this many results
+
+        Returns:
+            (prompt ID, score) pairs, best first
+
+        Raises:
+            ValueError: If a field isn't one of SEARCH_FIELDS
+        """
+        unknown = [field for field in fields or () if field not in self.lengths]
+        if unknown:
+            raise ValueError(f"Unknown search field {unknown[0]!r} (fields: {', '.join(self.fields)})")
+        fields = list(fields or self.fields)
+        groups = parse_query(query)
+        if mode == 'or':
+            groups = [[clause for group in groups for clause in group]]
+
+        scores: Dict[str, float] = {}
+        with prompt_profile.span('filter', source='index') as timing:
+            for group in groups:
+                group_scores: Optional[Dict[str, float]] = None
+                for clause in group:
+                    matches = self._matches(clause, fields)
+                    idf = math.log(1 + (len(self.docs) - len(matches) + 0.5) / (len(matches) + 0.5))
+                    clause_scores = {pid: self._score(m, pid, idf) for pid, m in matches.items()}
+
+                    if group_scores is None:
+                        group_scores = clause_scores
+                    elif mode == 'or':
+                        for pid, score in clause_scores.items():
+                            group_scores[pid] = group_scores.get(pid, 0.0) + score
+                    else:
+                        group_scores = {pid: score + clause_scores[pid]
+                                        for pid, score in group_scores.items() if pid in clause_scores}
+
+                for pid, score in (group_scores or {}).items():
+                    scores[pid] = max(scores.get(pid, 0.0), score)
+            timing.add('returned', len(scores))
+
+        with prompt_profile.span('sort', rows=len(scores)):
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], self.order.get(item[0], 0)))
+        return ranked[:limit] if limit is not None else ranked
+
+
+def search_path(csv_path: Optional[Path] = None) -> Path:
+    return csv_utils.sidecar_path(SEARCH_SUFFIX, csv_path)
+
+
+def _read_index(path: Path) -> Optional[SearchIndex]:
+    try:
+        return SearchIndex.from_file(search_path(path))
+    except (OSError, ValueError, EOFError, TypeError, struct.error):
+        return None
+
+
+def _write_index(index: SearchIndex, path: Path) -> SearchIndex:
+    """Persist the index and return it re-opened from the sidecar (or as is, if it can't be written)."""
+    try:
+        csv_utils.write_atomic(search_path(path), index.to_bytes())
+    except OSError:
+        return index  # a read-only directory just means tokenizing again next time
+    return _read_index(path) or index
+
+
+# Resolved CSV path -> index; its stamp says which library version it describes
+_indexes: Dict[Path, SearchIndex] = {}
+
+
+def get_index(csv_path: Optional[Path] = None) -> SearchIndex:
+    """Return the index for a library, synced with the file on disk."""
+    path = Path(csv_path or csv_utils.CSV_PATH).resolve()
+    stamp = list(csv_utils.library_stamp(path))
+
+    index = _indexes.get(path)
+    if index is None:
+        index = _read_index(path) or SearchIndex()
+    if index.stamp != stamp:
+        prompts = csv_utils.load_prompts(path)
+        with prompt_profile.span('index.sync') as timing:
+            timing.add('changed', index.sync(prompts))
+            index.stamp = stamp
+            index = _write_index(index, path)
+    _indexes[path] = index
+    return index
+
+
+def _loaded_index(path: Path, stamp: list) -> Optional[SearchIndex]:
+    """The index for a resolved path if it describes stamp, from memory or the sidecar."""
+    index = _indexes.get(path)
+    if index is None or index.stamp != stamp:
+        index = _read_index(path)
+    return index if index is not None and index.stamp == stamp else None
+
+
+def apply_changes(changes: Iterable[Tuple[Mapping[str, str], Mapping[str, str]]],
+                  before_stamp: tuple, csv_path: Optional[Path] = None):
+    """
+    Update the persisted index after rows changed from old to new.
+
+    Only rows whose indexed text changed are re-tokenized. As with
+    prompt_stats.apply_changes(), an index that doesn't describe
+    before_stamp is left stale and synced on the next read.
+    """
+    path = Path(csv_path or csv_utils.CSV_PATH).resolve()
+    index = _loaded_index(path, list(before_stamp))
+    if index is None:
+        return
+
+    for old, new in changes:
+        if any(old.get(field) != new.get(field) for field in index.fields):
+            index.add(new)
+    index.stamp = list(csv_utils.library_stamp(path))
+    _indexes[path] = _write_index(index, path)
+
+
+def restamp_index(before_stamp: tuple, csv_path: Optional[Path] = None):
+    """Carry the index over to a new stamp whose rows are unchanged (journal compaction)."""
+    apply_changes((), before_stamp, csv_path)
+
+
+def _rows(prompt_ids: Iterable[str], csv_path: Optional[Path] = None) -> List[Dict[str, str]]:
+    """Full rows for ranked IDs, read one record at a time through the offset index."""
+    if csv_path is not None and Path(csv_path).resolve() != Path(csv_utils.CSV_PATH).resolve():
+        by_id = {prompt['Prompt_ID']: prompt for prompt in csv_utils.load_prompts(csv_path)}
+        return [dict(by_id[prompt_id]) for prompt_id in prompt_ids]
+    return [prompt for prompt in map(csv_utils.get_prompt, prompt_ids) if prompt is not None]
+
+
+def search(query: str, fields: Optional[List[str]] = None, mode: str = 'and',
+           limit: Optional[int] = None, csv_path: Optional[Path] = None) -> List[Dict[str, str]]:
+    """
+    Ranked search returning prompt rows, best match first.
+
+    Examples:
+        search('"brushed drums"')
+        search('mellotron OR ebow', fields=['Key_Instruments'])
+    """
+    ranked = get_index(csv_path).search(query, fields=fields, mode=mode, limit=limit)
+    return _rows((prompt_id for prompt_id, _ in ranked), csv_path)
+
+
+def main():
+    from prompt_output import parse_output_args, write_rows
+
+    if len(sys.argv) < 2:
+        print('Usage: python search_index.py "<query>" [--or] [--limit N] [--offset N] [--format json|jsonl|tsv] [--fields <a,b,...>]')
+        sys.exit(1)
+
+    try:
+        options, args = parse_output_args(sys.argv[1:])
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+    mode = 'or' if '--or' in args else 'and'
+    args = [arg for arg in args if arg != '--or']
+
+    results = list(options.page(get_index().search(args[0], mode=mode, limit=options.fetch_limit())))
+
+    if options.machine:
+        write_rows(_rows(prompt_id for prompt_id, _ in results), options)
+        return
+
+    if not results:
+        print("No prompts found matching query.")
+        return
+
+    print(f"\n✅ Found {len(results)} prompt(s):\n")
+    for (prompt_id, score), prompt in zip(results, _rows(prompt_id for prompt_id, _ in results)):
+        print(f"  {prompt_id:>6} | {score:5.2f} | {prompt['Time_Block']:30} | {prompt['Primary_Genres']}")
+
+if __name__ == "__main__":
+    prompt_profile.run(main)
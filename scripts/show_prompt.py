@@ -5,20 +5,61 @@ Show details for a specific prompt.
 Usage:
     python show_prompt.py 40
     python show_prompt.py 40 --verbose
+    python show_prompt.py 40 --format json --fields Prompt_ID,Suno_Short_Prompt,Rating
+    python show_prompt.py 40 --similar 10     # and the 10 prompts most like it
+    python show_prompt.py 40 --similar 10 --format jsonl   # just the neighbours, with Similarity
 """
 
 import sys
-from csv_utils import get_prompt, print_prompt
+from prompt_daemon import with_daemon
+from prompt_output import parse_output_args, print_prompt, print_similar, write_row, write_rows
+import prompt_profile
+
+
+def get_prompt(prompt_id):
+    from csv_utils import get_prompt
+    return get_prompt(prompt_id)
+
+
+def similar_prompts(prompt_id, k):
+    from prompt_similar import similar_prompts
+    return similar_prompts(prompt_id, k)
+
 
 def main():
     if len(sys.argv) < 2:
-        print("Usage: python show_prompt.py <prompt_id> [--verbose]")
+        print("Usage: python show_prompt.py <prompt_id> [--verbose] [--similar N] [--format json|jsonl|tsv] [--fields <a,b,...>]")
         sys.exit(1)
 
-    prompt_id = sys.argv[1]
-    verbose = '--verbose' in sys.argv or '-v' in sys.argv
+    try:
+        options, args = parse_output_args(sys.argv[1:])
+        similar = None
+        if '--similar' in args:
+            position = args.index('--similar')
+            similar = args[position + 1] if position + 1 < len(args) else ''
+            if not similar.isdigit() or int(similar) < 1:
+                raise ValueError("--similar needs a number of prompts")
+            similar = int(similar)
+            del args[position:position + 2]
+    except ValueError as e:
+        print(f"❌ {e}")
+        sys.exit(1)
+
+    prompt_id = args[0] if args else ''
+    verbose = '--verbose' in args or '-v' in args
 
-    prompt = get_prompt(prompt_id)
+    prompt = with_daemon('show', lambda: get_prompt(prompt_id), prompt_id=prompt_id)
+    neighbours = []
+    if prompt and similar:
+        neighbours = with_daemon('similar', lambda: similar_prompts(prompt_id, similar),
+                                 prompt_id=prompt_id, k=similar)
+
+    if options.machine:
+        if similar:
+            write_rows(options.page(neighbours), options)
+        else:
+            write_row(prompt, options)
+        sys.exit(0 if prompt else 1)
 
     if not prompt:
         print(f"❌ Prompt {prompt_id} not found")
@@ -26,5 +67,9 @@ def main():
 
     print_prompt(prompt, verbose=verbose)
 
+    if similar:
+        print(f"\n🔗 {len(neighbours)} most similar prompt(s):\n")
+        print_similar(neighbours)
+
 if __name__ == "__main__":
-    main()
+    prompt_profile.run(main)
@@ -4,12 +4,85 @@ Show statistics about the prompt library.
 
 Usage:
     python stats.py
+    python stats.py --ratings            # Time_Block x rating tier
+    python stats.py --bpm                # BPM histogram per Time_Block
+    python stats.py --instruments [N]    # top N instruments (default 15)
+    python stats.py --genres [N]         # top N genres (default 15)
+    python stats.py --funnel             # generated -> rated -> excellent
+    python stats.py --all
+    python stats.py --check              # verify/rebuild the persisted stats view
 """
 
-from csv_utils import get_stats
+import sys
+from prompt_daemon import with_daemon
+from prompt_record import TIER_LABELS, UNRATED
+import prompt_profile
+
+
+def get_stats():
+    from csv_utils import get_stats
+    return get_stats()
+
+
+def top_n(args, flag, default=15):
+    """Read the optional count after a flag."""
+    if flag not in args:
+        return default
+    position = args.index(flag) + 1
+    if position < len(args) and args[position].isdigit():
+        return int(args[position])
+    return default
+
+
+def print_ratings(stats):
+    labels = [TIER_LABELS[tier] for tier in (5, 4, 3, 2, 1, 0, None)] + [UNRATED]
+    short = {'Excellent': 'Exc', 'Very good': 'VGood', 'Pretty good': 'Good', 'Okay': 'Okay',
+             'Bad': 'Bad', 'Terrible': 'Terr', 'Other': 'Other', UNRATED: 'None'}
+
+    print(f"\n⭐ Rating by Time Block:")
+    print(f"  {'':30} " + ' '.join(f"{short[label]:>5}" for label in labels))
+    for block, counts in sorted(stats['block_by_rating'].items()):
+        print(f"  {block:30} " + ' '.join(f"{counts.get(label, 0):>5}" for label in labels))
+
+
+def print_bpm(stats):
+    from prompt_stats import bucket_order
+    print(f"\n🥁 BPM by Time Block:")
+    for block, buckets in sorted(stats['bpm_by_block'].items()):
+        print(f"  {block}")
+        for bucket, count in buckets.items():
+            print(f"    {bucket:>9} {'█' * count} {count}")
+    if stats['average_bpm'] is not None:
+        print(f"\n  Average BPM: {stats['average_bpm']:.1f}")
+
+
+def print_top(title, counts, n):
+    print(f"\n{title} (top {n}):")
+    for name, count in list(counts.items())[:n]:
+        print(f"  {name:40} {count:>3}")
+
+
+def print_funnel(stats):
+    funnel = stats['funnel']
+    print(f"\n🔻 Funnel:")
+    print(f"  Total → Generated:   {stats['generated']}/{stats['total']} ({funnel['generated_ratio']*100:.1f}%)")
+    print(f"  Generated → Rated:   {stats['rated']}/{stats['generated']} ({funnel['rated_of_generated']*100:.1f}%)")
+    print(f"  Rated → Excellent:   {stats['excellent']}/{stats['rated']} ({funnel['excellent_of_rated']*100:.1f}%)")
+
 
 def main():
-    stats = get_stats()
+    args = sys.argv[1:]
+    show_all = '--all' in args
+
+    if '--check' in args:
+        from prompt_stats import check_view
+        problems = check_view()
+        if problems:
+            print(f"⚠️  Stats view rebuilt: {'; '.join(problems)}")
+        else:
+            print("✅ Stats view is consistent")
+        return
+    stats = with_daemon('stats', get_stats)
 
     print("\n" + "="*60)
     print("📊 PROMPT LIBRARY STATISTICS")
@@ -25,7 +98,18 @@ def main():
     for block, count in sorted(stats['by_time_block'].items()):
         print(f"  {block:30} {count:>2}")
 
+    if show_all or '--ratings' in args:
+        print_ratings(stats)
+    if show_all or '--bpm' in args:
+        print_bpm(stats)
+    if show_all or '--instruments' in args:
+        print_top("🎹 Instruments", stats['instruments'], top_n(args, '--instruments'))
+    if show_all or '--genres' in args:
+        print_top("🎼 Genres", stats['genres'], top_n(args, '--genres'))
+    if show_all or '--funnel' in args:
+        print_funnel(stats)
+
     print("\n" + "="*60 + "\n")
 
 if __name__ == "__main__":
-    main()
+    prompt_profile.run(main)
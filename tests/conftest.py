@@ -0,0 +1,21 @@
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / 'scripts'))
+
+import csv_utils  # noqa: E402
+
+
+@pytest.fixture
+def library(tmp_path, monkeypatch):
+    """A scratch copy of programming_music_prompts.csv, used as the current library."""
+    path = tmp_path / 'programming_music_prompts.csv'
+    shutil.copy(ROOT / 'programming_music_prompts.csv', path)
+    monkeypatch.setattr(csv_utils, 'CSV_PATH', path)
+    csv_utils.invalidate()
+    yield path
+    csv_utils.invalidate()
@@ -0,0 +1,38 @@
+import os
+import stat
+
+import csv_utils
+import prompt_index
+
+
+def _mode(path):
+    return stat.S_IMODE(path.stat().st_mode)
+
+
+def test_write_atomic_gives_new_files_the_umask_mode(tmp_path):
+    umask = os.umask(0o022)
+    os.umask(umask)
+    target = tmp_path / 'new.bin'
+
+    csv_utils.write_atomic(target, b'data')
+
+    assert target.read_bytes() == b'data'
+    assert _mode(target) == 0o666 & ~umask == csv_utils.NEW_FILE_MODE
+
+
+def test_write_atomic_keeps_an_existing_mode(tmp_path):
+    target = tmp_path / 'existing.bin'
+    target.write_bytes(b'old')
+    target.chmod(0o640)
+
+    csv_utils.write_atomic(target, b'new')
+
+    assert _mode(target) == 0o640
+
+
+def test_index_sidecars_are_not_owner_only(library):
+    prompt_index.build_index()
+    prompt_index.build_columns()
+
+    for suffix in ('.idx', '.cols'):
+        assert _mode(csv_utils.sidecar_path(suffix)) == csv_utils.NEW_FILE_MODE
@@ -0,0 +1,73 @@
+import tempfile
+import threading
+from pathlib import Path
+
+import pytest
+
+import csv_utils
+import prompt_daemon
+from prompt_lock import VersionConflict
+
+
+@pytest.fixture
+def daemon(library, monkeypatch):
+    """A PromptServer for the scratch library, answering on a background thread."""
+    # Unix socket paths are limited to about 100 bytes, so not next to tmp_path's CSV
+    socket_dir = Path(tempfile.mkdtemp(prefix='prompts-'))
+    monkeypatch.setenv('PROMPTS_DAEMON_SOCKET', str(socket_dir / 'daemon.sock'))
+    monkeypatch.setattr(prompt_daemon, 'DAEMON_ENABLED', True)
+    server = prompt_daemon.PromptServer(prompt_daemon.socket_path())
+    server.timeout = None
+
+    def serve():
+        while not server.stopping:
+            server.handle_request()
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    yield server
+    prompt_daemon.call('shutdown')
+    thread.join(5)
+    server.server_close()
+    (socket_dir / 'daemon.sock').unlink()
+    socket_dir.rmdir()
+
+
+def test_reads_match_direct_access(daemon):
+    assert prompt_daemon.call('show', prompt_id='40') == csv_utils.get_prompt('40')
+    assert prompt_daemon.call('find', filters={'Time_Block': 'Midday Refresh'}, limit=3) == \
+        [dict(p) for p in csv_utils.find_prompts(Time_Block='Midday Refresh', limit=3)]
+    assert prompt_daemon.call('stats') == csv_utils.get_stats()
+
+
+def test_version_conflict_crosses_the_socket(daemon):
+    version = csv_utils.library_version()
+
+    with pytest.raises(VersionConflict) as conflict:
+        prompt_daemon.call('update', updates={'40': {'Rating': 'Okay'}}, expected_version=version - 1)
+
+    assert (conflict.value.expected, conflict.value.actual) == (version - 1, version)
+    assert str(conflict.value) == str(VersionConflict(version - 1, version))
+
+
+def test_errors_keep_their_class(daemon):
+    with pytest.raises(ValueError, match="Unknown method"):
+        prompt_daemon.call('nope')
+    with pytest.raises(TypeError):
+        prompt_daemon.call('show', wrong_argument='40')
+
+
+def test_with_daemon_writes_through_the_server(daemon):
+    missing = prompt_daemon.with_daemon('rate', lambda: pytest.fail("used the direct path"),
+                                        ratings={'40': 'Very good', 'NOPE': 'Okay'})
+
+    assert missing == ['NOPE']
+    assert csv_utils.get_prompt('40')['Rating'] == 'Very good'
+
+
+def test_unknown_error_classes_become_runtime_errors():
+    error = prompt_daemon._decode_error({'type': 'Popen', 'module': 'subprocess', 'message': 'x'})
+
+    assert type(error) is RuntimeError
+    assert isinstance(prompt_daemon._decode_error(
+        {'type': 'FileNotFoundError', 'module': 'builtins', 'args': [2, 'missing'], 'message': ''}),
+        FileNotFoundError)
@@ -0,0 +1,76 @@
+import csv
+
+import pytest
+
+import csv_utils
+import prompt_db
+
+
+@pytest.fixture
+def sqlite_backend(library, monkeypatch):
+    monkeypatch.setattr(csv_utils, 'BACKEND', 'sqlite')
+    yield library
+    for conn in prompt_db._connections.values():
+        conn.close()
+    prompt_db._connections.clear()
+
+
+def _rows(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return [list(row.items()) for row in csv.DictReader(f)]
+
+
+def _direct(function, *args, **kwargs):
+    """Run a csv_utils call against the CSV itself."""
+    backend, csv_utils.BACKEND = csv_utils.BACKEND, 'csv'
+    try:
+        return function(*args, **kwargs)
+    finally:
+        csv_utils.BACKEND = backend
+
+
+def test_reads_match_the_csv_backend(sqlite_backend):
+    assert csv_utils.get_prompt('40') == _direct(csv_utils.get_prompt, '40')
+    assert csv_utils.get_prompt('BONUS-3') == _direct(csv_utils.get_prompt, 'BONUS-3')
+    assert csv_utils.get_prompt('NOPE') is None
+
+    for filters in ({'Time_Block': 'Midday Refresh'}, {'Generated': 'Yes', 'Rating': ''},
+                    {'BPM': 108}, {'Generated': False, 'limit': 3}, {'No_Such_Field': 'x'}):
+        assert [dict(p) for p in csv_utils.find_prompts(**filters)] == \
+            [dict(p) for p in _direct(csv_utils.find_prompts, **filters)], filters
+
+    for text, fields in (('rhodes', None), ('SAX', ['Key_Instruments']), ('clone', ['Notes'])):
+        assert [dict(p) for p in csv_utils.search_prompts(text, fields=fields)] == \
+            [dict(p) for p in _direct(csv_utils.search_prompts, text, fields=fields)]
+
+    assert prompt_db.get_stats() == _direct(csv_utils.get_stats)
+
+
+def test_updates_are_applied_as_deltas(sqlite_backend, monkeypatch):
+    csv_utils.get_prompt('40')  # load the database
+
+    def no_reload(*args, **kwargs):
+        raise AssertionError("database was reloaded")
+    monkeypatch.setattr(prompt_db, 'import_csv', no_reload)
+
+    assert csv_utils.update_prompts({'40': {'Rating': 'Very good'}, 'NOPE': {'Rating': 'Okay'}}) == ['NOPE']
+    assert csv_utils.get_prompt('40')['Rating'] == 'Very good'
+    assert '40' in [p['Prompt_ID'] for p in csv_utils.find_prompts(Rating='Very good')]
+
+
+def test_outside_csv_edits_reload_the_database(sqlite_backend):
+    csv_utils.get_prompt('40')
+
+    prompts = _direct(csv_utils.read_prompts)
+    prompts[40]['Rating'] = 'Edited elsewhere'
+    _direct(csv_utils.write_prompts, prompts)
+
+    assert csv_utils.get_prompt('41')['Rating'] == 'Edited elsewhere'
+
+
+def test_export_round_trips_losslessly(sqlite_backend, tmp_path):
+    copy = tmp_path / 'copy.csv'
+    prompt_db.import_csv()
+
+    assert prompt_db.export_csv(copy) == len(csv_utils.load_prompts())
+    assert _rows(copy) == _rows(sqlite_backend)
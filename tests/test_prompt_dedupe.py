@@ -0,0 +1,38 @@
+import re
+
+import csv_utils
+import prompt_dedupe
+import prompt_evolve
+
+
+def _clones(count, seed=3):
+    pool = prompt_evolve.GenePool(csv_utils.load_prompts(), csv_utils.read_influences())
+    return prompt_evolve.generate(count, seed=seed, split=(1, 0, 0), pool=pool, first_id=10000)
+
+
+def test_evolve_clone_matches_its_parent(library):
+    for clone in _clones(5):
+        parent = re.match(r"Parent #(\d+) clone", clone['Notes']).group(1)
+        assert prompt_dedupe.declared_parents(clone) == {parent}
+        assert (parent, 1.0) in prompt_dedupe.check_candidate(clone)
+
+
+def test_split_duplicates_allows_a_clone_of_its_declared_parent(library):
+    clone = _clones(1)[0]
+    twin = dict(clone, Prompt_ID='10001')
+    stranger = dict(clone, Prompt_ID='10002', Notes='Parent #1 clone')
+
+    kept, flagged = prompt_dedupe.split_duplicates([clone, twin, stranger])
+
+    assert kept == [clone]
+    parent = prompt_dedupe.declared_parents(clone).pop()
+    assert [(row['Prompt_ID'], duplicate_id) for row, duplicate_id, _ in flagged] == \
+        [('10001', '10000'), ('10002', parent)]
+
+
+def test_short_prompt_text_matches_its_prompt(library):
+    short = csv_utils.get_prompt('41')['Suno_Short_Prompt']
+
+    matches = prompt_dedupe.check_candidate({'Suno_Short_Prompt': short})
+
+    assert matches[0] == ('41', 1.0)
@@ -0,0 +1,74 @@
+from collections import Counter
+
+import pytest
+
+import csv_utils
+import prompt_dedupe
+import prompt_evolve
+from prompt_record import parse_rating_score
+
+
+@pytest.fixture
+def pool(library):
+    return prompt_evolve.GenePool(csv_utils.load_prompts(), csv_utils.read_influences())
+
+
+def _operators(rows):
+    return Counter(row['Notes'].split()[0].rstrip(':') for row in rows)
+
+
+def test_parent_weight_follows_the_rating():
+    assert prompt_evolve.parent_weight('Okay') == 0
+    assert prompt_evolve.parent_weight('Pretty good') == 1
+    assert prompt_evolve.parent_weight('Excellent ⭐') == 5
+    assert prompt_evolve.parent_weight(parse_rating_score('Very good')) == 2
+    assert prompt_evolve.parent_weight(None) == 0
+
+
+def test_generation_follows_the_split(pool):
+    rows = prompt_evolve.generate(20, seed=1, split=(0.5, 0.3, 0.2), pool=pool, first_id=1000)
+
+    assert [row['Prompt_ID'] for row in rows] == [str(1000 + n) for n in range(20)]
+    assert _operators(rows) == {'Parent': 10, 'Hybrid': 6, 'Mutation': 4}
+    parent_ids = {parent.prompt_id for parent in pool.parents}
+    for row in rows:
+        assert prompt_dedupe.declared_parents(row) <= parent_ids
+        assert row['Suno_Short_Prompt'].endswith(f"{row['BPM']} BPM, instrumental")
+
+
+def test_same_seed_same_generation_with_or_without_workers(pool, monkeypatch):
+    monkeypatch.setattr(prompt_evolve, 'CHUNK_SIZE', 8)
+    single = prompt_evolve.generate(30, seed=5, pool=pool, first_id=1000)
+
+    assert prompt_evolve.generate(30, seed=5, pool=pool, first_id=1000) == single
+    assert prompt_evolve.generate(30, seed=5, pool=pool, first_id=1000, workers=2) == single
+    assert prompt_evolve.generate(30, seed=6, pool=pool, first_id=1000) != single
+
+
+def test_block_candidates_take_the_block_settings(pool):
+    brain_wave, duration, low, high = pool.blocks['Midday Refresh']
+
+    rows = prompt_evolve.generate(15, seed=2, time_block='Midday Refresh', pool=pool, first_id=1000)
+
+    for row in rows:
+        assert row['Time_Block'] == 'Midday Refresh'
+        assert low <= int(row['BPM']) <= high
+        assert (row['Brain_Wave_Target'], row['Duration_Type']) == (brain_wave, duration)
+    with pytest.raises(ValueError, match="Unknown Time_Block"):
+        prompt_evolve.generate(1, time_block='Brunch', pool=pool)
+
+
+def test_append_generation_renumbers_from_the_next_id(library, pool):
+    first_id = prompt_evolve.next_prompt_id(csv_utils.load_prompts())
+    rows = prompt_evolve.generate(3, seed=4, pool=pool, first_id=1)
+
+    written = prompt_evolve.append_generation(rows)
+
+    assert [row['Prompt_ID'] for row in written] == [str(first_id + n) for n in range(3)]
+    assert csv_utils.get_prompt(str(first_id + 2))['Notes'] == rows[2]['Notes']
+
+
+@pytest.mark.parametrize('text', ['50/50', '50/-10/60', '0/0/0'])
+def test_bad_split_is_rejected(text):
+    with pytest.raises(ValueError, match="--split"):
+        prompt_evolve.parse_split(text)
@@ -0,0 +1,69 @@
+import pytest
+
+import csv_utils
+import prompt_fitness
+import prompt_journal
+from prompt_record import parse_rating_score
+
+
+def _fresh():
+    """The index as a rebuild from the CSV would make it."""
+    return prompt_fitness.FitnessIndex(csv_utils.load_prompts())
+
+
+def _top(index, *args, **kwargs):
+    return [(prompt_id, score.fitness) for prompt_id, score in index.top(*args, **kwargs)]
+
+
+@pytest.fixture
+def no_rebuild(library, monkeypatch):
+    """Fail if the view is rebuilt instead of updated in place."""
+    prompt_fitness.fitness_view()
+
+    def rebuild(csv_path=None):
+        raise AssertionError("fitness view was rebuilt")
+    monkeypatch.setattr(prompt_fitness, 'rebuild_view', rebuild)
+
+
+def test_ranking_matches_a_scan(library):
+    scored = [(p['Prompt_ID'], parse_rating_score(p['Rating'])) for p in csv_utils.load_prompts()]
+    scored = [(pid, score.fitness) for pid, score in scored if score and score.fitness is not None]
+    expected = sorted(scored, key=lambda item: (-item[1], int(item[0]) if item[0].isdigit() else 1 << 62, item[0]))
+
+    assert _top(prompt_fitness.fitness_view(), None) == expected
+    assert _top(prompt_fitness.fitness_view(), 3) == expected[:3]
+
+
+def test_block_and_tier_filters(library):
+    index = prompt_fitness.fitness_view()
+    blocks = {p['Prompt_ID']: p['Time_Block'] for p in csv_utils.load_prompts()}
+
+    midday = index.top(None, 'Midday Refresh', min_tier=3)
+    assert midday
+    for prompt_id, score in midday:
+        assert blocks[prompt_id] == 'Midday Refresh'
+        assert score.tier >= 3
+    with pytest.raises(ValueError, match="No rated prompts"):
+        index.top(5, 'Brunch')
+
+
+def test_rating_updates_are_applied_as_deltas(no_rebuild):
+    csv_utils.update_prompts({'40': {'Rating': 'Excellent ⭐ - wordless vocals'}, '41': {'Rating': ''}})
+    with prompt_journal.deferred():
+        csv_utils.update_prompts({'42': {'Rating': 'Pretty good'}})
+        assert prompt_fitness.fitness_view().score('42').tier == 3
+
+    index = prompt_fitness.fitness_view()
+    assert index.score('40') == parse_rating_score('Excellent ⭐ - wordless vocals')
+    assert '40' in index.tagged('vocals') and '40' in index.starred()
+    assert index.score('41') is None
+    assert _top(index, None) == _top(_fresh(), None)
+
+
+def test_outside_csv_edits_rebuild_the_view(library):
+    prompt_fitness.fitness_view()
+    prompts = csv_utils.read_prompts()
+    prompts[0]['Rating'] = 'Excellent ⭐'
+    csv_utils.write_prompts(prompts)
+
+    assert prompt_fitness.fitness_view().top(1)[0][0] == prompts[0]['Prompt_ID']
@@ -0,0 +1,44 @@
+import csv_utils
+import prompt_index
+
+
+def _rows():
+    return {p['Prompt_ID']: dict(p) for p in csv_utils.load_prompts()}
+
+
+def test_lookup_matches_the_parsed_library(library):
+    rows = _rows()
+
+    for prompt_id, row in rows.items():
+        assert prompt_index.lookup(prompt_id) == row
+    assert prompt_index.lookup('NOPE') is None
+    assert prompt_index.lookup('4O') is None
+
+
+def test_edits_rebuild_the_offsets(library):
+    prompt_index.lookup('40')
+    prompts = csv_utils.read_prompts()
+    prompts[0]['Notes'] = 'A much longer note,\nwith a comma, "quotes" and a second line'
+    del prompts[1]
+    csv_utils.write_prompts(prompts)
+
+    assert prompt_index.lookup(prompts[0]['Prompt_ID'])['Notes'] == prompts[0]['Notes']
+    assert prompt_index.lookup(prompts[-1]['Prompt_ID']) == dict(prompts[-1])
+    assert prompt_index.lookup('2') is None
+
+
+def test_light_rows_read_heavy_columns_on_demand(library):
+    rows = _rows()
+
+    light = prompt_index.load_light()
+
+    assert [p['Prompt_ID'] for p in light] == list(rows)
+    assert {p['Prompt_ID']: dict(p) for p in light} == rows
+
+
+def test_light_rows_follow_edits(library):
+    prompt_index.load_light()
+    csv_utils.update_prompts({'40': {'Notes': 'Edited', 'BPM': '99'}})
+
+    light = {p['Prompt_ID']: p for p in prompt_index.load_light()}
+    assert (light['40']['BPM'], light['40']['Notes']) == ('99', 'Edited')
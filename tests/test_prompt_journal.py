@@ -0,0 +1,65 @@
+import csv
+import sys
+
+import pytest
+
+import add_rating
+import csv_utils
+import prompt_daemon
+import prompt_journal
+import prompts
+
+
+def _csv_row(path, prompt_id):
+    """The row as it is in the CSV file itself, ignoring the journal and caches."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return next(row for row in csv.DictReader(f) if row['Prompt_ID'] == prompt_id)
+
+
+@pytest.fixture
+def no_daemon(monkeypatch):
+    monkeypatch.setattr(prompt_daemon, 'DAEMON_ENABLED', False)
+
+
+def test_add_rating_reaches_the_csv(library, no_daemon, monkeypatch):
+    monkeypatch.setattr(sys, 'argv', ['add_rating.py', '40', 'Excellent - journal test ⭐'])
+
+    add_rating.main()
+
+    assert _csv_row(library, '40')['Rating'] == 'Excellent - journal test ⭐'
+    assert not prompt_journal.journal_path(library).exists()
+
+
+def test_deferred_updates_are_journalled_then_compacted(library):
+    before = library.read_bytes()
+
+    with prompt_journal.deferred():
+        csv_utils.update_prompts({'40': {'Rating': 'Very good'}, '41': {'Generated': 'Yes'}})
+        assert library.read_bytes() == before
+        assert prompt_journal.replay(library) == {'40': {'Rating': 'Very good'}, '41': {'Generated': 'Yes'}}
+        assert csv_utils.get_prompt('40')['Rating'] == 'Very good'
+
+    assert not prompt_journal.journal_path(library).exists()
+    assert _csv_row(library, '40')['Rating'] == 'Very good'
+    assert _csv_row(library, '41')['Generated'] == 'Yes'
+
+
+def test_batch_writes_reach_the_csv(library, capsys):
+    status = prompts.run_batch(['rate 40 Okay', 'show 40', 'mark 41', 'rate NOPE Good'])
+
+    assert status == 1
+    assert '❌ Prompt NOPE not found' in capsys.readouterr().out
+    assert _csv_row(library, '40')['Rating'] == 'Okay'
+    assert _csv_row(library, '41')['Generated'] == 'Yes'
+    assert not prompt_journal.journal_path(library).exists()
+
+
+def test_torn_journal_line_is_skipped(library):
+    prompt_journal.append(library, {'40': {'Rating': 'Good'}})
+    with open(prompt_journal.journal_path(library), 'ab') as f:
+        f.write(b'{"updates": {"41": {"Rat')
+    prompt_journal.append(library, {'42': {'Rating': 'Okay'}})
+
+    assert prompt_journal.replay(library) == {'40': {'Rating': 'Good'}, '42': {'Rating': 'Okay'}}
+    assert prompt_journal.compact(library) == 2
+    assert _csv_row(library, '42')['Rating'] == 'Okay'
@@ -0,0 +1,76 @@
+import pytest
+
+import csv_utils
+import prompt_journal
+import prompt_lineage
+
+
+@pytest.mark.parametrize('notes, prompt_id, parents', [
+    ('Parent #5 clone', '50', ('5',)),
+    ('Hybrid: #13 + #21', '50', ('13', '21')),
+    ('Mutation: marimba (Prompt #13 DNA)', '50', ('13',)),
+    ('Clone of #108 (very good)', '204', ('108',)),
+    ('Hybrid: Debussy (#62) + minimal house parent (#13 DNA)', '92', ('13',)),
+    ('Mutation: Ocean field recordings (WEIGHTED - appears in #40, #41)', '203', ()),
+    ('Inspired by #105 and #305', '206', ('105',)),
+    ('Hybrid: #13 + #13', 'BONUS-1', ('13',)),
+    ('', '50', ()),
+])
+def test_parse_parents(notes, prompt_id, parents):
+    assert prompt_lineage.parse_parents(notes, prompt_id) == parents
+
+
+@pytest.fixture
+def no_sync(library, monkeypatch):
+    """Fail if the graph falls back to re-reading every row."""
+    prompt_lineage._graphs.clear()
+    prompt_lineage.get_graph()
+
+    def sync(self, prompts):
+        raise AssertionError("lineage graph was resynced")
+    monkeypatch.setattr(prompt_lineage.LineageGraph, 'sync', sync)
+
+
+def test_graph_edges_agree_both_ways(library):
+    prompt_lineage._graphs.clear()
+    graph = prompt_lineage.get_graph()
+
+    assert graph.children
+    for parent, children in graph.children.items():
+        for child in children:
+            assert parent in graph.parents(child)
+            assert graph.descendants(parent, max_depth=1)[child] == 1
+            assert graph.ancestors(child)[parent] >= 1
+            if child.isdigit():
+                assert int(parent) < int(child)
+
+
+def test_notes_edits_are_applied_as_deltas(no_sync):
+    csv_utils.update_prompts({'205': {'Notes': 'Hybrid: #13 + #21'}})
+    with prompt_journal.deferred():
+        csv_utils.update_prompts({'206': {'Notes': 'Parent #205 clone'}})
+
+    prompt_lineage._graphs.clear()  # the sidecar is current too
+    graph = prompt_lineage.get_graph()
+    assert graph.parents('205') == ('13', '21')
+    assert graph.parents('206') == ('205',)
+    assert (graph.ancestors('206')['13'], graph.ancestors('206')['21']) == (2, 2)
+    assert '206' in graph.descendants('13')
+
+
+def test_outside_csv_edits_resync(library):
+    prompt_lineage._graphs.clear()
+    prompt_lineage.get_graph()
+    prompts = csv_utils.read_prompts()
+    prompts[99]['Notes'] = 'Parent #7 clone'
+    csv_utils.write_prompts(prompts)
+
+    assert prompt_lineage.get_graph().parents(prompts[99]['Prompt_ID']) == ('7',)
+
+
+def test_lineage_ratings(library):
+    csv_utils.update_prompts({'201': {'Rating': 'Excellent ⭐'}, '202': {'Rating': 'Okay'}, '203': {'Rating': ''}})
+
+    ratings = prompt_lineage.lineage_ratings(['201', '202', '203'])
+
+    assert ratings == {'prompts': 3, 'rated': 2, 'starred': 1, 'mean_fitness': 4.0, 'tiers': {5: 1, 2: 1}}
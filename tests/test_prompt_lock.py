@@ -0,0 +1,89 @@
+import multiprocessing
+import threading
+
+import pytest
+
+import csv_utils
+from prompt_lock import VersionConflict, library_lock, library_version, update_with_retry
+
+
+def test_stale_version_is_rejected(library):
+    version = library_version(library)
+    csv_utils.update_prompts({'40': {'Rating': 'Okay'}}, expected_version=version)
+
+    with pytest.raises(VersionConflict) as conflict:
+        csv_utils.update_prompts({'40': {'Rating': 'Bad'}}, expected_version=version)
+
+    assert (conflict.value.expected, conflict.value.actual) == (version, version + 1)
+    assert csv_utils.get_prompt('40')['Rating'] == 'Okay'
+
+
+def test_update_with_retry_recomputes_after_a_concurrent_write(library):
+    seen = []
+
+    def append_note(prompt):
+        seen.append(prompt['Notes'])
+        if len(seen) == 1:  # another writer gets in before this one
+            csv_utils.update_prompts({'40': {'Notes': prompt['Notes'] + ' [theirs]'}})
+        return {'Notes': prompt['Notes'] + ' [mine]'}
+
+    update_with_retry('40', append_note)
+
+    assert len(seen) == 2
+    assert csv_utils.get_prompt('40')['Notes'].endswith(' [theirs] [mine]')
+
+
+def test_update_with_retry_rejects_a_missing_prompt(library):
+    with pytest.raises(ValueError, match="not found"):
+        update_with_retry('NOPE', lambda prompt: {})
+
+
+def test_writer_waits_for_readers(library):
+    reading, done = threading.Event(), threading.Event()
+
+    def reader():
+        with library_lock(library):
+            reading.set()
+            done.wait(5)
+    thread = threading.Thread(target=reader)
+    thread.start()
+    reading.wait(5)
+    try:
+        with pytest.raises(TimeoutError):
+            with library_lock(library, exclusive=True, timeout=0.05):
+                pass
+    finally:
+        done.set()
+        thread.join(5)
+
+    with library_lock(library, exclusive=True, timeout=1):
+        with library_lock(library):  # re-entrant within the writer
+            pass
+
+
+def test_shared_lock_cannot_be_upgraded(library):
+    with library_lock(library):
+        with pytest.raises(RuntimeError, match="upgrade"):
+            with library_lock(library, exclusive=True):
+                pass
+
+
+def _append_marks(path, worker, count):
+    csv_utils.CSV_PATH = path
+    csv_utils.invalidate()
+    for n in range(count):
+        update_with_retry('40', lambda prompt: {'Notes': f"{prompt['Notes']} [{worker}.{n}]"}, retries=50)
+
+
+def test_parallel_writers_lose_no_updates(library):
+    context = multiprocessing.get_context('fork')
+    workers = [context.Process(target=_append_marks, args=(library, worker, 5)) for worker in range(3)]
+    for process in workers:
+        process.start()
+    for process in workers:
+        process.join(60)
+        assert process.exitcode == 0
+
+    csv_utils.invalidate()
+    notes = csv_utils.get_prompt('40')['Notes']
+    assert sorted(notes.split(' [')[1:]) == sorted(f"{worker}.{n}]" for worker in range(3) for n in range(5))
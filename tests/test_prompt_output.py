@@ -0,0 +1,74 @@
+import io
+import json
+import sys
+
+import pytest
+
+import csv_utils
+import find_prompts
+import prompt_daemon
+from prompt_output import parse_output_args, write_row, write_rows
+
+
+def _write(rows, *args):
+    options, rest = parse_output_args(list(args))
+    out = io.StringIO()
+    write_rows(options.page(rows), options, out)
+    return out.getvalue()
+
+
+def test_options_are_taken_out_of_the_arguments():
+    options, rest = parse_output_args(['--rated', 'no', '--format', 'jsonl', '--fields', 'prompt_id,bpm',
+                                       '--offset', '2', '--limit', '3'])
+
+    assert rest == ['--rated', 'no']
+    assert (options.format, options.fields, options.offset, options.limit) == ('jsonl', ['Prompt_ID', 'BPM'], 2, 3)
+    assert options.fetch_limit() == 5
+
+
+@pytest.mark.parametrize('args, message', [
+    (['--format', 'xml'], "--format must be one of"),
+    (['--fields', 'Prompt_ID,Tempo'], "Unknown field 'Tempo'"),
+    (['--limit', '-1'], "can't be negative"),
+    (['--offset'], "needs a value"),
+])
+def test_bad_options_are_rejected(args, message):
+    with pytest.raises(ValueError, match=message):
+        parse_output_args(args)
+
+
+def test_json_and_jsonl_round_trip(library):
+    rows = csv_utils.load_prompts()[:5]
+    expected = [{'Prompt_ID': row['Prompt_ID'], 'Full_Prompt': row['Full_Prompt']} for row in rows[1:4]]
+    args = ('--fields', 'Prompt_ID,Full_Prompt', '--offset', '1', '--limit', '3')
+
+    assert json.loads(_write(rows, '--format', 'json', *args)) == expected
+    assert [json.loads(line) for line in _write(rows, '--format', 'jsonl', *args).splitlines()] == expected
+    assert _write([], '--format', 'json') == '[]\n'
+
+
+def test_tsv_escapes_tabs_and_newlines():
+    rows = [{'Prompt_ID': '1', 'Notes': 'two\tcolumns\nand a \\ line'}]
+
+    assert _write(rows, '--format', 'tsv') == 'Prompt_ID\tNotes\n1\ttwo\\tcolumns\\nand a \\\\ line\n'
+    assert _write([], '--format', 'tsv', '--fields', 'Prompt_ID,BPM') == 'Prompt_ID\tBPM\n'
+
+
+def test_missing_single_row_is_null_in_json():
+    options, _ = parse_output_args(['--format', 'json'])
+    out = io.StringIO()
+
+    write_row(None, options, out)
+
+    assert out.getvalue() == 'null\n'
+
+
+def test_find_prompts_pages_machine_output(library, monkeypatch, capsys):
+    monkeypatch.setattr(prompt_daemon, 'DAEMON_ENABLED', False)
+    monkeypatch.setattr(sys, 'argv', ['find_prompts.py', '--time-block', 'Midday Refresh', '--format', 'jsonl',
+                                      '--fields', 'Prompt_ID', '--offset', '1', '--limit', '2'])
+
+    find_prompts.main()
+
+    matches = [p['Prompt_ID'] for p in csv_utils.find_prompts(Time_Block='Midday Refresh')]
+    assert [json.loads(line)['Prompt_ID'] for line in capsys.readouterr().out.splitlines()] == matches[1:3]
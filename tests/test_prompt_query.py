@@ -0,0 +1,41 @@
+import pytest
+
+import prompt_query
+
+
+def _ids(query):
+    return [prompt['Prompt_ID'] for prompt in prompt_query.query_prompts(query)]
+
+
+def test_non_numeric_id_matches_as_text(library):
+    assert _ids('id:BONUS-3') == ['BONUS-3']
+    assert _ids('id:bonus-3|41') == ['41', 'BONUS-3']
+    assert 'BONUS-3' not in _ids('-id:BONUS-3')
+
+
+def test_numeric_id_terms_skip_non_numeric_ids(library):
+    assert _ids('id:41') == ['41']
+    assert _ids('id:40-42') == ['40', '41', '42']
+    assert not any(pid.startswith('BONUS') for pid in _ids('id:>100'))
+    assert _ids('id:>=BONUS-3') == ['BONUS-3', 'BONUS-4']
+
+
+def test_sort_by_id_orders_numeric_ids_numerically(library):
+    ids = _ids('sort:id')
+    assert ids[:3] == ['1', '2', '3']
+    assert ids[-4:] == ['BONUS-1', 'BONUS-2', 'BONUS-3', 'BONUS-4']
+
+
+def test_limit_argument_leaves_the_query_alone(library):
+    query = prompt_query.compile_query('sort:-bpm limit:5')
+
+    assert len(prompt_query.query_prompts(query, limit=2)) == 2
+    assert query.limit == 5
+    assert len(prompt_query.query_prompts(query)) == 5
+    assert len(prompt_query.query_prompts(query, limit=50)) == 5
+
+
+@pytest.mark.parametrize('text', ['-sort:bpm', '-sort:-bpm', '-limit:3'])
+def test_negated_sort_and_limit_are_rejected(text):
+    with pytest.raises(ValueError, match="can't be negated"):
+        prompt_query.compile_query(text)
@@ -0,0 +1,29 @@
+import pytest
+
+import csv_utils
+from prompt_record import parse_rating, parse_rating_score
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('not bad, very good', (4, False)),
+    ("wasn't terrible, okay ⭐", (2, True)),
+    ('Very good - not bad for a clone', (4, False)),
+    ('Okay - could be excellent with less reverb', (2, False)),
+    ('Mixed quality - one version OK, one version pretty good', (2, False)),
+    ('One version excellent, other mediocre - kept the good one ⭐', (5, True)),
+    ('Needs testing - maybe very good', (None, False)),
+    ('Sounds great - bad mix though', (1, False)),
+    ('badly mastered', (None, False)),
+    ('', (None, False)),
+])
+def test_mixed_ratings_use_the_leading_verdict(text, expected):
+    assert parse_rating(text) == expected
+
+
+def test_mixed_rating_counts_under_its_verdict(library):
+    before = csv_utils.get_stats()['rating_distribution']
+    csv_utils.update_prompts({'40': {'Rating': 'not bad, very good'}})
+
+    after = csv_utils.get_stats()['rating_distribution']
+    assert after['Very good'] == before.get('Very good', 0) + 1
+    assert parse_rating_score('not bad, very good').tags == {'positive'}
@@ -0,0 +1,48 @@
+import os
+
+import pytest
+
+import csv_utils
+import prompt_snapshot
+
+
+@pytest.fixture
+def snapshot(library):
+    rows = csv_utils.read_prompts()
+    prompt_snapshot.save(rows, library)
+    return rows
+
+
+def _rewrite_same_size(path, keep_mtime):
+    """Swap two characters of the CSV, keeping its size (and optionally its mtime)."""
+    stat = path.stat()
+    data = path.read_bytes().replace(b'Midday Refresh,98', b'Midday Refresh,89', 1)
+    path.write_bytes(data)
+    if keep_mtime:
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+
+def test_current_snapshot_loads_without_hashing(snapshot, monkeypatch):
+    def digest(data):
+        raise AssertionError("hashed the CSV")
+    monkeypatch.setattr(prompt_snapshot, '_digest', digest)
+    monkeypatch.setattr(prompt_snapshot, '_coarse', lambda mtime_ns: False)
+
+    assert [dict(p) for p in prompt_snapshot.load()] == [dict(p) for p in snapshot]
+
+
+def test_edit_invalidates_the_snapshot(snapshot, library):
+    _rewrite_same_size(library, keep_mtime=False)
+
+    assert prompt_snapshot.load() is None
+    assert csv_utils.get_prompt('40')['BPM'] == '89'
+
+
+def test_coarse_mtime_falls_back_to_the_hash(snapshot, library):
+    os.utime(library, ns=(0, 1_700_000_000 * 10**9))
+    prompt_snapshot.save(snapshot, library)
+    assert prompt_snapshot.load() is not None
+
+    _rewrite_same_size(library, keep_mtime=True)
+
+    assert prompt_snapshot.load() is None
@@ -0,0 +1,45 @@
+import pytest
+
+import csv_utils
+import prompt_journal
+import prompt_stats
+
+
+@pytest.fixture
+def no_rebuild(library, monkeypatch):
+    """Fail if the view is recounted instead of updated in place."""
+    csv_utils.get_stats()
+    rebuild_view = prompt_stats.rebuild_view
+
+    def rebuild(csv_path=None):
+        raise AssertionError("stats view was rebuilt")
+    monkeypatch.setattr(prompt_stats, 'rebuild_view', rebuild)
+    yield rebuild_view
+
+
+def test_updates_are_applied_as_deltas(no_rebuild, monkeypatch):
+    csv_utils.update_prompts({'40': {'Rating': 'Excellent ⭐', 'BPM': '131', 'Key_Instruments': 'theremin'},
+                              '41': {'Generated': 'No', 'Time_Block': 'Midday  refresh'}})
+    with prompt_journal.deferred():
+        csv_utils.update_prompts({'42': {'Rating': 'not bad, very good'}})
+
+    stats = csv_utils.get_stats()
+    monkeypatch.setattr(prompt_stats, 'rebuild_view', no_rebuild)
+    assert prompt_stats.check_view() == []
+    assert stats == csv_utils.get_stats()
+    assert stats['instruments']['theremin'] == 1
+
+
+def test_outside_csv_edits_are_recounted(library):
+    before = csv_utils.get_stats()
+    prompts = csv_utils.read_prompts()
+    prompts[0]['Generated'] = 'No' if prompts[0]['Generated'] == 'Yes' else 'Yes'
+    csv_utils.write_prompts(prompts)
+
+    assert csv_utils.get_stats() != before
+    assert prompt_stats.check_view() == []
+
+
+def test_bpm_buckets_are_in_order(library):
+    for buckets in csv_utils.get_stats()['bpm_by_block'].values():
+        assert list(buckets) == sorted(buckets, key=prompt_stats.bucket_order)
@@ -0,0 +1,73 @@
+import sys
+
+import pytest
+
+import csv_utils
+import prompt_daemon
+import prompts
+
+
+@pytest.fixture(autouse=True)
+def no_daemon(monkeypatch):
+    monkeypatch.setattr(prompt_daemon, 'DAEMON_ENABLED', False)
+
+
+@pytest.mark.parametrize('line, parsed', [
+    ('rate 40 Excellent - sax texture perfect ⭐', ('rate', ['40', 'Excellent - sax texture perfect ⭐'])),
+    ('rate 41 "Very good"', ('rate', ['41', 'Very good'])),
+    ('mark 40 41 42', ('mark', ['40', '41', '42'])),
+    ('find --time-block "Midday Refresh"', ('find', ['--time-block', 'Midday Refresh'])),
+])
+def test_parse_batch_line(line, parsed):
+    assert prompts.parse_batch_line(line) == parsed
+
+
+def test_writes_are_merged_until_a_read(library, monkeypatch, capsys):
+    calls = []
+    update_prompts = csv_utils.update_prompts
+
+    def counting(updates, **kwargs):
+        calls.append(dict(updates))
+        return update_prompts(updates, **kwargs)
+    monkeypatch.setattr(csv_utils, 'update_prompts', counting)
+
+    status = prompts.run_batch([
+        '# a comment', '',
+        'rate 40 Very good',
+        'mark 40 41',
+        'show 40',
+        'rate 42 Okay',
+    ])
+
+    assert status == 0
+    assert calls == [{'40': {'Rating': 'Very good', 'Generated': 'Yes'}, '41': {'Generated': 'Yes'}},
+                     {'42': {'Rating': 'Okay'}}]
+    out = capsys.readouterr().out
+    assert out.index('✅ Rated Prompt 40: Very good') < out.index('Rating: Very good')
+
+
+def test_bad_lines_fail_the_batch_but_not_the_rest(library, capsys):
+    status = prompts.run_batch(['frobnicate 40', 'rate 40', 'show NOPE', 'rate 41 Good'])
+
+    assert status == 1
+    out = capsys.readouterr().out
+    assert "unknown command 'frobnicate'" in out
+    assert csv_utils.get_prompt('41')['Rating'] == 'Good'
+
+
+def test_batch_file_from_the_command_line(library, tmp_path, monkeypatch, capsys):
+    ops = tmp_path / 'ops.txt'
+    ops.write_text('rate 40 Pretty good\nstats\n', encoding='utf-8')
+    monkeypatch.setattr(sys, 'argv', ['prompts.py', 'batch', str(ops)])
+
+    with pytest.raises(SystemExit) as exit:
+        prompts.main()
+
+    assert exit.value.code == 0
+    assert csv_utils.get_prompt('40')['Rating'] == 'Pretty good'
+
+
+def test_run_command_returns_the_exit_status(library, capsys):
+    assert prompts.run_command('show', ['40']) == 0
+    assert prompts.run_command('show', ['NOPE']) == 1
+    assert sys.argv[0] != 'show_prompt.py'
@@ -0,0 +1,51 @@
+import pytest
+
+import csv_utils
+import prompt_journal
+import search_index
+
+
+def _ids(query, **kwargs):
+    return [prompt['Prompt_ID'] for prompt in search_index.search(query, **kwargs)]
+
+
+@pytest.fixture
+def no_resync(monkeypatch):
+    """Fail if the index falls back to comparing every row."""
+    search_index.get_index()
+
+    def sync(self, prompts):
+        raise AssertionError("index was resynced")
+    monkeypatch.setattr(search_index.SearchIndex, 'sync', sync)
+
+
+def test_updates_are_applied_as_deltas(library, no_resync):
+    csv_utils.update_prompts({'40': {'Rating': 'Very good'}})
+    csv_utils.update_prompts({'41': {'Notes': 'Theremin overdub'}})
+
+    assert _ids('theremin') == ['41']
+    assert _ids('theremin', fields=['Full_Prompt']) == []
+    search_index._indexes.clear()  # the sidecar is current too
+    assert _ids('theremin') == ['41']
+
+
+def test_journalled_updates_survive_compaction(library, no_resync):
+    with prompt_journal.deferred():
+        csv_utils.update_prompts({'41': {'Notes': 'Theremin overdub'}})
+        assert _ids('theremin') == ['41']
+
+    assert _ids('theremin') == ['41']
+
+
+def test_outside_csv_edits_resync(library):
+    search_index.get_index()
+    prompts = csv_utils.read_prompts()
+    prompts[0]['Key_Instruments'] = 'theremin'
+    csv_utils.write_prompts(prompts)
+
+    assert _ids('theremin') == [prompts[0]['Prompt_ID']]
+
+
+def test_unknown_field_is_rejected(library):
+    with pytest.raises(ValueError, match="Unknown search field 'Rating'"):
+        search_index.search('okay', fields=['Notes', 'Rating'])